@@ -1,5 +1,5 @@
 from django.db import transaction
-from django.http import HttpResponse, StreamingHttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
@@ -14,7 +14,7 @@ from rest_framework.response import Response
 from applications.api.v1.serializers import ApplicationBatchSerializer
 from applications.enums import ApplicationBatchStatus
 from applications.models import ApplicationBatch
-from applications.services.ahjo_integration import export_application_batch
+from applications.services.ahjo_integration import export_application_batch_file
 from applications.services.talpa_integration import TalpaService
 from common.authentications import RobotBasicAuthentication
 from common.permissions import BFIsHandler
@@ -64,14 +64,10 @@ class ApplicationBatchViewSet(AuditLoggingModelViewSet):
         Export ApplicationBatch to pdf format
         """
         batch = self.get_object()
-        if batch.status in (
+        if batch.status not in (
             ApplicationBatchStatus.DRAFT,
             ApplicationBatchStatus.AHJO_REPORT_CREATED,
         ):
-            if batch.status == ApplicationBatchStatus.DRAFT:
-                batch.status = ApplicationBatchStatus.AHJO_REPORT_CREATED
-                batch.save()
-        else:
             return Response(
                 {
                     "detail": _(
@@ -87,12 +83,16 @@ class ApplicationBatchViewSet(AuditLoggingModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        zip_file = export_application_batch(batch)
         file_name = format_lazy(
             _("Application batch {date}"),
             date=timezone.now().strftime("%d-%m-%Y %H.%M.%S"),
         )
-        response = HttpResponse(zip_file, content_type="application/x-zip-compressed")
+        # The status is only changed after the report has been created successfully
+        zip_file = export_application_batch_file(batch)
+        if batch.status == ApplicationBatchStatus.DRAFT:
+            batch.status = ApplicationBatchStatus.AHJO_REPORT_CREATED
+            batch.save()
+        response = FileResponse(zip_file, content_type="application/x-zip-compressed")
         response["Content-Disposition"] = "attachment; filename={file_name}.zip".format(
             file_name=file_name
         )
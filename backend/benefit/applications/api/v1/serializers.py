@@ -7,7 +7,7 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
-from django.db import transaction
+from django.db import models, transaction
 from django.forms import ImageField, ValidationError as DjangoFormsValidationError
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
@@ -21,7 +21,7 @@ from applications.api.v1.status_transition_validator import (
     ApplicationBatchStatusValidator,
     HandlerApplicationStatusValidator,
 )
-from applications.benefit_aggregation import get_former_benefit_info
+from applications.benefit_aggregation import FormerBenefitIndex, get_former_benefit_info
 from applications.enums import (
     ApplicationBatchStatus,
     ApplicationStatus,
@@ -465,6 +465,21 @@ class ApplicationBatchSerializer(serializers.ModelSerializer):
         application_batch.applications.set(applications)
 
 
+class ApplicationListSerializer(serializers.ListSerializer):
+    """
+    Load the former benefits of all the listed applications at once, instead of querying them
+    separately for each application.
+    """
+
+    FORMER_BENEFIT_FIELDS = {"warnings", "former_benefit_info"}
+
+    def to_representation(self, data):
+        applications = list(data.all() if isinstance(data, models.Manager) else data)
+        if self.FORMER_BENEFIT_FIELDS & set(self.child.fields):
+            self.child.former_benefit_index = FormerBenefitIndex(applications)
+        return super().to_representation(applications)
+
+
 class BaseApplicationSerializer(DynamicFieldsModelSerializer):
     """
     Fields in the Company model come from YTJ/other source and are not editable by user, and are listed
@@ -704,6 +719,8 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
             },
         }
 
+        list_serializer_class = ApplicationListSerializer
+
     ahjo_decision = serializers.ReadOnlyField()
 
     submitted_at = serializers.SerializerMethodField("get_submitted_at")
@@ -763,6 +780,9 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
         help_text="If application status is changed in the request, set the comment field in the ApplicationLogEntry",
     )
 
+    # set by ApplicationListSerializer when a list of applications is serialized
+    former_benefit_index = None
+
     def get_applicant_terms_approval_needed(self, obj):
         return ApplicantTermsApproval.terms_approval_needed(obj)
 
@@ -810,6 +830,7 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
                 obj.start_date,
                 obj.end_date,
                 obj.apprenticeship_program,
+                former_benefit_index=self.former_benefit_index,
             ).warnings:
                 warnings["former_benefits"] = former_benefit_warnings
         return warnings
@@ -852,6 +873,7 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
             obj.calculation.start_date or obj.start_date,
             obj.calculation.end_date or obj.end_date,
             obj.apprenticeship_program,
+            former_benefit_index=self.former_benefit_index,
         )
         if aggregated_info.months_remaining is None:
             last_possible_end_date = None
@@ -1353,11 +1375,7 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
         )
         if instance.status == ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED:
             # Create an automatic message for the applicant
-            # self.instance.additional_information_requested_at is not updated at this point as
-            # it's a queryset annotation, so need to refresh
-            self.instance.additional_information_requested_at = Application.objects.get(
-                pk=instance.pk
-            ).additional_information_requested_at
+            # instance.additional_information_requested_at was updated when the log entry was created
             send_application_reopened_message(
                 get_request_user_from_context(self),
                 instance,
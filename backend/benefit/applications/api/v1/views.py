@@ -1,10 +1,10 @@
-from typing import List
+import itertools
 
 from django.conf import settings
 from django.core import exceptions
 from django.db import transaction
 from django.db.models import Q, QuerySet
-from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
@@ -25,11 +25,17 @@ from applications.api.v1.serializers import (
 from applications.enums import ApplicationBatchStatus, ApplicationStatus
 from applications.models import Application, ApplicationBatch
 from applications.services.ahjo_integration import (
-    ExportFileInfo,
-    generate_zip,
-    prepare_pdf_files,
+    generate_zip_file,
+    iter_pdf_files,
+    StreamedExportFile,
 )
 from applications.services.applications_csv_report import ApplicationsCsvService
+from calculator.api.v1.serializers import (
+    CalculationSimulationResultSerializer,
+    CalculationSimulationSerializer,
+)
+from calculator.models import Calculation, PaySubsidy, TrainingCompensation
+from common.pagination import KeysetPagination
 from common.permissions import BFIsApplicant, BFIsHandler, TermsOfServiceAccepted
 from messages.models import MessageType
 from shared.audit_log.viewsets import AuditLoggingModelViewSet
@@ -105,6 +111,9 @@ class BaseApplicationViewSet(AuditLoggingModelViewSet):
         drf_filters.SearchFilter,
     ]
     search_fields = ["company_name", "company_contact_person_email"]
+    # The lists are only paginated if requested, see KeysetPagination
+    pagination_class = KeysetPagination
+    keyset_ordering = ["created_at", "id"]
 
     def get_queryset(self) -> QuerySet[Application]:
         user = self.request.user
@@ -133,7 +142,7 @@ class BaseApplicationViewSet(AuditLoggingModelViewSet):
     def perform_update(self, serializer):
         super().perform_update(serializer)
         # In case new AuditLogEntry objects were created during the
-        # processing of the update, then the annotation value for handled_at
+        # processing of the update, then the annotated values
         # in the serializer.instance might have become stale.
         # Update the object.
         serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
@@ -153,6 +162,10 @@ class BaseApplicationViewSet(AuditLoggingModelViewSet):
             exclude_fields | (extra_exclude_fields - fields)
         )
 
+        if (page := self.paginate_queryset(qs)) is not None:
+            serializer = self.serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
         serializer = self.serializer_class(qs, many=True, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -292,6 +305,7 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
     serializer_class = HandlerApplicationSerializer
     permission_classes = [BFIsHandler]
     filterset_class = HandlerApplicationFilter
+    keyset_ordering = ["-handled_at", "-calculation__modified_at", "-id"]
 
     def _annotate_unread_messages_count(self, qs):
         return qs.annotate(
@@ -337,6 +351,46 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
             context.update({"exclude_fields": exclude_fields.split(",")})
         return context
 
+    @extend_schema(
+        description=(
+            "Run the calculator with the given values without saving anything, and return "
+            "the resulting calculation rows and benefit amount"
+        ),
+        request=CalculationSimulationSerializer,
+        responses=CalculationSimulationResultSerializer,
+    )
+    @action(methods=["POST"], detail=True)
+    def simulate_calculation(self, request, pk=None) -> Response:
+        application = self.get_object()
+        serializer = CalculationSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # The objects are never saved, the calculator works on them in memory
+        if benefit_type := data.get("benefit_type"):
+            application.benefit_type = benefit_type
+        calculation = Calculation(application=application, **data["calculation"])
+        pay_subsidies = None
+        if "pay_subsidies" in data:
+            pay_subsidies = [
+                PaySubsidy(application=application, **pay_subsidy)
+                for pay_subsidy in data["pay_subsidies"]
+            ]
+        training_compensations = None
+        if "training_compensations" in data:
+            training_compensations = [
+                TrainingCompensation(application=application, **training_compensation)
+                for training_compensation in data["training_compensations"]
+            ]
+        rows, calculated_benefit_amount = calculation.simulate(
+            pay_subsidies, training_compensations
+        )
+        return Response(
+            CalculationSimulationResultSerializer(
+                {"calculated_benefit_amount": calculated_benefit_amount, "rows": rows}
+            ).data
+        )
+
     @action(methods=["GET"], detail=False)
     def export_csv(self, request) -> StreamingHttpResponse:
         queryset = self.get_queryset()
@@ -347,14 +401,14 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
 
     @action(methods=["GET"], detail=False)
     @transaction.atomic
-    def export_new_accepted_applications_csv_pdf(self, request) -> HttpResponse:
+    def export_new_accepted_applications_csv_pdf(self, request) -> FileResponse:
         return self._csv_pdf_response(
             self._create_application_batch(ApplicationStatus.ACCEPTED)
         )
 
     @action(methods=["GET"], detail=False)
     @transaction.atomic
-    def export_new_rejected_applications_csv_pdf(self, request) -> HttpResponse:
+    def export_new_rejected_applications_csv_pdf(self, request) -> FileResponse:
         return self._csv_pdf_response(
             self._create_application_batch(ApplicationStatus.REJECTED)
         )
@@ -398,22 +452,27 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
         )
         return response
 
-    def _csv_pdf_response(self, queryset: QuerySet[Application]) -> HttpResponse:
+    def _csv_pdf_response(self, queryset: QuerySet[Application]) -> FileResponse:
         export_filename_without_suffix = self._export_filename_without_suffix()
         csv_filename = f"{export_filename_without_suffix}.csv"
         zip_filename = f"{export_filename_without_suffix}.zip"
         ordered_queryset = queryset.order_by(self.APPLICATION_ORDERING)
         csv_service = ApplicationsCsvService(ordered_queryset)
-        csv_file_content: bytes = csv_service.get_csv_string().encode("utf-8")
-        csv_file_info: ExportFileInfo = ExportFileInfo(
+        csv_file = StreamedExportFile(
             filename=csv_filename,
-            file_content=csv_file_content,
-            html_content="",  # No HTML content
+            content_chunks=(
+                line.encode("utf-8")
+                for line in csv_service.get_csv_string_lines_generator()
+            ),
         )
-        pdf_files: List[ExportFileInfo] = prepare_pdf_files(ordered_queryset)
-        zip_file: bytes = generate_zip([csv_file_info] + pdf_files)
-        response: HttpResponse = HttpResponse(
-            zip_file, content_type="application/x-zip-compressed"
+        # The zip archive is written to a temporary file one file at a time. It is
+        # completed in the transaction of the new batch, so that a failure while
+        # rendering the PDF files rolls back the batch.
+        response = FileResponse(
+            generate_zip_file(
+                itertools.chain([csv_file], iter_pdf_files(ordered_queryset))
+            ),
+            content_type="application/x-zip-compressed",
         )
         response["Content-Disposition"] = f"attachment; filename={zip_filename}"
         return response
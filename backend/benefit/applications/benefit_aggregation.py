@@ -1,3 +1,5 @@
+import collections
+import functools
 import operator
 from dataclasses import dataclass, field
 from decimal import Decimal
@@ -5,6 +7,7 @@ from itertools import chain
 from typing import List, Optional, Union
 
 from dateutil.relativedelta import relativedelta
+from django.db.models import Q
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 
@@ -27,6 +30,79 @@ class FormerBenefitInfo:
 BENEFIT_WAITING_PERIOD_MONTHS = 24
 
 
+class FormerBenefitIndex:
+    """
+    The accepted applications and previous benefits of the employees of a list of applications,
+    loaded with two queries and grouped by social security number and company.
+
+    Used when serializing a list of applications, so that the former benefit info does not need
+    to be queried separately for each application.
+    """
+
+    def __init__(self, applications):
+        social_security_numbers = set()
+        company_ids = set()
+        for application in applications:
+            if application.employee.social_security_number:
+                social_security_numbers.add(application.employee.social_security_number)
+                company_ids.add(application.company_id)
+
+        self._past_benefits = collections.defaultdict(list)
+        if not social_security_numbers:
+            return
+        # SearchField only supports exact lookups, so the numbers are combined with OR
+        accepted_applications = Application.objects.filter(
+            functools.reduce(
+                operator.or_,
+                (
+                    Q(employee__social_security_number=social_security_number)
+                    for social_security_number in social_security_numbers
+                ),
+            ),
+            company_id__in=company_ids,
+            status=ApplicationStatus.ACCEPTED,
+            # like the start_date__lte filter of _get_past_benefits, which excludes them
+            start_date__isnull=False,
+        ).select_related("employee")
+        for application in accepted_applications:
+            self._past_benefits[
+                (application.employee.social_security_number, application.company_id)
+            ].append(application)
+        previous_benefits = PreviousBenefit.objects.filter(
+            functools.reduce(
+                operator.or_,
+                (
+                    Q(social_security_number=social_security_number)
+                    for social_security_number in social_security_numbers
+                ),
+            ),
+            company_id__in=company_ids,
+        )
+        for previous_benefit in previous_benefits:
+            self._past_benefits[
+                (previous_benefit.social_security_number, previous_benefit.company_id)
+            ].append(previous_benefit)
+
+    def get_past_benefits(self, application, company, social_security_number, end_date):
+        # same rules as in _get_past_benefits
+        return sorted(
+            (
+                benefit
+                for benefit in self._past_benefits[
+                    (social_security_number, company.pk if company else None)
+                ]
+                if benefit.start_date <= end_date
+                and not (
+                    application
+                    and isinstance(benefit, Application)
+                    and benefit.pk == application.pk
+                )
+            ),
+            key=operator.attrgetter("start_date"),
+            reverse=True,
+        )
+
+
 def get_former_benefit_info(
     application,
     company,
@@ -34,12 +110,14 @@ def get_former_benefit_info(
     start_date,
     end_date,
     apprenticeship_program,
+    former_benefit_index=None,
 ):
     # the application field values are separate parameters, because validation is done
     # before assigning values, and if a new Application is being created, an Application doesn't yet exist when
     # the rest framework does the validation.
     # The Application parameter is only used to ensure that the application being validated isn't validated
     # against itself.
+    # If former_benefit_index is given, the past benefits are looked up from it instead of the database.
 
     former_benefit_info = FormerBenefitInfo()
 
@@ -47,10 +125,15 @@ def get_former_benefit_info(
         # the employee info hasn't been entered yet
         return former_benefit_info
 
-    recent_benefits = _get_benefits_relevant_for_validation(
-        _get_past_benefits(application, company, social_security_number, end_date),
-        start_date,
-    )
+    if former_benefit_index is not None:
+        past_benefits = former_benefit_index.get_past_benefits(
+            application, company, social_security_number, end_date
+        )
+    else:
+        past_benefits = _get_past_benefits(
+            application, company, social_security_number, end_date
+        )
+    recent_benefits = _get_benefits_relevant_for_validation(past_benefits, start_date)
 
     former_benefit_info.warnings.extend(
         _get_benefit_overlap_warnings(recent_benefits, start_date, end_date)
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from applications.models import Application, STATUS_TIMESTAMP_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the handled_at, additional_information_requested_at and submitted_at "
+        "fields of applications from the application log entries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Dry run, only report the number of applications with outdated timestamps",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of applications updated in one transaction",
+        )
+
+    def get_outdated_applications(self):
+        outdated = Q()
+        for field_name in STATUS_TIMESTAMP_FIELDS:
+            log_field_name = f"log_{field_name}"
+            outdated |= (
+                ~Q(**{field_name: F(log_field_name)})
+                | Q(
+                    **{
+                        f"{field_name}__isnull": True,
+                        f"{log_field_name}__isnull": False,
+                    }
+                )
+                | Q(
+                    **{
+                        f"{field_name}__isnull": False,
+                        f"{log_field_name}__isnull": True,
+                    }
+                )
+            )
+        return Application.objects.annotate_status_timestamps_from_log().filter(
+            outdated
+        )
+
+    def handle(self, dry_run, chunk_size, *args, **options):
+        application_ids = list(
+            self.get_outdated_applications().order_by("pk").values_list("pk", flat=True)
+        )
+        if dry_run:
+            self.stdout.write(
+                f"{len(application_ids)} applications have outdated status timestamps"
+            )
+            return
+
+        for i in range(0, len(application_ids), chunk_size):
+            with transaction.atomic():
+                Application.objects.filter(
+                    pk__in=application_ids[i : i + chunk_size]
+                ).update_status_timestamps()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated the status timestamps of {len(application_ids)} applications"
+            )
+        )
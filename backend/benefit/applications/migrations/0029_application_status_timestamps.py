@@ -0,0 +1,61 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:17
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+STATUS_TIMESTAMP_FIELDS = {
+    "handled_at": ["rejected", "accepted", "cancelled"],
+    "additional_information_requested_at": ["additional_information_needed"],
+    "submitted_at": ["received"],
+}
+
+
+def backfill_status_timestamps(apps, schema_editor):
+    Application = apps.get_model("applications", "Application")
+    ApplicationLogEntry = apps.get_model("applications", "ApplicationLogEntry")
+    Application.objects.update(
+        **{
+            field_name: Subquery(
+                ApplicationLogEntry.objects.filter(
+                    application=OuterRef("pk"), to_status__in=to_statuses
+                )
+                .order_by("-created_at")
+                .values("created_at")[:1]
+            )
+            for field_name, to_statuses in STATUS_TIMESTAMP_FIELDS.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0028_localized_iban_field"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="application",
+            name="additional_information_requested_at",
+            field=models.DateTimeField(
+                blank=True,
+                null=True,
+                verbose_name="additional information requested at",
+            ),
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="handled_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="handled at"
+            ),
+        ),
+        migrations.AddField(
+            model_name="application",
+            name="submitted_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="submitted at"
+            ),
+        ),
+        migrations.RunPython(backfill_status_timestamps, migrations.RunPython.noop),
+    ]
@@ -3,7 +3,7 @@ from datetime import datetime
 from django.conf import settings
 from django.core.validators import MaxLengthValidator, MinLengthValidator
 from django.db import connection, models
-from django.db.models import OuterRef, Subquery
+from django.db.models import OuterRef, Q, Subquery
 from django.utils.translation import gettext_lazy as _
 from encrypted_fields.fields import EncryptedCharField, SearchField
 from phonenumber_field.modelfields import PhoneNumberField
@@ -63,40 +63,58 @@ def address_property(field_suffix):
     return _address_property_getter
 
 
-class ApplicationManager(models.Manager):
-
-    HANDLED_STATUSES = [
+# The status timestamp fields of Application, and the statuses whose latest status
+# transition timestamp is stored in each field
+STATUS_TIMESTAMP_FIELDS = {
+    "handled_at": [
         ApplicationStatus.REJECTED,
         ApplicationStatus.ACCEPTED,
         ApplicationStatus.CANCELLED,
-    ]
-
-    def _annotate_with_log_timestamp(self, qs, field_name, to_statuses):
-        subquery = (
-            ApplicationLogEntry.objects.filter(
-                application=OuterRef("pk"), to_status__in=to_statuses
-            )
-            .order_by("-created_at")
-            .values("created_at")[:1]
+    ],
+    "additional_information_requested_at": [
+        ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED
+    ],
+    "submitted_at": [ApplicationStatus.RECEIVED],
+}
+
+
+def _get_log_timestamp_subquery(to_statuses):
+    return Subquery(
+        ApplicationLogEntry.objects.filter(
+            application=OuterRef("pk"), to_status__in=to_statuses
         )
-        return qs.annotate(**{field_name: Subquery(subquery)})
+        .order_by("-created_at")
+        .values("created_at")[:1]
+    )
+
 
-    def get_queryset(self):
+class ApplicationQuerySet(models.QuerySet):
+    def annotate_status_timestamps_from_log(self):
         """
-        Annotate the queryset with information about timestamps of past status transitions.
+        Annotate the queryset with the status timestamps calculated from the ApplicationLogEntries,
+        as log_handled_at, log_additional_information_requested_at and log_submitted_at.
         If multiple transitions to the same status have occurred, then use the latest status transition timestamp.
+
+        The status timestamp fields are normally kept up to date when log entries are created, so
+        this is only needed for checking them.
         """
-        qs = super().get_queryset()
-        qs = self._annotate_with_log_timestamp(qs, "handled_at", self.HANDLED_STATUSES)
-        qs = self._annotate_with_log_timestamp(
-            qs,
-            "additional_information_requested_at",
-            [ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED],
+        return self.annotate(
+            **{
+                f"log_{field_name}": _get_log_timestamp_subquery(to_statuses)
+                for field_name, to_statuses in STATUS_TIMESTAMP_FIELDS.items()
+            }
         )
-        qs = self._annotate_with_log_timestamp(
-            qs, "submitted_at", [ApplicationStatus.RECEIVED]
+
+    def update_status_timestamps(self):
+        """
+        Recalculate the status timestamp fields of the applications from the ApplicationLogEntries.
+        """
+        return self.update(
+            **{
+                field_name: _get_log_timestamp_subquery(to_statuses)
+                for field_name, to_statuses in STATUS_TIMESTAMP_FIELDS.items()
+            }
         )
-        return qs
 
 
 class Application(UUIDModel, TimeStampedModel, DurationMixin):
@@ -111,7 +129,7 @@ class Application(UUIDModel, TimeStampedModel, DurationMixin):
     For additional descriptions of the fields, see the API documentation (serializers.py)
     """
 
-    objects = ApplicationManager()
+    objects = ApplicationQuerySet.as_manager()
 
     BENEFIT_MAX_MONTHS = 12
 
@@ -320,7 +338,48 @@ class Application(UUIDModel, TimeStampedModel, DurationMixin):
 
     bases = models.ManyToManyField("ApplicationBasis", related_name="applications")
 
-    history = HistoricalRecords(table_name="bf_applications_application_history")
+    # Timestamps of the latest transitions to the statuses in STATUS_TIMESTAMP_FIELDS.
+    # Maintained by ApplicationLogEntry.save(), not editable directly.
+    handled_at = models.DateTimeField(
+        verbose_name=_("handled at"), null=True, blank=True, db_index=True
+    )
+    additional_information_requested_at = models.DateTimeField(
+        verbose_name=_("additional information requested at"), null=True, blank=True
+    )
+    submitted_at = models.DateTimeField(
+        verbose_name=_("submitted at"), null=True, blank=True, db_index=True
+    )
+
+    history = HistoricalRecords(
+        table_name="bf_applications_application_history",
+        excluded_fields=list(STATUS_TIMESTAMP_FIELDS),
+    )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # This instance may have been loaded before a log entry was created, so don't
+            # overwrite the status timestamps maintained by ApplicationLogEntry with stale values
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in STATUS_TIMESTAMP_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def update_status_timestamp(self, to_status, timestamp):
+        """
+        Store the timestamp of a status transition, if it's the latest transition to the status.
+        """
+        for field_name, to_statuses in STATUS_TIMESTAMP_FIELDS.items():
+            if to_status in to_statuses:
+                Application.objects.filter(
+                    Q(**{f"{field_name}__isnull": True})
+                    | Q(**{f"{field_name}__lt": timestamp}),
+                    pk=self.pk,
+                ).update(**{field_name: timestamp})
+                current_value = getattr(self, field_name)
+                if current_value is None or current_value < timestamp:
+                    setattr(self, field_name, timestamp)
 
     @property
     def calculated_benefit_amount(self):
@@ -427,6 +486,12 @@ class ApplicationLogEntry(UUIDModel, TimeStampedModel):
         table_name="bf_applications_applicationlogentry_history"
     )
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            self.application.update_status_timestamp(self.to_status, self.created_at)
+
     def __str__(self):
         return (
             f"Application {self.application.id} | {self.from_status or 'N/A'} --> "
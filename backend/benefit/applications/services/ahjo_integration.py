@@ -1,13 +1,18 @@
+import functools
 import logging
 import os
+import subprocess
+import tempfile
 import zipfile
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from io import BytesIO
-from typing import List, Optional
+from io import RawIOBase
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 import jinja2
 import pdfkit
+from django.conf import settings
 from django.db.models import QuerySet
 
 from applications.enums import ApplicationStatus
@@ -22,6 +27,16 @@ class ExportFileInfo:
     html_content: str
 
 
+@dataclass
+class StreamedExportFile:
+    """
+    Export file whose content is produced in chunks while the zip archive is written
+    """
+
+    filename: str
+    content_chunks: Iterable[bytes]
+
+
 PDF_PATH = os.path.join(os.path.dirname(__file__) + "/pdf_templates")
 BENEFIT_TEMPLATE_FILENAME = "benefit_template.html"
 TEMPLATE_ID_BENEFIT_WITH_DE_MINIMIS_AID = "benefit_with_de_minimis_aid"
@@ -136,14 +151,51 @@ JINJA_TEMPLATES_SINGLE = {
 LOGGER = logging.getLogger(__name__)
 
 
+class PdfRenderingTimeout(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _get_jinja_environment() -> jinja2.Environment:
+    """
+    Return the Jinja environment shared by all the exports in this process.
+
+    The environment keeps the compiled templates in memory and only reloads a template when
+    the modification time of its file changes. The bytecode cache lets new processes skip
+    the template compilation as well.
+    """
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(searchpath=PDF_PATH),
+        autoescape=True,
+        auto_reload=True,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    )
+    # Compile the templates used in the exports beforehand
+    for template_config in [
+        *JINJA_TEMPLATES_SINGLE.values(),
+        *JINJA_TEMPLATES_COMPOSED.values(),
+    ]:
+        env.get_template(template_config["path"])
+    return env
+
+
 def _get_template(path):
-    template_loader = jinja2.FileSystemLoader(searchpath=PDF_PATH)
-    env = jinja2.Environment(loader=template_loader, autoescape=True)
-    return env.get_template(path)
+    return _get_jinja_environment().get_template(path)
 
 
 def prepare_pdf_files(apps: QuerySet[Application]) -> List[ExportFileInfo]:
-    pdf_files: List[ExportFileInfo] = []
+    return list(iter_pdf_files(apps))
+
+
+def iter_pdf_files(apps: QuerySet[Application]) -> Iterator[ExportFileInfo]:
+    """
+    Generate the PDF files of the export one by one, in a deterministic order:
+    the single company files first, then the composed files.
+    """
+    return convert_html_files_to_pdf(iter_html_files(apps))
+
+
+def iter_html_files(apps: QuerySet[Application]) -> Iterator[Tuple[str, str]]:
     # SINGLE COMPANY/ASSOCIATION PER DECISION PER FILE
     accepted_apps: List[Application] = [
         app for app in apps if app.status == ApplicationStatus.ACCEPTED
@@ -155,33 +207,124 @@ def prepare_pdf_files(apps: QuerySet[Application]) -> List[ExportFileInfo]:
     for app in accepted_apps:
         accepted_groups[app.company].append(app)
     for group, grouped_accepted_apps in accepted_groups.items():
-        pdf_files.append(generate_single_approved_file(group, grouped_accepted_apps))
+        yield render_html(
+            grouped_accepted_apps,
+            get_single_approved_template_config(grouped_accepted_apps),
+            group,
+        )
 
     declined_groups = defaultdict(list)
     for app in rejected_apps:
         declined_groups[app.company].append(app)
     for group, grouped_rejected_apps in declined_groups.items():
-        pdf_files.append(generate_single_declined_file(group, grouped_rejected_apps))
+        yield render_html(
+            grouped_rejected_apps,
+            JINJA_TEMPLATES_SINGLE[TEMPLATE_ID_BENEFIT_DECLINED],
+            group,
+        )
 
     # COMPOSED FILES
-    pdf_files += generate_composed_files(accepted_apps, rejected_apps)
-
-    return pdf_files
+    if accepted_apps:
+        for template_id in COMPOSED_ACCEPTED_TEMPLATE_IDS:
+            yield render_html(accepted_apps, JINJA_TEMPLATES_COMPOSED[template_id])
+    if rejected_apps:
+        for template_id in COMPOSED_DECLINED_TEMPLATE_IDS:
+            yield render_html(rejected_apps, JINJA_TEMPLATES_COMPOSED[template_id])
+
+
+def _html_to_pdf(html: str) -> bytes:
+    """
+    Convert the HTML to PDF with wkhtmltopdf, like pdfkit.from_string(html, False) does,
+    but kill the wkhtmltopdf process if it does not finish in
+    settings.PDF_RENDERING_TIMEOUT seconds.
+    """
+    args = pdfkit.PDFKit(html, "string").command()
+    result = subprocess.run(
+        args,
+        input=html.encode("utf-8"),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=settings.PDF_RENDERING_TIMEOUT,
+    )
+    stderr = result.stderr.decode("utf-8", errors="replace")
+    if "Error" in stderr or result.returncode != 0:
+        raise IOError(
+            f"wkhtmltopdf exited with code {result.returncode}. error:\n{stderr}"
+        )
+    return result.stdout
+
+
+def _convert_html_file_to_pdf(file_name: str, html: str) -> ExportFileInfo:
+    try:
+        file_content = _html_to_pdf(html)
+    except subprocess.TimeoutExpired:
+        LOGGER.error(f"PDF rendering timed out for file {file_name}")
+        raise PdfRenderingTimeout(file_name)
+    return ExportFileInfo(
+        filename=file_name, file_content=file_content, html_content=html
+    )
 
 
-def generate_pdf(
+def convert_html_files_to_pdf(
+    html_files: Iterable[Tuple[str, str]]
+) -> Iterator[ExportFileInfo]:
+    """
+    Convert the (file name, HTML) pairs to PDF files, keeping the order of the input.
+
+    If settings.PDF_RENDERING_WORKERS is greater than one, up to that many documents are
+    converted at the same time. Each wkhtmltopdf conversion already runs in its own process,
+    so a thread pool is enough for limiting the number of concurrent conversions.
+    Only a few documents are converted ahead of the consumer, so that the finished
+    PDF files do not pile up in memory.
+    """
+    workers = settings.PDF_RENDERING_WORKERS
+    if workers <= 1:
+        for file_name, html in html_files:
+            yield _convert_html_file_to_pdf(file_name, html)
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="pdf-rendering"
+    )
+    pending = deque()
+    try:
+        for file_name, html in html_files:
+            pending.append(executor.submit(_convert_html_file_to_pdf, file_name, html))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Do not start the conversions that are not needed anymore. The running
+        # conversions are killed at the latest when they time out.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def render_html(
     apps: List[Application], template_config: dict, company: Optional[Company] = None
-) -> ExportFileInfo:
+) -> Tuple[str, str]:
     template = _get_template(template_config["path"])
     file_name: str = template_config["file_name"]
     if company:
         file_name = file_name.format(company_name=company.name)
     html: str = template.render({**template_config["context"], "apps": apps})
-    return ExportFileInfo(
-        filename=file_name,
-        file_content=pdfkit.from_string(html, False),
-        html_content=html,
-    )
+    return file_name, html
+
+
+def generate_pdf(
+    apps: List[Application], template_config: dict, company: Optional[Company] = None
+) -> ExportFileInfo:
+    return _convert_html_file_to_pdf(*render_html(apps, template_config, company))
+
+
+def get_single_approved_template_config(apps: List[Application]) -> dict:
+    return JINJA_TEMPLATES_SINGLE[
+        TEMPLATE_ID_BENEFIT_WITH_DE_MINIMIS_AID
+        if any(app.de_minimis_aid for app in apps)
+        else TEMPLATE_ID_BENEFIT_WITHOUT_DE_MINIMIS_AID
+    ]
 
 
 def generate_single_declined_file(
@@ -197,11 +340,7 @@ def generate_single_approved_file(
 ) -> ExportFileInfo:
     return generate_pdf(
         apps=apps,
-        template_config=JINJA_TEMPLATES_SINGLE[
-            TEMPLATE_ID_BENEFIT_WITH_DE_MINIMIS_AID
-            if any(app.de_minimis_aid for app in apps)
-            else TEMPLATE_ID_BENEFIT_WITHOUT_DE_MINIMIS_AID
-        ],
+        template_config=get_single_approved_template_config(apps),
         company=company,
     )
 
@@ -220,21 +359,89 @@ def generate_composed_files(
     ]
 
 
-def generate_zip(files: List[ExportFileInfo]) -> bytes:
-    mem_zip = BytesIO()
+class _ZipOutputStream(RawIOBase):
+    """
+    Write-only, unseekable file object that keeps the written bytes until they are
+    collected with pop(). zipfile writes the data descriptors after each member when
+    the output is not seekable, so the archive can be streamed as it is being written.
+    """
 
-    with zipfile.ZipFile(mem_zip, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for f in files:
-            zf.writestr(f.filename, f.file_content)
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
 
-    return mem_zip.getvalue()
+    def writable(self):
+        return True
 
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
 
-def export_application_batch(batch) -> bytes:
-    pdf_files: List[ExportFileInfo] = prepare_pdf_files(
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def generate_zip_stream(
+    files: Iterable[Union[ExportFileInfo, StreamedExportFile]]
+) -> Iterator[bytes]:
+    """
+    Generate a zip archive of the files in chunks. Each file is written to the archive
+    as soon as the files iterable produces it, so the whole archive is never held in memory.
+    """
+    output = _ZipOutputStream()
+    with zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for f in files:
+            if isinstance(f, StreamedExportFile):
+                with zf.open(f.filename, mode="w") as member:
+                    for chunk in f.content_chunks:
+                        member.write(chunk)
+                        if data := output.pop():
+                            yield data
+            else:
+                zf.writestr(f.filename, f.file_content)
+            if data := output.pop():
+                yield data
+    if data := output.pop():
+        yield data
+
+
+def generate_zip(files: List[ExportFileInfo]) -> bytes:
+    return b"".join(generate_zip_stream(files))
+
+
+def generate_zip_file(
+    files: Iterable[Union[ExportFileInfo, StreamedExportFile]]
+) -> IO[bytes]:
+    """
+    Write a zip archive of the files to a temporary file and return the file, positioned
+    at the start. The archive is completed before it is sent, so that a failure while
+    rendering the files is raised before the response, but it is not held in memory.
+    """
+    zip_file = tempfile.TemporaryFile()
+    try:
+        for chunk in generate_zip_stream(files):
+            zip_file.write(chunk)
+    except BaseException:
+        zip_file.close()
+        raise
+    zip_file.seek(0)
+    return zip_file
+
+
+def _get_batch_applications(batch) -> QuerySet[Application]:
+    return (
         batch.applications.select_related("company")
         .select_related("employee")
         .order_by("application_number")
         .all()
     )
-    return generate_zip(pdf_files)
+
+
+def export_application_batch(batch) -> bytes:
+    return generate_zip(prepare_pdf_files(_get_batch_applications(batch)))
+
+
+def export_application_batch_file(batch) -> IO[bytes]:
+    return generate_zip_file(iter_pdf_files(_get_batch_applications(batch)))
@@ -1,12 +1,20 @@
+import decimal
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+from django.db.models import Prefetch, prefetch_related_objects, QuerySet
 from django.utils import translation
 
-from applications.enums import BenefitType
+from applications.enums import ApplicationStatus, BenefitType
+from applications.models import ApplicationLogEntry
 from applications.services.csv_export_base import (
     CsvColumn,
     CsvExportBase,
     get_organization_type,
     nested_queryset_attr,
 )
+from calculator.enums import RowType
 
 
 def CsvDefaultColumn(*args, **kwargs):
@@ -23,14 +31,11 @@ def get_export_notes(application):
     These cases should not happen, but if they do, then it's important to have some kind of notification about it.
     """
     notes = []
-    if (
-        application.de_minimis_aid_set.count()
-        > ApplicationsCsvService.MAX_DE_MINIMIS_AIDS
-    ):
+    if len(application.de_minimis_aid_set) > ApplicationsCsvService.MAX_DE_MINIMIS_AIDS:
         notes.append("osa de minimis -tuista puuttuu raportilta")
-    if application.pay_subsidies.count() > ApplicationsCsvService.MAX_PAY_SUBSIDIES:
+    if len(application.pay_subsidies) > ApplicationsCsvService.MAX_PAY_SUBSIDIES:
         notes.append("osa palkkatuista puuttuu raportilta")
-    if application.ahjo_rows.count() > ApplicationsCsvService.MAX_AHJO_ROWS:
+    if len(application.ahjo_rows) > ApplicationsCsvService.MAX_AHJO_ROWS:
         notes.append("osa Ahjo-riveistä puuttuu raportilta")
     return ", ".join(notes)
 
@@ -68,6 +73,104 @@ def get_benefit_type_label(benefit_type):
     return str(BenefitType(benefit_type).label)
 
 
+DECISION_STATUSES = [
+    ApplicationStatus.ACCEPTED,
+    ApplicationStatus.CANCELLED,
+    ApplicationStatus.REJECTED,
+]
+
+
+@dataclass
+class AhjoRow:
+    row_type: str
+    description_fi: str
+    amount: decimal.Decimal
+    monthly_amount: Optional[decimal.Decimal]
+    start_date: Optional[date]
+    end_date: Optional[date]
+
+
+def resolve_ahjo_rows(calculation, rows) -> List[AhjoRow]:
+    """
+    In-memory counterpart of Calculation.ahjo_rows. Given the already loaded rows of the calculation
+    in their default ordering, pick the rows that are transferred to Ahjo and resolve the monthly
+    amount of each of them without further queries.
+    """
+    ahjo_rows = [
+        row for row in rows if row.row_type == RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
+    ]
+    use_override_amount = (
+        not ahjo_rows and calculation.override_monthly_benefit_amount is not None
+    )
+    if not ahjo_rows:
+        ahjo_rows = [
+            row for row in rows if row.row_type == RowType.HELSINKI_BENEFIT_TOTAL_EUR
+        ]
+
+    resolved_rows = []
+    for ahjo_row in ahjo_rows:
+        if use_override_amount:
+            monthly_amount = calculation.override_monthly_benefit_amount
+        else:
+            # same rule as in TotalRowMixin.monthly_amount: the closest preceding monthly row
+            monthly_rows = [
+                row
+                for row in rows
+                if row.ordering < ahjo_row.ordering
+                and row.row_type == RowType.HELSINKI_BENEFIT_MONTHLY_EUR
+            ]
+            assert (
+                monthly_rows
+            ), "Application logic error - misconstructed application rows"
+            monthly_amount = max(monthly_rows, key=lambda row: row.ordering).amount
+        resolved_rows.append(
+            AhjoRow(
+                row_type=ahjo_row.row_type,
+                description_fi=ahjo_row.description_fi,
+                amount=ahjo_row.amount,
+                monthly_amount=monthly_amount,
+                start_date=ahjo_row.start_date,
+                end_date=ahjo_row.end_date,
+            )
+        )
+    return resolved_rows
+
+
+class ApplicationCsvBundle:
+    """
+    In-memory view of a single application for the CSV export.
+
+    The related objects are read once from the prefetched relations (see
+    ApplicationsCsvService.PREFETCH_LOOKUPS), so that none of the CSV columns need to run
+    queries of their own. Attributes that are not defined here are read from the application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.application_row_idx = None
+        self.pay_subsidies = list(application.pay_subsidies.all())
+        self.de_minimis_aid_set = list(application.de_minimis_aid_set.all())
+        if hasattr(application, "calculation"):
+            self.ahjo_rows = resolve_ahjo_rows(
+                application.calculation, list(application.calculation.rows.all())
+            )
+        else:
+            self.ahjo_rows = []
+        decision_log_entries = getattr(application, "decision_log_entries", None)
+        if decision_log_entries is None:
+            self.latest_decision_comment = application.latest_decision_comment
+        elif decision_log_entries:
+            self.latest_decision_comment = decision_log_entries[0].comment
+        else:
+            self.latest_decision_comment = None
+
+    def __getattr__(self, name):
+        # only called for the attributes that are not set in __init__
+        if name == "application":
+            raise AttributeError(name)
+        return getattr(self.application, name)
+
+
 class ApplicationsCsvService(CsvExportBase):
     """
     Export application data for further processing in Excel and other reporting software.
@@ -338,31 +441,66 @@ class ApplicationsCsvService(CsvExportBase):
     MAX_PAY_SUBSIDIES = 2
     MAX_DE_MINIMIS_AIDS = 5
 
+    SELECT_RELATED_FIELDS = ["company", "employee", "calculation", "batch"]
+
+    PREFETCH_LOOKUPS = [
+        "pay_subsidies",
+        "de_minimis_aid_set",
+        "calculation__rows",
+        Prefetch(
+            "log_entries",
+            queryset=ApplicationLogEntry.objects.filter(
+                to_status__in=DECISION_STATUSES
+            ).order_by("-created_at"),
+            to_attr="decision_log_entries",
+        ),
+    ]
+
     def get_applications(self):
         return self.applications
 
+    def get_prefetched_applications(self):
+        """
+        Load the applications together with all the related objects needed in the CSV columns.
+        The number of queries does not depend on the number of applications.
+        """
+        applications = self.get_applications()
+        if isinstance(applications, QuerySet):
+            return applications.select_related(
+                *self.SELECT_RELATED_FIELDS
+            ).prefetch_related(*self.PREFETCH_LOOKUPS)
+        applications = list(applications)
+        prefetch_related_objects(applications, *self.PREFETCH_LOOKUPS)
+        return applications
+
     def get_row_items(self):
         with translation.override("fi"):
-            for application in self.get_applications():
+            for application in self.get_prefetched_applications():
+                bundle = ApplicationCsvBundle(application)
                 # for applications with multiple ahjo rows, output the same number of rows.
                 # If no Ahjo rows (calculation incomplete), always output just one row.
                 for application_row_idx, unused in enumerate(
-                    application.ahjo_rows or [None]
+                    bundle.ahjo_rows or [None]
                 ):
                     # The CSV output is easier to process in PowerBI
                     # if the rows belonging to the same application are numbered.
                     # application_row_idx is also used for storing the "current" ahjo row.
                     # application_row_idx starts at 1, which must be taken into account
-                    # when indexing application.ahjo_rows
-                    application.application_row_idx = application_row_idx + 1
-                    yield application
+                    # when indexing bundle.ahjo_rows
+                    bundle.application_row_idx = application_row_idx + 1
+                    yield bundle
 
     def get_csv_cell_list_lines_generator(self):
-        if self.get_applications():
-            yield from super().get_csv_cell_list_lines_generator()
-        else:
-            header_row = self._get_header_row()
-            yield header_row
+        # Check for the empty result while streaming, so that the applications
+        # are only queried once
+        lines = super().get_csv_cell_list_lines_generator()
+        header_row = next(lines)
+        yield header_row
+        is_empty = True
+        for line in lines:
+            is_empty = False
+            yield line
+        if is_empty:
             yield ["Ei löytynyt ehdot täyttäviä hakemuksia"] + [""] * (
                 len(header_row) - 1
             )
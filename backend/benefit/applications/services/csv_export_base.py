@@ -37,11 +37,15 @@ def nested_queryset_attr(
     * returns item.attr_name[idx].nested_attr_name
     * In case the attribute is missing, return the default value
     * dotted attribute access (like "a.b" is supported for attr_name and nested_attr_name
+    * plain sequences (for example lists built from prefetched objects) are indexed directly
     """
 
     def getter(item):
         try:
-            nested_obj = operator.attrgetter(related_name)(item).all()[queryset_idx]
+            related = operator.attrgetter(related_name)(item)
+            if hasattr(related, "all"):
+                related = related.all()
+            nested_obj = related[queryset_idx]
             return operator.attrgetter(nested_attr_name)(nested_obj)
         except (
             AttributeError,
@@ -1,21 +1,32 @@
 import io
+import os
+import sys
+import time
 import zipfile
 from datetime import date
 from typing import List
 from unittest.mock import patch
 
 import pytest
+from freezegun import freeze_time
 
 from applications.enums import ApplicationStatus, BenefitType
 from applications.models import Application
 from applications.services.ahjo_integration import (
+    _get_template,
     ACCEPTED_TITLE,
+    BENEFIT_TEMPLATE_FILENAME,
     export_application_batch,
     ExportFileInfo,
     generate_composed_files,
     generate_single_approved_file,
     generate_single_declined_file,
+    generate_zip_stream,
+    PDF_PATH,
+    PdfRenderingTimeout,
+    prepare_pdf_files,
     REJECTED_TITLE,
+    StreamedExportFile,
 )
 from applications.tests.factories import ApplicationFactory, DecidedApplicationFactory
 from calculator.models import Calculation
@@ -62,7 +73,7 @@ def _assert_html_content(html, include_keys=(), excluded_keys=()):
         (YtjOrganizationCode.COMPANY_FORM_CODE_DEFAULT, "oy", [True, True, True], True),
     ],
 )
-@patch("applications.services.ahjo_integration.pdfkit.from_string")
+@patch("applications.services.ahjo_integration._html_to_pdf")
 def test_generate_single_approved_template_html(
     mock_pdf_convert,
     company_form_code: YtjOrganizationCode,
@@ -106,7 +117,7 @@ def test_generate_single_approved_template_html(
     ) == should_show_de_minimis_aid_footer
 
 
-@patch("applications.services.ahjo_integration.pdfkit.from_string")
+@patch("applications.services.ahjo_integration._html_to_pdf")
 def test_generate_single_declined_template_html(mock_pdf_convert):
     mock_pdf_convert.return_value = {}
     company = CompanyFactory()
@@ -136,7 +147,7 @@ def test_generate_single_declined_template_html(mock_pdf_convert):
     )
 
 
-@patch("applications.services.ahjo_integration.pdfkit.from_string")
+@patch("applications.services.ahjo_integration._html_to_pdf")
 def test_generate_composed_template_html(mock_pdf_convert):
     mock_pdf_convert.return_value = {}
     accepted_app_1 = DecidedApplicationFactory(
@@ -226,7 +237,97 @@ def test_export_application_batch(application_batch):
     )
 
 
-@patch("applications.services.ahjo_integration.pdfkit.from_string")
+def test_template_is_compiled_once():
+    template = _get_template(BENEFIT_TEMPLATE_FILENAME)
+    assert _get_template(BENEFIT_TEMPLATE_FILENAME) is template
+
+
+def test_template_is_reloaded_when_file_changes():
+    template = _get_template(BENEFIT_TEMPLATE_FILENAME)
+    template_path = os.path.join(PDF_PATH, BENEFIT_TEMPLATE_FILENAME)
+    stat = os.stat(template_path)
+    try:
+        os.utime(template_path, (stat.st_atime, stat.st_mtime + 10))
+        assert _get_template(BENEFIT_TEMPLATE_FILENAME) is not template
+    finally:
+        os.utime(template_path, (stat.st_atime, stat.st_mtime))
+
+
+def _create_applications_for_pdf_export():
+    apps = [
+        DecidedApplicationFactory(
+            status=ApplicationStatus.ACCEPTED,
+            calculation__calculated_benefit_amount=1000,
+        )
+        for _ in range(3)
+    ] + [DecidedApplicationFactory(status=ApplicationStatus.REJECTED) for _ in range(2)]
+    return Application.objects.filter(pk__in=[app.pk for app in apps]).order_by(
+        "application_number"
+    )
+
+
+@patch("applications.services.ahjo_integration._html_to_pdf")
+def test_prepare_pdf_files_in_parallel_keeps_order(mock_pdf_convert, settings):
+    mock_pdf_convert.side_effect = lambda html: html.encode("utf-8")
+    apps = _create_applications_for_pdf_export()
+
+    settings.PDF_RENDERING_WORKERS = 1
+    serial_files = prepare_pdf_files(apps)
+    settings.PDF_RENDERING_WORKERS = 4
+    parallel_files = prepare_pdf_files(apps)
+
+    # 3 accepted + 2 rejected single files, 2 + 2 composed files
+    assert len(parallel_files) == 9
+    assert [f.filename for f in parallel_files] == [f.filename for f in serial_files]
+    for pdf_file in parallel_files:
+        assert pdf_file.file_content == pdf_file.html_content.encode("utf-8")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@patch("applications.services.ahjo_integration.pdfkit.PDFKit")
+def test_prepare_pdf_files_timeout(mock_pdfkit, settings, workers):
+    # The wkhtmltopdf process is replaced by a slow process, which must be killed
+    mock_pdfkit.return_value.command.return_value = [
+        sys.executable,
+        "-c",
+        "import time; time.sleep(10)",
+    ]
+    apps = _create_applications_for_pdf_export()
+
+    settings.PDF_RENDERING_WORKERS = workers
+    settings.PDF_RENDERING_TIMEOUT = 0.1
+    # The subprocess timeout is measured with time.monotonic(), so the clock must run
+    with freeze_time("2021-06-04", tick=True):
+        start = time.monotonic()
+        with pytest.raises(PdfRenderingTimeout):
+            prepare_pdf_files(apps)
+        assert time.monotonic() - start < 5
+
+
+def test_generate_zip_stream():
+    def csv_lines():
+        yield "a;b\r\n".encode("utf-8")
+        yield "ä;ö\r\n".encode("utf-8")
+
+    chunks = list(
+        generate_zip_stream(
+            [
+                StreamedExportFile(filename="test.csv", content_chunks=csv_lines()),
+                ExportFileInfo(
+                    filename="test.pdf", file_content=b"%PDF", html_content=""
+                ),
+            ]
+        )
+    )
+    # the archive is produced in parts instead of a single bytes object
+    assert len(chunks) > 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.namelist() == ["test.csv", "test.pdf"]
+    assert archive.read("test.csv").decode("utf-8") == "a;b\r\nä;ö\r\n"
+    assert archive.read("test.pdf") == b"%PDF"
+
+
+@patch("applications.services.ahjo_integration._html_to_pdf")
 def test_multiple_benefit_per_application(mock_pdf_convert):
     mock_pdf_convert.return_value = {}
     # Test case data and expected results collected from
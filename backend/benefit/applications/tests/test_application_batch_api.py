@@ -1,5 +1,6 @@
 import base64
 import copy
+import io
 import uuid
 from datetime import datetime
 from unittest.mock import patch
@@ -445,10 +446,10 @@ def test_application_delete(handler_api_client, application_batch):
     assert response.status_code == 204
 
 
-@patch("applications.api.v1.application_batch_views.export_application_batch")
+@patch("applications.api.v1.application_batch_views.export_application_batch_file")
 def test_application_batch_export(mock_export, handler_api_client, application_batch):
     # Mock export pdf function to reduce test time, the unittest for the export feature will be run separately
-    mock_export.return_value = {}
+    mock_export.side_effect = lambda batch: io.BytesIO()
     # Export invalid batch
     application_batch.status = ApplicationBatchStatus.SENT_TO_TALPA
     application_batch.save()
@@ -469,6 +470,20 @@ def test_application_batch_export(mock_export, handler_api_client, application_b
     assert response.headers["Content-Type"] == "application/x-zip-compressed"
     assert response.status_code == 200
 
+    # A failed export does not change the status of a draft batch
+    application_batch.status = ApplicationBatchStatus.DRAFT
+    application_batch.save()
+    mock_export.side_effect = RuntimeError
+    with pytest.raises(RuntimeError):
+        handler_api_client.get(
+            reverse(
+                "v1:applicationbatch-export-batch", kwargs={"pk": application_batch.id}
+            )
+        )
+    application_batch.refresh_from_db()
+    assert application_batch.status == ApplicationBatchStatus.DRAFT
+    mock_export.side_effect = lambda batch: io.BytesIO()
+
     # Export draft batch again
     response = handler_api_client.get(
         reverse("v1:applicationbatch-export-batch", kwargs={"pk": application_batch.id})
@@ -1,3 +1,4 @@
+import base64
 import copy
 import json
 import os
@@ -11,6 +12,7 @@ import faker
 import pytest
 import pytz
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
 from django.test import override_settings
 from freezegun import freeze_time
 from PIL import Image
@@ -2070,6 +2072,7 @@ def test_handler_application_default_ordering(handler_api_client):
             application.log_entries.filter(to_status=status).update(
                 created_at=random_datetime
             )
+            Application.objects.filter(pk=application.pk).update_status_timestamps()
             Calculation.objects.filter(application__id=application.pk).update(
                 modified_at=random_datetime
             )
@@ -2103,3 +2106,69 @@ def test_handler_application_default_ordering(handler_api_client):
     )
     returned_application_ids = [elem["id"] for elem in response.data]
     assert expected_application_ids == returned_application_ids
+
+
+@pytest.mark.parametrize(
+    "view_name",
+    [
+        "v1:handler-application-list",
+        "v1:handler-application-simplified-application-list",
+    ],
+)
+def test_handler_application_keyset_pagination(handler_api_client, view_name):
+    f = faker.Faker()
+    combos = [
+        (ReceivedApplicationFactory, ApplicationStatus.RECEIVED),
+        (DecidedApplicationFactory, ApplicationStatus.ACCEPTED),
+    ]
+    same_datetime = f.past_datetime(tzinfo=pytz.UTC)
+    for i in range(4):
+        for class_name, status in combos:
+            application = class_name()
+            # some applications have equal handled_at and modified_at values
+            random_datetime = same_datetime if i < 2 else f.past_datetime()
+            application.log_entries.filter(to_status=status).update(
+                created_at=random_datetime
+            )
+            Application.objects.filter(pk=application.pk).update_status_timestamps()
+            Calculation.objects.filter(application__id=application.pk).update(
+                modified_at=random_datetime
+            )
+    # without the pagination parameters, the whole list is returned
+    response = handler_api_client.get(reverse(view_name))
+    assert len(response.data) == 8
+    # NULLs first, as in PostgreSQL, and the id breaks the ties
+    expected_application_ids = [
+        str(pk)
+        for pk in Application.objects.order_by(
+            F("handled_at").desc(nulls_first=True),
+            F("calculation__modified_at").desc(nulls_first=True),
+            "-id",
+        ).values_list("id", flat=True)
+    ]
+
+    returned_application_ids = []
+    url = reverse(view_name) + "?page_size=3"
+    while url:
+        response = handler_api_client.get(url)
+        assert response.status_code == 200
+        assert response["X-Total-Count"] == "8"
+        assert len(response.data["results"]) <= 3
+        returned_application_ids += [elem["id"] for elem in response.data["results"]]
+        url = response.data["next"]
+    assert returned_application_ids == expected_application_ids
+
+    response = handler_api_client.get(
+        reverse(view_name) + "?page_size=3&total_count=false"
+    )
+    assert "X-Total-Count" not in response
+    assert response.data["next"]
+
+    response = handler_api_client.get(reverse(view_name) + "?cursor=invalid")
+    assert response.status_code == 404
+
+    # well-formed cursors with values that are not valid for the ordering fields
+    for cursor_values in [["garbage", None, "x"], [None, None, "notauuid"]]:
+        cursor = base64.urlsafe_b64encode(json.dumps(cursor_values).encode()).decode()
+        response = handler_api_client.get(reverse(view_name) + f"?cursor={cursor}")
+        assert response.status_code == 404
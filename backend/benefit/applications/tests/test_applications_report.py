@@ -4,15 +4,21 @@ from collections import defaultdict
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Dict, List
+from unittest.mock import patch
 from zipfile import ZipFile
 
+import pytest
 from dateutil.relativedelta import relativedelta
-from django.http import HttpResponse, StreamingHttpResponse
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
 from applications.enums import AhjoDecision, ApplicationStatus, BenefitType
-from applications.models import ApplicationBatch
+from applications.models import Application, ApplicationBatch
+from applications.services.ahjo_integration import PdfRenderingTimeout
+from applications.services.applications_csv_report import ApplicationsCsvService
 from applications.tests.common import (
     check_csv_cell_list_lines_generator,
     check_csv_string_lines_generator,
@@ -67,11 +73,10 @@ def _get_csv(
 ) -> List[List[str]]:
     response = handler_api_client.get(url)
     assert response.status_code == 200
+    assert isinstance(response, StreamingHttpResponse)
     if from_zip:
-        assert isinstance(response, HttpResponse)
-        csv_content: bytes = _get_csv_from_zip(response.content)
+        csv_content: bytes = _get_csv_from_zip(response.getvalue())
     else:
-        assert isinstance(response, StreamingHttpResponse)
         csv_content: bytes = response.getvalue()
     csv_lines = split_lines_at_semicolon(csv_content.decode("utf-8"))
     _test_csv(csv_lines, expected_application_numbers)
@@ -81,7 +86,8 @@ def _get_csv(
 def _get_csv_pdf_zip(handler_api_client: APIClient, url: str) -> ZipFile:
     response = handler_api_client.get(url)
     assert response.status_code == 200
-    return ZipFile(io.BytesIO(response.content))
+    assert isinstance(response, StreamingHttpResponse)
+    return ZipFile(io.BytesIO(response.getvalue()))
 
 
 def _create_applications_for_export():
@@ -103,6 +109,12 @@ def _create_applications_for_export():
     application4.log_entries.filter(to_status=ApplicationStatus.HANDLING).update(
         created_at=datetime(2022, 2, 1)
     )
+    # the log entries were changed directly in the database
+    Application.objects.filter(
+        pk__in=[application1.pk, application2.pk, application3.pk, application4.pk]
+    ).update_status_timestamps()
+    for application in [application1, application2, application3, application4]:
+        application.refresh_from_db()
     return (application1, application2, application3, application4)
 
 
@@ -375,6 +387,23 @@ def test_applications_csv_output(applications_csv_service):  # noqa: C901
             )
 
 
+def test_applications_csv_query_count_does_not_depend_on_application_count(
+    applications_csv_service,
+):
+    def _count_export_queries():
+        with CaptureQueriesContext(connection) as context:
+            ApplicationsCsvService(
+                Application.objects.all().order_by("application_number")
+            ).get_csv_string()
+        return len(context.captured_queries)
+
+    query_count = _count_export_queries()
+    for application_number in range(100003, 100006):
+        application = DecidedApplicationFactory(application_number=application_number)
+        DeMinimisAidFactory(application=application)
+    assert _count_export_queries() == query_count
+
+
 def test_applications_csv_cell_list_lines_generator(applications_csv_service):
     check_csv_cell_list_lines_generator(
         applications_csv_service, expected_row_count_with_header=3
@@ -621,6 +650,26 @@ def test_write_applications_csv_file(applications_csv_service, tmp_path):
         assert "äöÄÖtest" in contents
 
 
+@patch(
+    "applications.services.ahjo_integration._html_to_pdf",
+    side_effect=PdfRenderingTimeout,
+)
+def test_applications_csv_pdf_zip_export_failure_rolls_back_batch(
+    mock_html_to_pdf, handler_api_client
+):
+    _create_applications_for_export()
+
+    with pytest.raises(PdfRenderingTimeout):
+        handler_api_client.get(
+            reverse("v1:handler-application-list")
+            + "export_new_accepted_applications_csv_pdf/"
+        )
+
+    # The applications are exported again by the next request
+    assert not ApplicationBatch.objects.exists()
+    assert not Application.objects.filter(batch__isnull=False).exists()
+
+
 def test_applications_csv_pdf_zip_export_new_applications(handler_api_client):
     # create 1 rejected, 2 accepted and 1 application in handling
     _create_applications_for_export()
@@ -1,9 +1,11 @@
 import itertools
 from datetime import date
 from decimal import Decimal
+from unittest import mock
 
 import pytest
 from django.utils import translation
+from rest_framework.reverse import reverse
 
 from applications.api.v1.serializers import ApplicantApplicationSerializer
 from applications.enums import BenefitType
@@ -388,6 +390,25 @@ def test_application_with_previously_accepted_applications_and_previous_benefits
             == response_before_update.data["former_benefit_info"]["months_remaining"]
         )
 
+    # In the list, the former benefits are looked up from an index built for the whole list
+    with mock.patch(
+        "applications.benefit_aggregation._get_past_benefits"
+    ) as get_past_benefits:
+        list_response = handler_api_client.get(
+            reverse("v1:handler-application-list") + "?status=handling"
+        )
+        get_past_benefits.assert_not_called()
+    listed_application = next(
+        item
+        for item in list_response.data
+        if item["id"] == str(handling_application.id)
+    )
+    assert (
+        listed_application["former_benefit_info"]
+        == response_before_update.data["former_benefit_info"]
+    )
+    assert listed_application["warnings"] == response_before_update.data["warnings"]
+
     data = ApplicantApplicationSerializer(handling_application).data
 
     data["benefit_type"] = benefit_type
@@ -409,3 +430,37 @@ def test_application_with_previously_accepted_applications_and_previous_benefits
             assert len(response.data["warnings"]["former_benefits"]) == 1
         else:
             assert "former_benefits" not in response.data["warnings"]
+
+
+def test_former_benefit_info_ignores_accepted_application_without_start_date(
+    handler_api_client, handling_application
+):
+    decided_application = DecidedApplicationFactory(
+        company=handling_application.company
+    )
+    decided_application.start_date = None
+    decided_application.save()
+    decided_application.employee.social_security_number = (
+        handling_application.employee.social_security_number
+    )
+    decided_application.employee.save()
+    handling_application.start_date = date(2021, 6, 30)
+    handling_application.save()
+
+    detail_response = handler_api_client.get(
+        get_handler_detail_url(handling_application)
+    )
+    list_response = handler_api_client.get(
+        reverse("v1:handler-application-list") + "?status=handling"
+    )
+
+    assert list_response.status_code == 200
+    listed_application = next(
+        item
+        for item in list_response.data
+        if item["id"] == str(handling_application.id)
+    )
+    assert (
+        listed_application["former_benefit_info"]
+        == detail_response.data["former_benefit_info"]
+    )
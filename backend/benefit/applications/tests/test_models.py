@@ -1,7 +1,18 @@
+from datetime import datetime
+from io import StringIO
+
 import pytest
+import pytz
+from django.core.management import call_command
+from freezegun import freeze_time
 
-from applications.enums import AhjoDecision, ApplicationBatchStatus
-from applications.models import Application, ApplicationBatch, Employee
+from applications.enums import AhjoDecision, ApplicationBatchStatus, ApplicationStatus
+from applications.models import (
+    Application,
+    ApplicationBatch,
+    ApplicationLogEntry,
+    Employee,
+)
 from helsinkibenefit.tests.conftest import *  # noqa
 
 
@@ -108,3 +119,62 @@ def test_encrypted_searchable_social_security_number(employee):
     assert employee.social_security_number == ""
     assert Employee.objects.filter(social_security_number=initial_ssn).count() == 0
     assert Employee.objects.filter(social_security_number="").count() == 1
+
+
+def test_application_status_timestamps(application):
+    assert application.submitted_at is None
+    with freeze_time("2021-06-04"):
+        ApplicationLogEntry.objects.create(
+            application=application,
+            from_status=ApplicationStatus.DRAFT,
+            to_status=ApplicationStatus.RECEIVED,
+        )
+    with freeze_time("2021-06-05"):
+        ApplicationLogEntry.objects.create(
+            application=application,
+            from_status=ApplicationStatus.RECEIVED,
+            to_status=ApplicationStatus.ACCEPTED,
+        )
+    submitted_at = datetime(2021, 6, 4, tzinfo=pytz.UTC)
+    handled_at = datetime(2021, 6, 5, tzinfo=pytz.UTC)
+    assert application.submitted_at == submitted_at
+    assert application.handled_at == handled_at
+
+    # a stale instance does not overwrite the timestamps
+    stale_application = Application.objects.get(pk=application.pk)
+    with freeze_time("2021-06-06"):
+        ApplicationLogEntry.objects.create(
+            application=application,
+            from_status=ApplicationStatus.ACCEPTED,
+            to_status=ApplicationStatus.RECEIVED,
+        )
+    stale_application.save()
+    application.refresh_from_db()
+    assert application.submitted_at == datetime(2021, 6, 6, tzinfo=pytz.UTC)
+    assert application.handled_at == handled_at
+    assert application.additional_information_requested_at is None
+
+
+def test_backfill_application_status_timestamps(application):
+    with freeze_time("2021-06-04"):
+        ApplicationLogEntry.objects.create(
+            application=application,
+            from_status=ApplicationStatus.DRAFT,
+            to_status=ApplicationStatus.RECEIVED,
+        )
+    Application.objects.filter(pk=application.pk).update(
+        submitted_at=None, handled_at=datetime(2021, 6, 5, tzinfo=pytz.UTC)
+    )
+
+    out = StringIO()
+    call_command("backfill_application_status_timestamps", "--dry-run", stdout=out)
+    assert "1 applications have outdated status timestamps" in out.getvalue()
+    application.refresh_from_db()
+    assert application.submitted_at is None
+
+    out = StringIO()
+    call_command("backfill_application_status_timestamps", stdout=out)
+    assert "Updated the status timestamps of 1 applications" in out.getvalue()
+    application.refresh_from_db()
+    assert application.submitted_at == datetime(2021, 6, 4, tzinfo=pytz.UTC)
+    assert application.handled_at is None
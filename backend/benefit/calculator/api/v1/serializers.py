@@ -318,3 +318,56 @@ class PreviousBenefitSerializer(serializers.ModelSerializer):
             "total_amount",
         ]
         read_only_fields = []
+
+
+class SimulationCalculationSerializer(CalculationSerializer):
+    rows = None
+    handler_details = None
+    handler = None
+
+    override_monthly_benefit_amount = serializers.DecimalField(
+        required=False,
+        allow_null=True,
+        max_digits=Calculation.override_monthly_benefit_amount.field.max_digits,
+        decimal_places=Calculation.override_monthly_benefit_amount.field.decimal_places,
+        min_value=0,
+        help_text="manually override the monthly benefit amount",
+    )
+
+    class Meta:
+        model = Calculation
+        fields = [
+            "monthly_pay",
+            "vacation_money",
+            "other_expenses",
+            "start_date",
+            "end_date",
+            "state_aid_max_percentage",
+            "override_monthly_benefit_amount",
+            "override_monthly_benefit_amount_comment",
+        ]
+
+
+class CalculationSimulationSerializer(serializers.Serializer):
+    """
+    Input of a what-if calculation. The calculation is run in memory with the given values
+    and nothing is saved.
+    """
+
+    benefit_type = serializers.ChoiceField(
+        choices=BenefitType.choices,
+        required=False,
+        help_text="Benefit type to calculate with, defaults to the benefit type of the application",
+    )
+    calculation = SimulationCalculationSerializer()
+    pay_subsidies = PaySubsidySerializer(many=True, required=False)
+    training_compensations = TrainingCompensationSerializer(many=True, required=False)
+
+
+class CalculationSimulationResultSerializer(serializers.Serializer):
+    calculated_benefit_amount = serializers.DecimalField(
+        max_digits=Calculation.calculated_benefit_amount.field.max_digits,
+        decimal_places=Calculation.calculated_benefit_amount.field.decimal_places,
+        allow_null=True,
+    )
+    rows = CalculationRowSerializer(many=True)
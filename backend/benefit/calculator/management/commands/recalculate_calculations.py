@@ -0,0 +1,156 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from applications.enums import BenefitType
+from calculator.models import Calculation
+from calculator.rules import HelsinkiBenefitCalculator
+
+
+def _init_worker():
+    # The database connections inherited from the parent process must not be shared
+    connections.close_all()
+
+
+def recalculate_chunk(calculation_ids, dry_run=False):
+    """
+    Recalculate the given calculations in a single transaction.
+
+    Returns a tuple (number of calculations processed, number of calculation rows written,
+    list of (application id, old amount, new amount) for the amounts that changed).
+    In dry run mode the amounts are only calculated in memory and nothing is written.
+    """
+    processed = 0
+    rows_written = 0
+    changed = []
+    with transaction.atomic():
+        calculations = (
+            Calculation.objects.filter(pk__in=calculation_ids)
+            .select_related("application")
+            .order_by("application__application_number")
+        )
+        if not dry_run:
+            calculations = calculations.select_for_update(of=("self",))
+        for calculation in calculations:
+            old_amount = calculation.calculated_benefit_amount
+            if dry_run:
+                new_amount = calculation.calculate_benefit_amount()
+            else:
+                calculation.calculate()
+                new_amount = calculation.calculated_benefit_amount
+                rows_written += calculation.rows.count()
+            processed += 1
+            if old_amount != new_amount:
+                changed.append((calculation.application_id, old_amount, new_amount))
+    return processed, rows_written, changed
+
+
+def _recalculate_chunk_star(args):
+    return recalculate_chunk(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the benefit calculations of the applications that are still "
+        "open for calculation"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Dry run, only report the changed benefit amounts without saving anything",
+        )
+        parser.add_argument(
+            "--id",
+            type=str,
+            action="append",
+            dest="ids",
+            help="UUID of an application to recalculate. Can be given multiple times",
+        )
+        parser.add_argument(
+            "--status",
+            type=str,
+            action="append",
+            dest="statuses",
+            choices=HelsinkiBenefitCalculator.CALCULATION_ALLOWED_STATUSES,
+            help="Only recalculate applications in this status. Can be given multiple times",
+        )
+        parser.add_argument(
+            "--benefit-type",
+            type=str,
+            choices=BenefitType.values,
+            help="Only recalculate applications of this benefit type",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of calculations recalculated in one transaction",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes, 1 runs the chunks in this process",
+        )
+
+    def get_calculation_ids(self, ids, statuses, benefit_type):
+        calculations = Calculation.objects.filter(
+            application__status__in=statuses
+            or HelsinkiBenefitCalculator.CALCULATION_ALLOWED_STATUSES
+        )
+        if ids:
+            calculations = calculations.filter(application__id__in=ids)
+        if benefit_type:
+            calculations = calculations.filter(application__benefit_type=benefit_type)
+        return list(
+            calculations.order_by("application__application_number").values_list(
+                "pk", flat=True
+            )
+        )
+
+    def handle(
+        self,
+        dry_run,
+        ids,
+        statuses,
+        benefit_type,
+        chunk_size,
+        processes,
+        *args,
+        **options,
+    ):
+        calculation_ids = self.get_calculation_ids(ids, statuses, benefit_type)
+        chunks = [
+            (calculation_ids[i : i + chunk_size], dry_run)
+            for i in range(0, len(calculation_ids), chunk_size)
+        ]
+
+        start = time.monotonic()
+        if processes > 1 and len(chunks) > 1:
+            # The forked workers open their own database connections
+            connections.close_all()
+            with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+                results = list(pool.imap_unordered(_recalculate_chunk_star, chunks))
+        else:
+            results = [_recalculate_chunk_star(chunk) for chunk in chunks]
+        elapsed = time.monotonic() - start
+
+        processed = sum(result[0] for result in results)
+        rows_written = sum(result[1] for result in results)
+        changed = [change for result in results for change in result[2]]
+
+        for application_id, old_amount, new_amount in changed:
+            self.stdout.write(f"{application_id}: {old_amount} -> {new_amount}")
+
+        throughput = processed / elapsed if elapsed else processed
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Dry run: ' if dry_run else ''}Recalculated {processed} calculations "
+                f"in {len(chunks)} chunks in {elapsed:.1f}s ({throughput:.1f}/s), "
+                f"{len(changed)} benefit amounts changed, {rows_written} calculation rows written"
+            )
+        )
@@ -206,6 +206,35 @@ class Calculation(UUIDModel, TimeStampedModel, DurationMixin):
             # a different calculator may be needed in the next run
             self.calculator = None
 
+    def calculate_benefit_amount(self):
+        """
+        Return the benefit amount the calculation would result in, without saving anything.
+        """
+        try:
+            return self.init_calculator().calculate_benefit_amount()
+        finally:
+            self.calculator = None
+
+    def simulate(self, pay_subsidies, training_compensations):
+        """
+        Run the calculator fully in memory, using the given unsaved pay subsidies and
+        training compensations instead of the ones stored for the application.
+
+        Returns a tuple (list of unsaved calculation rows, calculated benefit amount).
+        """
+        from calculator.rules import HelsinkiBenefitCalculator
+
+        self.calculator = HelsinkiBenefitCalculator.get_calculator(
+            self,
+            pay_subsidies=pay_subsidies,
+            training_compensations=training_compensations,
+        )
+        try:
+            amount = self.calculator.calculate_benefit_amount()
+            return self.calculator.get_rows(), amount
+        finally:
+            self.calculator = None
+
     def __str__(self):
         return f"Calculation for {self.application}"
 
@@ -698,19 +727,16 @@ class SalaryBenefitMonthlyRow(CalculationRow):
 class TotalRowMixin:
     @property
     def monthly_amount(self):
-        # For each total row, there needs to be a row that defines the monthly amount
-        row = (
-            self.calculation.rows.filter(
-                ordering__lt=self.ordering,
-                row_type=RowType.HELSINKI_BENEFIT_MONTHLY_EUR,
-            )
-            .order_by("-ordering")
-            .first()
-        )
-        assert (
-            row is not None
-        ), "Application logic error - misconstructed application rows"
-        return row.amount
+        # For each total row, there needs to be a row that defines the monthly amount.
+        # The rows are filtered in memory, so that prefetched calculation rows can be used.
+        rows = [
+            row
+            for row in self.calculation.rows.all()
+            if row.ordering < self.ordering
+            and row.row_type == RowType.HELSINKI_BENEFIT_MONTHLY_EUR
+        ]
+        assert rows, "Application logic error - misconstructed application rows"
+        return max(rows, key=operator.attrgetter("ordering")).amount
 
 
 class SalaryBenefitTotalRow(CalculationRow, TotalRowMixin):
@@ -764,8 +790,8 @@ class SalaryBenefitSumSubTotalsRow(CalculationRow):
         return sum(
             [
                 row.amount
-                for row in self.calculation.rows.all().filter(
-                    row_type=RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
+                for row in self.calculation.calculator.get_rows(
+                    RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
                 )
             ]
         )
@@ -2,12 +2,15 @@ import collections
 import datetime
 import decimal
 import logging
+import operator
 
 from django.db import transaction
+from simple_history.utils import bulk_create_with_history
 
 from applications.enums import ApplicationStatus, BenefitType
 from calculator.enums import RowType
 from calculator.models import (
+    CalculationRow,
     DateRangeDescriptionRow,
     DescriptionRow,
     EmployeeBenefitMonthlyRow,
@@ -24,7 +27,7 @@ from calculator.models import (
     TotalDeductionsMonthlyRow,
     TrainingCompensationMonthlyRow,
 )
-from common.utils import pairwise
+from common.utils import bulk_delete_with_history, pairwise
 
 LOGGER = logging.getLogger(__name__)
 BenefitSubRange = collections.namedtuple(
@@ -34,21 +37,45 @@ BenefitSubRange = collections.namedtuple(
 
 
 class HelsinkiBenefitCalculator:
-    def __init__(self, calculation):
+    """
+    The rows are first created in memory, in the order given by create_rows. The values
+    of the earlier rows are looked up from an index by row type, and all the rows are saved
+    with a single bulk insert at the end of the calculation.
+    """
+
+    def __init__(self, calculation, pay_subsidies=None, training_compensations=None):
+        # pay_subsidies and training_compensations can be given as lists of unsaved objects
+        # to calculate with them instead of the ones stored for the application
         self.calculation = calculation
+        self._pay_subsidies = pay_subsidies
+        self._training_compensations = training_compensations
         self._row_counter = 0
+        self._rows = []
+        self._rows_by_type = collections.defaultdict(list)
 
     @staticmethod
-    def get_calculator(calculation):
+    def get_calculator(calculation, **kwargs):
         # in future, one might use e.g. application date to determine the correct calculator
         if calculation.override_monthly_benefit_amount is not None:
-            return ManualOverrideCalculator(calculation)
+            return ManualOverrideCalculator(calculation, **kwargs)
         elif calculation.application.benefit_type == BenefitType.SALARY_BENEFIT:
-            return SalaryBenefitCalculator2021(calculation)
+            return SalaryBenefitCalculator2021(calculation, **kwargs)
         elif calculation.application.benefit_type == BenefitType.EMPLOYMENT_BENEFIT:
-            return EmployeeBenefitCalculator2021(calculation)
+            return EmployeeBenefitCalculator2021(calculation, **kwargs)
         else:
-            return DummyBenefitCalculator(calculation)
+            return DummyBenefitCalculator(calculation, **kwargs)
+
+    def get_pay_subsidies(self):
+        if self._pay_subsidies is not None:
+            return list(self._pay_subsidies)
+        return list(self.calculation.application.pay_subsidies.order_by("start_date"))
+
+    def get_training_compensations(self):
+        if self._training_compensations is not None:
+            return list(self._training_compensations)
+        return list(
+            self.calculation.application.training_compensations.order_by("start_date")
+        )
 
     def get_sub_total_ranges(self):
         # return a list of BenefitSubRange(start_date, end_date, pay_subsidy, training_compensation)
@@ -58,11 +85,9 @@ class HelsinkiBenefitCalculator:
             raise ValueError(
                 "Cannot get sub total range of calculation start_date or end_date"
             )
-        pay_subsidies = PaySubsidy.merge_compatible_subsidies(
-            list(self.calculation.application.pay_subsidies.order_by("start_date"))
-        )
-        training_compensations = list(
-            self.calculation.application.training_compensations.order_by("start_date")
+        pay_subsidies = PaySubsidy.merge_compatible_subsidies(self.get_pay_subsidies())
+        training_compensations = sorted(
+            self.get_training_compensations(), key=operator.attrgetter("start_date")
         )
 
         change_days = {
@@ -102,13 +127,16 @@ class HelsinkiBenefitCalculator:
         assert ranges[-1].end_date == self.calculation.end_date
         return ranges
 
+    def get_rows(self, row_type=None):
+        # The rows (of the given type) created so far, in the order of creation
+        if row_type is None:
+            return list(self._rows)
+        return list(self._rows_by_type[row_type])
+
     def get_amount(self, row_type, default=None):
         # This function is used by the various CalculationRow to retrieve a previously calculated value
-        row = (
-            self.calculation.rows.order_by("-ordering")
-            .filter(row_type=row_type)
-            .first()
-        )
+        rows = self._rows_by_type[row_type]
+        row = rows[-1] if rows else None
         if not row and default is not None:
             return default
         assert row, f"Internal error, {row_type} not found"
@@ -132,18 +160,24 @@ class HelsinkiBenefitCalculator:
             return False
         return True
 
+    def calculate_benefit_amount(self):
+        # Create the rows in memory only and return the total benefit amount, without writing
+        # anything to the database. Returns None if the calculation is not complete enough.
+        self._row_counter = 0
+        self._rows = []
+        self._rows_by_type.clear()
+        if not self.can_calculate():
+            return None
+        self.create_rows()
+        return self.get_amount(RowType.HELSINKI_BENEFIT_TOTAL_EUR)
+
     @transaction.atomic
     def calculate(self):
         if self.calculation.application.status in self.CALCULATION_ALLOWED_STATUSES:
-            self.calculation.rows.all().delete()
-            if self.can_calculate():
-                self.create_rows()
-                # the total benefit amount is stored in Calculation model, for easier processing.
-                self.calculation.calculated_benefit_amount = self.get_amount(
-                    RowType.HELSINKI_BENEFIT_TOTAL_EUR
-                )
-            else:
-                self.calculation.calculated_benefit_amount = None
+            bulk_delete_with_history(self.calculation.rows.all())
+            # the total benefit amount is stored in Calculation model, for easier processing.
+            self.calculation.calculated_benefit_amount = self.calculate_benefit_amount()
+            bulk_create_with_history(self._rows, CalculationRow)
             self.calculation.save()
 
     def _create_row(self, row_class, **kwargs):
@@ -152,7 +186,8 @@ class HelsinkiBenefitCalculator:
         )
         self._row_counter += 1
         row.update_row()
-        row.save()
+        self._rows.append(row)
+        self._rows_by_type[row.row_type].append(row)
         return row
 
     def create_rows(self):
@@ -201,7 +236,7 @@ class SalaryBenefitCalculator2021(HelsinkiBenefitCalculator):
             ]
         ):
             return False
-        for pay_subsidy in self.calculation.application.pay_subsidies.all():
+        for pay_subsidy in self.get_pay_subsidies():
             if not all([pay_subsidy.start_date, pay_subsidy.end_date]):
                 return False
         return True
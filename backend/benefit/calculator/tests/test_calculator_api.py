@@ -4,6 +4,7 @@ from unittest import mock
 
 import factory
 import pytest
+from rest_framework.reverse import reverse
 
 from applications.api.v1.serializers import (
     ApplicantApplicationSerializer,
@@ -18,6 +19,7 @@ from applications.tests.test_applications_api import (
     get_handler_detail_url,
 )
 from calculator.api.v1.serializers import CalculationSerializer
+from calculator.models import CalculationRow
 from calculator.tests.factories import CalculationFactory, PaySubsidyFactory
 from common.tests.conftest import get_client_user
 from common.utils import duration_in_months, to_decimal
@@ -631,3 +633,73 @@ def test_application_calculation_rows_id_exists(
     assert response.status_code == 200
     assert len(response.data["calculation"]["rows"]) > 1
     assert "id" in response.data["calculation"]["rows"][0].keys()
+
+
+def get_simulate_calculation_url(application):
+    return reverse(
+        "v1:handler-application-simulate-calculation", kwargs={"pk": application.id}
+    )
+
+
+def test_simulate_calculation(handler_api_client, handling_application):
+    data = HandlerApplicationSerializer(handling_application).data
+    handling_application.calculation.calculate()
+    row_count = CalculationRow.objects.count()
+    history_count = CalculationRow.history.count()
+    expected_rows = [
+        (row.row_type, row.description_fi, row.amount)
+        for row in handling_application.calculation.rows.order_by("ordering")
+    ]
+    simulation_data = {
+        "calculation": {
+            key: data["calculation"][key]
+            for key in [
+                "monthly_pay",
+                "vacation_money",
+                "other_expenses",
+                "start_date",
+                "end_date",
+                "state_aid_max_percentage",
+            ]
+        },
+        "pay_subsidies": data["pay_subsidies"],
+        "training_compensations": data["training_compensations"],
+    }
+
+    response = handler_api_client.post(
+        get_simulate_calculation_url(handling_application),
+        simulation_data,
+    )
+
+    assert response.status_code == 200
+    assert (
+        decimal.Decimal(response.data["calculated_benefit_amount"])
+        == handling_application.calculation.calculated_benefit_amount
+    )
+    assert [
+        (row["row_type"], row["description_fi"], decimal.Decimal(row["amount"]))
+        for row in response.data["rows"]
+    ] == expected_rows
+    assert CalculationRow.objects.count() == row_count
+    assert CalculationRow.history.count() == history_count
+
+    simulation_data["calculation"]["monthly_pay"] = str(
+        decimal.Decimal(data["calculation"]["monthly_pay"]) + 1000
+    )
+    response = handler_api_client.post(
+        get_simulate_calculation_url(handling_application),
+        simulation_data,
+    )
+    assert response.status_code == 200
+    handling_application.calculation.refresh_from_db()
+    assert handling_application.calculation.monthly_pay == decimal.Decimal(
+        data["calculation"]["monthly_pay"]
+    )
+    assert CalculationRow.objects.count() == row_count
+
+
+def test_simulate_calculation_as_applicant(api_client, handling_application):
+    response = api_client.post(
+        get_simulate_calculation_url(handling_application), {"calculation": {}}
+    )
+    assert response.status_code == 403
@@ -1,11 +1,14 @@
 from datetime import date
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from applications.enums import ApplicationStatus, BenefitType
 from applications.tests.conftest import *  # noqa
 from calculator.models import (
     Calculation,
+    CalculationRow,
     PaySubsidy,
     PreviousBenefit,
     TrainingCompensation,
@@ -250,3 +253,30 @@ def test_calculation_required_fields(
     else:
         assert handling_application.calculation.calculated_benefit_amount is None
         assert handling_application.calculation.rows.count() == 0
+
+
+def test_calculate_saves_rows_in_bulk(handling_application):
+    calculation = handling_application.calculation
+    calculation.calculate()
+    old_row_ids = set(calculation.rows.values_list("pk", flat=True))
+    assert old_row_ids
+
+    with CaptureQueriesContext(connection) as ctx:
+        calculation.calculate()
+    row_inserts = [
+        query
+        for query in ctx.captured_queries
+        if query["sql"].startswith('INSERT INTO "bf_calculator_calculationrow"')
+    ]
+    assert len(row_inserts) == 1
+
+    rows = list(calculation.rows.order_by("ordering"))
+    assert [row.ordering for row in rows] == list(range(len(rows)))
+    assert not old_row_ids & {row.pk for row in rows}
+    history = CalculationRow.history.filter(calculation_id=calculation.pk)
+    assert history.filter(history_type="-", id__in=old_row_ids).count() == len(
+        old_row_ids
+    )
+    assert history.filter(
+        history_type="+", id__in=[row.pk for row in rows]
+    ).count() == len(rows)
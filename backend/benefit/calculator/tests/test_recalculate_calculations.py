@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from applications.enums import ApplicationStatus
+from applications.tests.conftest import *  # noqa
+from calculator.models import Calculation
+from helsinkibenefit.tests.conftest import *  # noqa
+
+
+def _recalculate(*args):
+    out = StringIO()
+    call_command("recalculate_calculations", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_recalculate_dry_run(handling_application):
+    handling_application.calculation.calculate()
+    calculated_amount = handling_application.calculation.calculated_benefit_amount
+    row_ids = set(handling_application.calculation.rows.values_list("pk", flat=True))
+    Calculation.objects.filter(pk=handling_application.calculation.pk).update(
+        calculated_benefit_amount=1
+    )
+
+    output = _recalculate("--dry-run")
+
+    assert f"{handling_application.pk}: 1.00 -> {calculated_amount}" in output
+    assert "Dry run: Recalculated 1 calculations" in output
+    handling_application.calculation.refresh_from_db()
+    assert handling_application.calculation.calculated_benefit_amount == 1
+    assert (
+        set(handling_application.calculation.rows.values_list("pk", flat=True))
+        == row_ids
+    )
+
+
+def test_recalculate(handling_application, received_application):
+    for application in [handling_application, received_application]:
+        application.calculation.calculate()
+        Calculation.objects.filter(pk=application.calculation.pk).update(
+            calculated_benefit_amount=1
+        )
+
+    output = _recalculate("--chunk-size", "1", "--status", ApplicationStatus.HANDLING)
+
+    assert "Recalculated 1 calculations in 1 chunks" in output
+    assert "1 benefit amounts changed" in output
+    handling_application.calculation.refresh_from_db()
+    received_application.calculation.refresh_from_db()
+    assert handling_application.calculation.calculated_benefit_amount != 1
+    assert received_application.calculation.calculated_benefit_amount == 1
+
+
+def test_recalculate_skips_locked_applications(decided_application):
+    Calculation.objects.filter(pk=decided_application.calculation.pk).update(
+        calculated_benefit_amount=1
+    )
+
+    output = _recalculate()
+
+    assert "Recalculated 0 calculations" in output
+    decided_application.calculation.refresh_from_db()
+    assert decided_application.calculation.calculated_benefit_amount == 1
@@ -0,0 +1,201 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination. The list is only paginated if the request has the
+    page_size or cursor query parameter, otherwise the whole list is returned as before.
+
+    The queryset is ordered by view.keyset_ordering, which must end with a unique field.
+    Descending fields are ordered with NULLs first and ascending fields with NULLs last,
+    like PostgreSQL does by default, so that the ordering can be served from an index.
+    The cursor contains the ordering values of the last object of the page, so the next page
+    is fetched with a WHERE condition instead of an OFFSET, and it does not change if
+    objects are added to or removed from the earlier pages.
+
+    The total number of objects is returned in the X-Total-Count header, unless the
+    total_count=false query parameter is given.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    total_count_query_param = "total_count"
+    total_count_header = "X-Total-Count"
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+
+        self.request = request
+        self.ordering = view.keyset_ordering
+        self.page_size = self.get_page_size(request)
+        self.total_count = None
+        if self.include_total_count(request):
+            self.total_count = queryset.count()
+
+        queryset = queryset.order_by(*self.get_order_by())
+        cursor = self.decode_cursor(request)
+        try:
+            if cursor:
+                queryset = queryset.filter(self.get_after_condition(cursor))
+            page = list(queryset[: self.page_size + 1])
+        except ValidationError:
+            # the cursor values are not valid for the ordering fields
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(page) > self.page_size
+        page = page[: self.page_size]
+        self.next_cursor = self.get_cursor_values(page[-1]) if self.has_next else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def include_total_count(self, request):
+        return request.query_params.get(
+            self.total_count_query_param, ""
+        ).lower() not in ("false", "0")
+
+    def get_order_by(self):
+        order_by = []
+        for field_name in self.ordering:
+            if field_name.startswith("-"):
+                order_by.append(F(field_name[1:]).desc(nulls_first=True))
+            else:
+                order_by.append(F(field_name).asc(nulls_last=True))
+        return order_by
+
+    def get_after_condition(self, cursor):
+        """
+        Return the condition that selects the objects that come after the cursor position.
+        """
+        condition = None
+        # build the condition from the last (unique) field towards the first one
+        for field_name, value in reversed(list(zip(self.ordering, cursor))):
+            descending = field_name.startswith("-")
+            field_name = field_name.lstrip("-")
+            if value is None:
+                equal = Q(**{f"{field_name}__isnull": True})
+                if descending:
+                    after = Q(**{f"{field_name}__isnull": False})
+                else:
+                    after = Q(pk__in=[])
+            else:
+                equal = Q(**{field_name: value})
+                if descending:
+                    after = Q(**{f"{field_name}__lt": value})
+                else:
+                    after = Q(**{f"{field_name}__gt": value}) | Q(
+                        **{f"{field_name}__isnull": True}
+                    )
+            condition = after if condition is None else after | (equal & condition)
+        return condition
+
+    def get_cursor_values(self, obj):
+        values = []
+        for field_name in self.ordering:
+            value = obj
+            for attr in field_name.lstrip("-").split("__"):
+                try:
+                    value = getattr(value, attr)
+                except ObjectDoesNotExist:
+                    value = None
+                if value is None:
+                    break
+            values.append(value)
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(cursor, list)
+            or len(cursor) != len(self.ordering)
+            or not all(value is None or isinstance(value, str) for value in cursor)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, values):
+        data = json.dumps([None if value is None else str(value) for value in values])
+        return base64.urlsafe_b64encode(data.encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_cursor),
+        )
+
+    def get_paginated_response(self, data):
+        headers = {}
+        if self.total_count is not None:
+            headers[self.total_count_header] = self.total_count
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)]),
+            headers=headers,
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value, from the next link",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page. "
+                "If neither cursor nor page_size is given, the results are not paginated",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.total_count_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Set to false to leave out the {self.total_count_header} header",
+                "schema": {"type": "boolean"},
+            },
+        ]
@@ -4,9 +4,11 @@ import itertools
 from datetime import date, timedelta
 
 from dateutil.relativedelta import relativedelta
+from django.utils import timezone
 from phonenumber_field.serializerfields import (
     PhoneNumberField as DefaultPhoneNumberField,
 )
+from simple_history.utils import get_history_model_for_model
 
 
 def update_object(obj, data, limit_to_fields=None):
@@ -21,6 +23,39 @@ def update_object(obj, data, limit_to_fields=None):
     obj.save()
 
 
+def bulk_delete_with_history(queryset):
+    """
+    Delete the objects in the queryset with a single query and record the deletions in the
+    model's history with a single bulk insert, instead of one history INSERT per object.
+
+    The deletion does not send the delete signals or cascade, so this should only be used
+    for objects that have no dependent objects.
+    """
+    objs = list(queryset)
+    if not objs:
+        return
+    history_model = get_history_model_for_model(queryset.model)
+    history_date = timezone.now()
+    history_model.objects.bulk_create(
+        [
+            history_model(
+                history_date=history_date,
+                history_user=history_model.get_default_history_user(obj),
+                history_type="-",
+                **{
+                    field.attname: getattr(obj, field.attname)
+                    for field in obj._meta.fields
+                    if field.name not in history_model._history_excluded_fields
+                },
+            )
+            for obj in objs
+        ]
+    )
+    queryset.model.objects.filter(pk__in=[obj.pk for obj in objs])._raw_delete(
+        queryset.db
+    )
+
+
 def xgroup(iter, n=2, check_length=False):
     """
     adapted from: comp.lang.python Thu Jun 5 22:58:05 CEST 2003
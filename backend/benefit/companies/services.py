@@ -2,6 +2,7 @@ from requests import HTTPError
 
 from common.utils import update_object
 from companies.models import Company
+from shared.common.lookup_cache import get_or_fetch_company_data
 from shared.service_bus.service_bus_client import ServiceBusClient
 from shared.yrtti.yrtti_client import YRTTIClient
 
@@ -39,10 +40,15 @@ def get_or_create_organisation_with_business_id_via_service_bus(
     """
     Create a company instance using the Palveluväylä integration.
     """
-    sb_client = ServiceBusClient()
 
-    sb_data = sb_client.get_organisation_info_with_business_id(business_id)
-    company_data = sb_client.get_organisation_data_from_service_bus_data(sb_data)
+    def fetch_company_data():
+        sb_client = ServiceBusClient()
+        sb_data = sb_client.get_organisation_info_with_business_id(business_id)
+        return sb_client.get_organisation_data_from_service_bus_data(sb_data)
+
+    company_data = get_or_fetch_company_data(
+        "service_bus", business_id, fetch_company_data
+    )
 
     return get_or_create_company_using_company_data(company_data)
 
@@ -51,9 +57,12 @@ def get_or_create_association_with_business_id(business_id: str) -> Company:
     """
     Create a company instance using the YTJ integration.
     """
-    yrtti_client = YRTTIClient()
 
-    yrtti_data = yrtti_client.get_association_info_with_business_id(business_id)
-    company_data = yrtti_client.get_association_data_from_yrtti_data(yrtti_data)
+    def fetch_company_data():
+        yrtti_client = YRTTIClient()
+        yrtti_data = yrtti_client.get_association_info_with_business_id(business_id)
+        return yrtti_client.get_association_data_from_yrtti_data(yrtti_data)
+
+    company_data = get_or_fetch_company_data("yrtti", business_id, fetch_company_data)
 
     return get_or_create_company_using_company_data(company_data)
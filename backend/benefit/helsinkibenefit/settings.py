@@ -44,6 +44,12 @@ env = environ.Env(
     CSRF_COOKIE_NAME=(str, "yjdhcsrftoken"),
     YTJ_BASE_URL=(str, "http://avoindata.prh.fi/opendata/tr/v1"),
     YTJ_TIMEOUT=(int, 30),
+    HTTP_DEFAULT_TIMEOUT=(int, 10),
+    HTTP_POOL_MAXSIZE=(int, 10),
+    HTTP_MAX_RETRIES=(int, 3),
+    COMPANY_CACHE_TIMEOUT=(int, 60 * 60),
+    COMPANY_NEGATIVE_CACHE_TIMEOUT=(int, 5 * 60),
+    TOKEN_CACHE_TIMEOUT=(int, 5 * 60),
     # Source: YTJ-rajapinnan koodiston kuvaus, available at https://liityntakatalogi.suomi.fi/dataset/xroadytj-services
     # file: suomi_fi_palveluvayla_ytj_rajapinta_koodistot_v1_4.xlsx
     ASSOCIATION_FORM_CODES=(
@@ -96,8 +102,11 @@ env = environ.Env(
     ELASTICSEARCH_PORT=(str, ""),
     ELASTICSEARCH_USERNAME=(str, ""),
     ELASTICSEARCH_PASSWORD=(str, ""),
+    ELASTICSEARCH_BULK_CHUNK_SIZE=(int, 500),
     CLEAR_AUDIT_LOG_ENTRIES=(bool, False),
     ENABLE_SEND_AUDIT_LOG=(bool, False),
+    AUDIT_LOG_BUFFERED=(bool, False),
+    AUDIT_LOG_DEFER_CHANGES=(bool, False),
     EMAIL_USE_TLS=(bool, False),
     EMAIL_HOST=(str, "ema.platta-net.hel.fi"),
     EMAIL_HOST_USER=(str, ""),
@@ -106,6 +115,8 @@ env = environ.Env(
     EMAIL_TIMEOUT=(int, 15),
     DEFAULT_FROM_EMAIL=(str, "Helsinki-lisä <helsinkilisa@hel.fi>"),
     WKHTMLTOPDF_BIN=(str, "/usr/bin/wkhtmltopdf"),
+    PDF_RENDERING_WORKERS=(int, 1),
+    PDF_RENDERING_TIMEOUT=(int, 120),
     DUMMY_COMPANY_FORM_CODE=(
         int,
         YtjOrganizationCode.COMPANY_FORM_CODE_DEFAULT,
@@ -247,6 +258,8 @@ DEFAULT_FROM_EMAIL = env.str("DEFAULT_FROM_EMAIL")
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS")
 CORS_ALLOW_ALL_ORIGINS = env.bool("CORS_ALLOW_ALL_ORIGINS")
+# total count of the paginated application lists, see common.pagination.KeysetPagination
+CORS_EXPOSE_HEADERS = ["X-Total-Count"]
 CSRF_COOKIE_DOMAIN = env.str("CSRF_COOKIE_DOMAIN")
 CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS")
 CSRF_COOKIE_NAME = env.str("CSRF_COOKIE_NAME")
@@ -260,7 +273,10 @@ ELASTICSEARCH_HOST = env("ELASTICSEARCH_HOST")
 ELASTICSEARCH_PORT = env("ELASTICSEARCH_PORT")
 ELASTICSEARCH_USERNAME = env("ELASTICSEARCH_USERNAME")
 ELASTICSEARCH_PASSWORD = env("ELASTICSEARCH_PASSWORD")
+ELASTICSEARCH_BULK_CHUNK_SIZE = env.int("ELASTICSEARCH_BULK_CHUNK_SIZE")
 ENABLE_SEND_AUDIT_LOG = env("ENABLE_SEND_AUDIT_LOG")
+AUDIT_LOG_BUFFERED = env.bool("AUDIT_LOG_BUFFERED")
+AUDIT_LOG_DEFER_CHANGES = env.bool("AUDIT_LOG_DEFER_CHANGES")
 
 LOGGING = {
     "version": 1,
@@ -311,6 +327,17 @@ ASSOCIATION_FORM_CODES = [
 ]
 YTJ_TIMEOUT = env.int("YTJ_TIMEOUT")
 
+# Pooled sessions of the integration clients, see shared.common.http_client
+HTTP_DEFAULT_TIMEOUT = env.int("HTTP_DEFAULT_TIMEOUT")
+HTTP_POOL_MAXSIZE = env.int("HTTP_POOL_MAXSIZE")
+HTTP_MAX_RETRIES = env.int("HTTP_MAX_RETRIES")
+
+# Cache timeouts of the company lookups, see shared.common.lookup_cache
+COMPANY_CACHE_TIMEOUT = env.int("COMPANY_CACHE_TIMEOUT")
+COMPANY_NEGATIVE_CACHE_TIMEOUT = env.int("COMPANY_NEGATIVE_CACHE_TIMEOUT")
+# Cache timeout of the values cached by an access token whose lifetime is not known
+TOKEN_CACHE_TIMEOUT = env.int("TOKEN_CACHE_TIMEOUT")
+
 # Mock flag for testing purposes
 NEXT_PUBLIC_MOCK_FLAG = env.bool("NEXT_PUBLIC_MOCK_FLAG")
 DUMMY_COMPANY_FORM_CODE = env.int("DUMMY_COMPANY_FORM_CODE")
@@ -402,6 +429,10 @@ MAX_UPLOAD_SIZE = 10485760  # 10MB
 MINIMUM_WORKING_HOURS_PER_WEEK = env("MINIMUM_WORKING_HOURS_PER_WEEK")
 
 WKHTMLTOPDF_BIN = env("WKHTMLTOPDF_BIN")
+# Number of documents converted to PDF at the same time in the Ahjo exports, 1 = no parallelism
+PDF_RENDERING_WORKERS = env.int("PDF_RENDERING_WORKERS")
+# Seconds to wait for a single PDF document in the Ahjo exports
+PDF_RENDERING_TIMEOUT = env.int("PDF_RENDERING_TIMEOUT")
 
 TALPA_ROBOT_AUTH_CREDENTIAL = env("TALPA_ROBOT_AUTH_CREDENTIAL")
 
@@ -1,14 +1,18 @@
 import logging
-from functools import cached_property
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 from django.conf import settings
 from django.core import exceptions
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import F, Func
+from django.db.models import Count, F, Func, Max
 from django.db.utils import ProgrammingError
 from django.http import FileResponse, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect
 from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
@@ -38,6 +42,7 @@ from applications.api.v1.serializers import (
 )
 from applications.enums import (
     EmployerApplicationStatus,
+    YouthApplicationEmailType,
     YouthApplicationRejectedReason,
     YouthApplicationStatus,
 )
@@ -46,6 +51,7 @@ from applications.models import (
     EmployerSummerVoucher,
     School,
     YouthApplication,
+    YouthApplicationEmail,
 )
 from common.decorators import enforce_handler_view_adfs_login
 from common.permissions import HandlerPermission
@@ -54,6 +60,9 @@ from shared.vtj.vtj_client import VTJClient
 
 LOGGER = logging.getLogger(__name__)
 
+# Working sorters of the school names by database alias, determined once per process
+_school_name_sorters: Dict[str, Func] = {}
+
 
 class SchoolListView(ListAPIView):
     serializer_class = SchoolSerializer
@@ -85,8 +94,7 @@ class SchoolListView(ListAPIView):
             self.get_sorter("name", collation) for collation in self.get_collations()
         ]
 
-    @cached_property
-    def preferred_sorter(self):
+    def determine_preferred_sorter(self):
         for sorter in self.get_sorters():
             # Try out different order by functions until a functional one is found
             try:
@@ -94,16 +102,63 @@ class SchoolListView(ListAPIView):
                 # "current transaction is aborted, commands ignored until end of
                 # transaction block"
                 with transaction.atomic():
-                    # Force evaluation of queryset to test sorting function
-                    list(School.objects.order_by(sorter.asc()))
+                    # Force evaluation of queryset to test sorting function, the
+                    # collation is checked even if no rows are returned
+                    list(School.objects.order_by(sorter.asc()).values("pk")[:1])
                 return sorter
             except ProgrammingError:  # Collation for encoding does not exist
                 pass
         raise ProgrammingError("Unable to determine working collation for school list")
 
+    @property
+    def preferred_sorter(self):
+        database = School.objects.db
+        if database not in _school_name_sorters:
+            _school_name_sorters[database] = self.determine_preferred_sorter()
+        return _school_name_sorters[database]
+
     def get_queryset(self):
         return School.objects.order_by(self.preferred_sorter.asc())
 
+    def get_school_list_version(self) -> Tuple[int, Optional[datetime]]:
+        """
+        Return the number of schools and the latest modification time of a school,
+        which change whenever a school is added, modified or deleted.
+        """
+        version = School.objects.aggregate(
+            count=Count("pk"), modified_at=Max("modified_at")
+        )
+        return version["count"], version["modified_at"]
+
+    def get_school_names(self, cache_key: str) -> list:
+        """
+        Return the sorted school names. The names are cached with the version of the
+        school list in the cache key, so a changed list is never served from the cache
+        of any process. The unused versions expire after SCHOOL_LIST_CACHE_TIMEOUT.
+        """
+        names = cache.get(cache_key)
+        if names is None:
+            names = list(self.get_serializer(self.get_queryset(), many=True).data)
+            cache.set(cache_key, names, settings.SCHOOL_LIST_CACHE_TIMEOUT)
+        return names
+
+    def list(self, request, *args, **kwargs):
+        count, modified_at = self.get_school_list_version()
+        version = f"{count}-{modified_at.timestamp() if modified_at else 0:f}"
+        etag = quote_etag(version)
+        # NOTE: Deleting a school other than the latest modified one does not change
+        # Last-Modified, but it changes the ETag, which takes precedence in browsers
+        last_modified = int(modified_at.timestamp()) if modified_at else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ) or Response(self.get_school_names(f"{School.LIST_CACHE_KEY}:{version}"))
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # Browsers must revalidate the list, which is cheap with the ETag
+        patch_cache_control(response, no_cache=True)
+        return response
+
     def get_permissions(self):
         permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
@@ -114,6 +169,21 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
     queryset = YouthApplication.objects.all()
     serializer_class = YouthApplicationSerializer
 
+    EMAIL_FAILURE_MESSAGES = {
+        YouthApplicationEmailType.ACTIVATION: _(
+            "Failed to send activation/additional info request email"
+        ),
+        YouthApplicationEmailType.ADDITIONAL_INFO_REQUEST: _(
+            "Failed to send activation/additional info request email"
+        ),
+        YouthApplicationEmailType.PROCESSING: _(
+            "Failed to send manual processing email to handler"
+        ),
+        YouthApplicationEmailType.YOUTH_SUMMER_VOUCHER: _(
+            "Failed to send youth summer voucher email"
+        ),
+    }
+
     def list(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -281,11 +351,34 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
         else:
             return HttpResponse(status=status.HTTP_400_BAD_REQUEST)
 
-    @transaction.atomic
     @action(methods=["get"], detail=True)
-    def activate(self, request, *args, **kwargs) -> HttpResponse:  # noqa: C901
+    def activate(self, request, *args, **kwargs) -> HttpResponse:
         youth_application: YouthApplication = self.get_object()
 
+        with transaction.atomic():
+            response, email = self._activate(request, youth_application)
+
+        # The email is sent after the transaction so that the same person's applications
+        # are not kept locked while waiting for the email server. If the email could
+        # not be sent, the activation is reverted like a rollback would have done.
+        if email is not None and not email.deliver(retry_on_failure=False):
+            youth_application.revert_activation()
+            with translation.override(youth_application.language):
+                return HttpResponse(
+                    self.EMAIL_FAILURE_MESSAGES[email.email_type],
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+        return response
+
+    def _activate(
+        self, request, youth_application: YouthApplication
+    ) -> Tuple[HttpResponse, Optional[YouthApplicationEmail]]:
+        """
+        Activate the youth application and add the email to be sent because of the
+        activation to the outbox.
+
+        :return: The response and the email to be sent, if any.
+        """
         # Lock same person's this year's applications to prevent multiple activations
         same_persons_this_year_apps = (
             YouthApplication.objects.filter(
@@ -302,20 +395,31 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
                 and not youth_application.is_rejected
                 and youth_application.can_set_additional_info
             ):
-                return HttpResponseRedirect(
-                    youth_application.additional_info_page_url(pk=youth_application.pk)
+                return (
+                    HttpResponseRedirect(
+                        youth_application.additional_info_page_url(
+                            pk=youth_application.pk
+                        )
+                    ),
+                    None,
                 )
             else:  # not the active non-rejected one or does not need additional info
-                return HttpResponseRedirect(
-                    youth_application.already_activated_page_url()
+                return (
+                    HttpResponseRedirect(
+                        youth_application.already_activated_page_url()
+                    ),
+                    None,
                 )
         elif youth_application.has_activation_link_expired:
-            return HttpResponseRedirect(youth_application.expired_page_url())
+            return HttpResponseRedirect(youth_application.expired_page_url()), None
         elif youth_application.activate():
             if settings.NEXT_PUBLIC_DISABLE_VTJ:
                 if youth_application.need_additional_info:
-                    return self._set_application_needs_additional_info(
-                        youth_application=youth_application
+                    return (
+                        self._set_application_needs_additional_info(
+                            youth_application=youth_application
+                        ),
+                        None,
                     )
                 LOGGER.info(
                     f"Activated youth application {youth_application.pk}: "
@@ -325,42 +429,37 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
                     YouthApplicationStatus.AWAITING_MANUAL_PROCESSING
                 )
                 youth_application.save()
-                was_email_sent = youth_application.send_processing_email_to_handler(
-                    request
+                return (
+                    HttpResponseRedirect(youth_application.activated_page_url()),
+                    youth_application.enqueue_processing_email_to_handler(request),
                 )
-                if not was_email_sent:
-                    transaction.set_rollback(True)
-                    with translation.override(youth_application.language):
-                        return HttpResponse(
-                            _("Failed to send manual processing email to handler"),
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
             elif youth_application.accept_automatically():
                 LOGGER.info(
                     f"Activated youth application {youth_application.pk}: "
                     "Youth application was accepted automatically using data from VTJ"
                 )
-                was_email_sent = youth_application.youth_summer_voucher.send_youth_summer_voucher_email(
-                    language=youth_application.language
+                return (
+                    HttpResponseRedirect(youth_application.accepted_page_url()),
+                    youth_application.enqueue_youth_summer_voucher_email(
+                        language=youth_application.language
+                    ),
                 )
-                if not was_email_sent:
-                    transaction.set_rollback(True)
-                    with translation.override(youth_application.language):
-                        return HttpResponse(
-                            _("Failed to send youth summer voucher email"),
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
-                return HttpResponseRedirect(youth_application.accepted_page_url())
             elif youth_application.need_additional_info:
-                return self._set_application_needs_additional_info(
-                    youth_application=youth_application
+                return (
+                    self._set_application_needs_additional_info(
+                        youth_application=youth_application
+                    ),
+                    None,
                 )
 
-            return HttpResponseRedirect(youth_application.activated_page_url())
+            return HttpResponseRedirect(youth_application.activated_page_url()), None
 
-        return HttpResponse(
-            status=status.HTTP_401_UNAUTHORIZED,
-            content="Unable to activate youth application",
+        return (
+            HttpResponse(
+                status=status.HTTP_401_UNAUTHORIZED,
+                content="Unable to activate youth application",
+            ),
+            None,
         )
 
     @staticmethod
@@ -390,8 +489,7 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
         )
         return JsonResponse(status=response_status, data=response_data)
 
-    @transaction.atomic
-    def create(self, request, *args, **kwargs):  # noqa: C901
+    def create(self, request, *args, **kwargs):
         try:
             # This function is based on CreateModelMixin class's create function.
             serializer = self.get_serializer(data=request.data, hide_vtj_data=True)
@@ -412,90 +510,117 @@ class YouthApplicationViewSet(AuditLoggingModelViewSet):
                     YouthApplicationRejectedReason.EMAIL_IN_USE
                 )
 
-            # Data was valid and other criteria passed too, so let's create the object
-            self.perform_create(serializer)
+            # Fetch the VTJ JSON data before the transaction, so that the transaction is
+            # not kept open while waiting for VTJ
+            vtj_json = YouthApplication(
+                first_name=serializer.validated_data["first_name"],
+                last_name=serializer.validated_data["last_name"],
+                social_security_number=social_security_number,
+            ).fetch_vtj_json(end_user="")
+
+            with transaction.atomic():
+                response, outbox_email = self._create(request, serializer, vtj_json)
+
+            # The email is sent after the transaction. If it could not be sent, the
+            # created youth application is deleted like a rollback would have done.
+            if outbox_email is not None and not outbox_email.deliver(
+                retry_on_failure=False
+            ):
+                youth_application = serializer.instance
+                youth_application.delete()
+                with translation.override(youth_application.language):
+                    return HttpResponse(
+                        self.EMAIL_FAILURE_MESSAGES[outbox_email.email_type],
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    )
+            return response
+        except ValidationError as e:
+            LOGGER.error(
+                f"Youth application submission rejected because of validation error. "
+                f"Validation error codes: {str(e.get_codes())}"
+            )
+            raise
 
-            # Send the localized activation/additional info request email
-            youth_application = serializer.instance
+    def _create(
+        self, request, serializer, vtj_json
+    ) -> Tuple[HttpResponse, Optional[YouthApplicationEmail]]:
+        """
+        Create the youth application with the VTJ JSON data and add the activation or
+        additional info request email to the outbox.
 
-            # Fetch the VTJ JSON data and save it
-            youth_application.encrypted_original_vtj_json = (
-                youth_application.fetch_vtj_json(end_user="")
-            )
-            youth_application.encrypted_handler_vtj_json = (
-                youth_application.encrypted_original_vtj_json
+        :return: The response and the email to be sent, if any.
+        """
+        # Data was valid and other criteria passed too, so let's create the object
+        self.perform_create(serializer)
+
+        youth_application = serializer.instance
+
+        # Save the VTJ JSON data
+        youth_application.encrypted_original_vtj_json = vtj_json
+        youth_application.encrypted_handler_vtj_json = vtj_json
+        youth_application.save(
+            update_fields=[
+                "encrypted_original_vtj_json",
+                "encrypted_handler_vtj_json",
+            ]
+        )
+
+        # Add the localized activation/additional info request email to the outbox
+        if settings.NEXT_PUBLIC_DISABLE_VTJ:
+            outbox_email = youth_application.enqueue_activation_email(
+                request, youth_application.language
             )
-            youth_application.save(
-                update_fields=[
-                    "encrypted_original_vtj_json",
-                    "encrypted_handler_vtj_json",
-                ]
+        else:  # VTJ integration is enabled
+            request_additional_info = serializer.validated_data.get(
+                "request_additional_information", False
             )
+            if request_additional_info and not youth_application.need_additional_info:
+                transaction.set_rollback(True)
+                with translation.override(youth_application.language):
+                    return (
+                        HttpResponse(
+                            _("Send anyway was used needlessly"),
+                            status=status.HTTP_400_BAD_REQUEST,
+                        ),
+                        None,
+                    )
 
-            if settings.NEXT_PUBLIC_DISABLE_VTJ:
-                was_email_sent = youth_application.send_activation_email(
-                    request, youth_application.language
-                )
-            else:  # VTJ integration is enabled
-                request_additional_info = serializer.validated_data.get(
-                    "request_additional_information", False
-                )
+            if not request_additional_info:
                 if (
-                    request_additional_info
-                    and not youth_application.need_additional_info
+                    not youth_application.is_social_security_number_valid_according_to_vtj
+                    or youth_application.is_applicant_dead_according_to_vtj
                 ):
                     transaction.set_rollback(True)
-                    with translation.override(youth_application.language):
-                        return HttpResponse(
-                            _("Send anyway was used needlessly"),
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-                if not request_additional_info:
-                    if (
-                        not youth_application.is_social_security_number_valid_according_to_vtj
-                        or youth_application.is_applicant_dead_according_to_vtj
-                    ):
-                        transaction.set_rollback(True)
-                        return self.error_response_with_logging(
+                    return (
+                        self.error_response_with_logging(
                             YouthApplicationRejectedReason.INADMISSIBLE_DATA
-                        )
-                    elif not youth_application.is_last_name_as_in_vtj:
-                        transaction.set_rollback(True)
-                        return self.error_response_with_logging(
-                            YouthApplicationRejectedReason.PLEASE_RECHECK_DATA
-                        )
-
-                if youth_application.need_additional_info:
-                    was_email_sent = (
-                        youth_application.send_additional_info_request_email(
-                            request, youth_application.language
-                        )
+                        ),
+                        None,
                     )
-                else:
-                    was_email_sent = youth_application.send_activation_email(
-                        request, youth_application.language
+                elif not youth_application.is_last_name_as_in_vtj:
+                    transaction.set_rollback(True)
+                    return (
+                        self.error_response_with_logging(
+                            YouthApplicationRejectedReason.PLEASE_RECHECK_DATA
+                        ),
+                        None,
                     )
 
-            if not was_email_sent:
-                transaction.set_rollback(True)
-                with translation.override(youth_application.language):
-                    return HttpResponse(
-                        _("Failed to send activation/additional info request email"),
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
+            if youth_application.need_additional_info:
+                outbox_email = youth_application.enqueue_additional_info_request_email(
+                    request, youth_application.language
+                )
+            else:
+                outbox_email = youth_application.enqueue_activation_email(
+                    request, youth_application.language
+                )
 
-            # Return success creating the object
-            headers = self.get_success_headers(serializer.data)
-            return Response(
-                serializer.data, status=status.HTTP_201_CREATED, headers=headers
-            )
-        except ValidationError as e:
-            LOGGER.error(
-                f"Youth application submission rejected because of validation error. "
-                f"Validation error codes: {str(e.get_codes())}"
-            )
-            raise
+        # Return success creating the object
+        headers = self.get_success_headers(serializer.data)
+        return (
+            Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers),
+            outbox_email,
+        )
 
 
 class EmployerApplicationViewSet(AuditLoggingModelViewSet):
@@ -145,6 +145,20 @@ class YouthApplicationStatus(models.TextChoices):
         )
 
 
+class YouthApplicationEmailType(models.TextChoices):
+    ACTIVATION = "activation", _("Activation")
+    ADDITIONAL_INFO_REQUEST = "additional_info_request", _("Additional info request")
+    PROCESSING = "processing", _("Processing email to handler")
+    YOUTH_SUMMER_VOUCHER = "youth_summer_voucher", _("Youth summer voucher")
+
+
+class YouthApplicationEmailStatus(models.TextChoices):
+    PENDING = "pending", _("Pending")
+    SENDING = "sending", _("Sending")
+    SENT = "sent", _("Sent")
+    FAILED = "failed", _("Failed")
+
+
 class AdditionalInfoUserReason(models.TextChoices):
     STUDENT_IN_HELSINKI_BUT_NOT_RESIDENT = "student_in_helsinki_but_not_resident", _(
         "Student in Helsinki but not resident"
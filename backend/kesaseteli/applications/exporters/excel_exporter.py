@@ -1,16 +1,16 @@
+import functools
 import io
-from typing import Iterable, List, NamedTuple
+from typing import Dict, Iterable, List, NamedTuple, Optional
 
-from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.shortcuts import reverse
-from django.utils import timezone
+from django.utils import timezone, translation
 from django.utils.translation import gettext_lazy as _
 from xlsxwriter import Workbook
 from xlsxwriter.worksheet import Worksheet
 
 from applications.enums import ExcelColumns
-from applications.models import EmployerSummerVoucher
+from applications.models import Attachment, EmployerSummerVoucher
 from common.utils import getattr_nested
 
 
@@ -295,11 +295,60 @@ def set_header_and_formatting(
     ws.set_column(column, column, field.width, cell_format)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_attachment_path_template() -> str:
+    """
+    Return the path of an attachment with {pk} and {attachment_pk} placeholders. The
+    URL configuration does not change, so the path is only reversed once.
+    """
+    pk_placeholder = "00000000-0000-0000-0000-000000000001"
+    attachment_pk_placeholder = "00000000-0000-0000-0000-000000000002"
+    path = reverse(
+        "v1:employersummervoucher-handle-attachment",
+        kwargs={"pk": pk_placeholder, "attachment_pk": attachment_pk_placeholder},
+    )
+    return path.replace(pk_placeholder, "{pk}").replace(
+        attachment_pk_placeholder, "{attachment_pk}"
+    )
+
+
+def get_attachment_uri_template(request: HttpRequest) -> str:
+    """
+    Return the absolute URI of an attachment with {pk} and {attachment_pk} placeholders,
+    so that the URIs of the attachments can be formatted without reversing the URL and
+    building the absolute URI for each of them.
+    """
+    return request.build_absolute_uri("/").rstrip("/") + _get_attachment_path_template()
+
+
+def get_attachments_by_type(
+    summer_voucher: EmployerSummerVoucher,
+) -> Dict[str, List[Attachment]]:
+    """
+    Return the summer voucher's attachments grouped by their type and ordered by their
+    creation time and primary key, so that the attachments created at the same time
+    are always in the same order. The prefetched attachments are used and they are
+    grouped only once for each summer voucher.
+    """
+    attachments_by_type = summer_voucher.__dict__.get("_attachments_by_type")
+    if attachments_by_type is None:
+        attachments_by_type = {}
+        for attachment in sorted(
+            summer_voucher.attachments.all(), key=lambda a: (a.created_at, a.pk)
+        ):
+            attachments_by_type.setdefault(attachment.attachment_type, []).append(
+                attachment
+            )
+        summer_voucher._attachments_by_type = attachments_by_type
+    return attachments_by_type
+
+
 def get_attachment_uri(
     summer_voucher: EmployerSummerVoucher,
     field: ExcelField,
     value,
     request: HttpRequest,
+    attachment_uri_template: Optional[str] = None,
 ):
     field_name = field.title
     attachment_number = int(field_name.split(" ")[-1])
@@ -310,21 +359,17 @@ def get_attachment_uri(
     elif attachment_type == "Palkkalaskelma":
         attachment_type = "payslip"
 
-    # Get attachment of type `attachment_type` and use the OFFSET and LIMIT to get only the n'th entry
-    # where n is `attachment_number`.
-    attachment = (
-        value.filter(attachment_type=attachment_type)
-        .order_by("created_at")[attachment_number - 1 : attachment_number]  # noqa
-        .first()
-    )
-    if not attachment:
+    # Get the n'th attachment of type `attachment_type` where n is `attachment_number`
+    attachments = get_attachments_by_type(summer_voucher).get(attachment_type, [])
+    if len(attachments) < attachment_number:
         return ""
+    attachment = attachments[attachment_number - 1]
 
-    path = reverse(
-        "v1:employersummervoucher-handle-attachment",
-        kwargs={"pk": summer_voucher.id, "attachment_pk": attachment.id},
+    if attachment_uri_template is None:
+        attachment_uri_template = get_attachment_uri_template(request)
+    return attachment_uri_template.format(
+        pk=summer_voucher.id, attachment_pk=attachment.id
     )
-    return request.build_absolute_uri(path)
 
 
 def handle_special_cases(
@@ -333,11 +378,14 @@ def handle_special_cases(
     summer_voucher: EmployerSummerVoucher,
     field: ExcelField,
     request: HttpRequest,
+    attachment_uri_template: Optional[str] = None,
 ):
     if isinstance(value, bool):
         value = str(_("Kyllä")) if value else str(_("Ei"))
     elif attr_str == "attachments":
-        value = get_attachment_uri(summer_voucher, field, value, request)
+        value = get_attachment_uri(
+            summer_voucher, field, value, request, attachment_uri_template
+        )
     elif "application__invoicer" in attr_str and getattr(
         summer_voucher, "application", None
     ):
@@ -349,8 +397,10 @@ def generate_data_row(
     summer_voucher: EmployerSummerVoucher,
     fields: List[ExcelField],
     request: HttpRequest,
-    is_template: bool = False,
+    attachment_uri_template: Optional[str] = None,
 ) -> list:
+    if attachment_uri_template is None:
+        attachment_uri_template = get_attachment_uri_template(request)
     result = []
     for column_number, field in enumerate(fields):
         if field.title == ORDER_FIELD_TITLE:
@@ -363,17 +413,17 @@ def generate_data_row(
             for attr_str in attr_names:
                 value = getattr_nested(summer_voucher, attr_str.split("__"))
                 value = handle_special_cases(
-                    value, attr_str, summer_voucher, field, request
+                    value,
+                    attr_str,
+                    summer_voucher,
+                    field,
+                    request,
+                    attachment_uri_template,
                 )
                 values.append(value)
 
             cell_value = field.value % tuple(values)
 
-        if is_template and cell_value in [None, ""]:
-            # Assume string type for empty values in template and
-            # place a placeholder for xlsx-streaming package to infer cell type from
-            cell_value = "placeholder value"
-
         result.append(cell_value)
 
     return result
@@ -383,62 +433,55 @@ def generate_data_rows(
     summer_vouchers: Iterable[EmployerSummerVoucher],
     fields: List[ExcelField],
     request: HttpRequest,
-    is_template: bool = False,
 ):
+    attachment_uri_template = get_attachment_uri_template(request)
     return (
-        generate_data_row(summer_voucher, fields, request, is_template)
+        generate_data_row(summer_voucher, fields, request, attachment_uri_template)
         for summer_voucher in summer_vouchers
     )
 
 
-def write_data_row(
-    ws: Worksheet,
-    row_number: int,
-    summer_voucher: EmployerSummerVoucher,
-    fields: List[ExcelField],
-    request: HttpRequest,
-    is_template: bool = False,
-):
-    data_row = generate_data_row(summer_voucher, fields, request, is_template)
-    for column_number, cell_value in enumerate(data_row):
-        ws.write(row_number, column_number, cell_value)
+def generate_template_row(fields: List[ExcelField]) -> list:
+    """
+    Generate a row with a value of the right type for each field. The xlsx-streaming
+    package uses the row of the template for determining the column types (supports
+    at least boolean, integer and string types) in Excel output. The order is the only
+    numeric column, all the other values are written as strings.
+    """
+    return [
+        0 if field.title == ORDER_FIELD_TITLE else "placeholder value"
+        for field in fields
+    ]
 
 
-def populate_workbook(
-    wb: Workbook,
-    summer_vouchers: QuerySet[EmployerSummerVoucher],
-    columns: ExcelColumns,
-    request: HttpRequest,
-    is_template: bool = False,
-):
+def populate_template_workbook(wb: Workbook, columns: ExcelColumns):
     """
-    Fill the workbook with information from the summer vouchers queryset. Field names and values are
-    fetched from the FIELDS tuple.
+    Fill the workbook with the header and the template row of the exported fields.
+    Field names and types are fetched from the FIELDS tuple.
     """
     ws = wb.add_worksheet(name=str(_("Setelit")))
-    wrapped_cell_format = wb.add_format()
-    wrapped_cell_format.set_text_wrap()
-
     header_format = wb.add_format({"bold": True})
     exportable_fields = get_exportable_fields(columns)
     for column, field in enumerate(exportable_fields):
         set_header_and_formatting(wb, ws, column, field, header_format)
-    for row_number, summer_voucher in enumerate(summer_vouchers, 1):
-        write_data_row(
-            ws, row_number, summer_voucher, exportable_fields, request, is_template
-        )
+    for column_number, cell_value in enumerate(
+        generate_template_row(exportable_fields)
+    ):
+        ws.write(1, column_number, cell_value)
     wb.close()
 
 
-def generate_xlsx_template(
-    summer_vouchers: QuerySet[EmployerSummerVoucher],
-    columns: ExcelColumns,
-    request: HttpRequest,
-):
+@functools.lru_cache(maxsize=None)
+def _generate_xlsx_template(columns: ExcelColumns, language: str) -> bytes:
     output = io.BytesIO()
-    wb = Workbook(output)
-    # Use the first row in the queryset to generate the .xlsx template for the
-    # xlsx-streaming package which uses the template for determining column names and
-    # types (supports at least boolean, integer and string types) in Excel output
-    populate_workbook(wb, summer_vouchers[0:1], columns, request, is_template=True)
-    return output
+    populate_template_workbook(Workbook(output), columns)
+    return output.getvalue()
+
+
+def generate_xlsx_template(columns: ExcelColumns) -> io.BytesIO:
+    """
+    Generate the .xlsx template for the xlsx-streaming package. The template does not
+    depend on the exported summer vouchers, so the export queryset is only evaluated
+    once, while streaming, and the template is generated once per columns and language.
+    """
+    return io.BytesIO(_generate_xlsx_template(columns, translation.get_language()))
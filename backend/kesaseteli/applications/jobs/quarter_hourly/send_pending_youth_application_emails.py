@@ -0,0 +1,16 @@
+import logging
+
+from django_extensions.management.jobs import QuarterHourlyJob
+
+from applications.models import YouthApplicationEmail
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Job(QuarterHourlyJob):
+    help = "Send the youth application emails left pending in the outbox."
+
+    def execute(self):
+        LOGGER.info("Sending pending youth application emails...")
+        sent_count = YouthApplicationEmail.send_pending()
+        LOGGER.info(f"Sent {sent_count} pending youth application emails.")
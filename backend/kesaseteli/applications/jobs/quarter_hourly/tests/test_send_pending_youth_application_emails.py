@@ -0,0 +1,67 @@
+import pytest
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+
+from applications.enums import YouthApplicationEmailStatus, YouthApplicationEmailType
+from applications.jobs.quarter_hourly import send_pending_youth_application_emails
+from applications.models import YouthApplicationEmail
+from common.tests.factories import InactiveYouthApplicationFactory
+
+
+def enqueue_activation_email(age=None) -> YouthApplicationEmail:
+    outbox_email = YouthApplicationEmail.enqueue(
+        youth_application=InactiveYouthApplicationFactory(),
+        email_type=YouthApplicationEmailType.ACTIVATION,
+        language="fi",
+        link="https://example.com/activate/",
+    )
+    if age is not None:
+        YouthApplicationEmail.objects.filter(pk=outbox_email.pk).update(
+            modified_at=timezone.now() - age, last_attempt_at=timezone.now() - age
+        )
+    return outbox_email
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+def test_send_pending_youth_application_emails():
+    old_pending_email = enqueue_activation_email(age=YouthApplicationEmail.RETRY_DELAY)
+    new_pending_email = enqueue_activation_email()
+    interrupted_email = enqueue_activation_email(
+        age=YouthApplicationEmail.SENDING_TIMEOUT
+    )
+    interrupted_email.status = YouthApplicationEmailStatus.SENDING
+    interrupted_email.save(update_fields=["status"])
+
+    send_pending_youth_application_emails.Job().execute()
+
+    for outbox_email, expected_status in [
+        (old_pending_email, YouthApplicationEmailStatus.SENT),
+        # Being sent by the request that added it
+        (new_pending_email, YouthApplicationEmailStatus.PENDING),
+        (interrupted_email, YouthApplicationEmailStatus.PENDING),
+    ]:
+        outbox_email.refresh_from_db()
+        assert outbox_email.status == expected_status
+    assert len(mail.outbox) == 1
+    assert "https://example.com/activate/" in mail.outbox[0].body
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    EMAIL_HOST="",  # Use inexistent email host to ensure emails will never go anywhere
+)
+def test_send_pending_youth_application_emails_fails_after_max_attempts():
+    outbox_email = enqueue_activation_email()
+
+    for attempt in range(1, YouthApplicationEmail.MAX_ATTEMPTS + 1):
+        YouthApplicationEmail.objects.filter(pk=outbox_email.pk).update(
+            modified_at=timezone.now() - YouthApplicationEmail.RETRY_DELAY
+        )
+        assert YouthApplicationEmail.send_pending() == 0
+        outbox_email.refresh_from_db()
+        assert outbox_email.attempts == attempt
+
+    assert outbox_email.status == YouthApplicationEmailStatus.FAILED
@@ -1,4 +1,9 @@
-from django.core.management.base import BaseCommand
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
 
 from applications.enums import YouthApplicationStatus
 from applications.models import YouthApplication
@@ -16,33 +21,146 @@ class Command(BaseCommand):
         parser.add_argument(
             "--id", type=str, help="UUID of a single youth application to send"
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of vouchers sent using the same email server connection",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of batches sent in parallel",
+        )
+        parser.add_argument(
+            "--checkpoint-file",
+            type=str,
+            help="File where the progress is saved after each batch. If the file "
+            "exists, sending is resumed after the last youth application saved in it",
+        )
 
-    def handle(self, dry_run, id, *args, **options):
-        apps = YouthApplication.objects.filter(status=YouthApplicationStatus.ACCEPTED)
-        if id:
-            # Only a single voucher is sent
-            apps = apps.filter(id=id)
+    @staticmethod
+    def _batches(apps, batch_size):
+        last_pk = None
+        while True:
+            batch_apps = apps if last_pk is None else apps.filter(pk__gt=last_pk)
+            batch = list(batch_apps[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1].pk
 
-        for app in apps:
-            if app.has_youth_summer_voucher:
-                if dry_run:
-                    ok = True
-                else:
-                    ok = app.youth_summer_voucher.send_youth_summer_voucher_email(
-                        language=app.language, send_to_youth=False, send_to_handler=True
-                    )
+    @staticmethod
+    def _create_emails(batch):
+        """
+        Create the emails of the batch. The database is only used here, in the main
+        thread, so that the workers only need the email server connection.
+        """
+        return [
+            app.youth_summer_voucher.youth_summer_voucher_email(
+                language=app.language, send_to_youth=False, send_to_handler=True
+            )
+            if app.has_youth_summer_voucher
+            else None
+            for app in batch
+        ]
 
-                if ok:
-                    self.stdout.write(self.style.SUCCESS(f"Sent {app.id}"))
-                else:
-                    self.stdout.write(
-                        self.style.ERROR(f"EMAIL ERROR: {app.pk} failed when sending!")
-                    )
-            else:
+    @staticmethod
+    def _send_emails(emails, dry_run):
+        """
+        Send the emails of a batch using one email server connection.
+
+        :return: For each email, True if it was sent, False if sending failed, or None
+                 if there was no email to send.
+        """
+        if dry_run:
+            return [None if email is None else True for email in emails]
+        with get_connection(fail_silently=True) as connection:
+            return [
+                None if email is None else connection.send_messages([email]) == 1
+                for email in emails
+            ]
+
+    def _report_batch(self, batch, results, checkpoint_file) -> bool:
+        """
+        Report the results of the batch and move the checkpoint past the batch, if all
+        its emails were sent.
+
+        :return: False if sending any email of the batch failed, otherwise True.
+        """
+        for app, ok in zip(batch, results):
+            if ok is None:
                 self.stdout.write(
                     self.style.ERROR(
                         f"VOUCHER ERROR: {app.pk} does not have a youth summer voucher!"
                     )
                 )
+            elif ok:
+                self.stdout.write(self.style.SUCCESS(f"Sent {app.id}"))
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"EMAIL ERROR: {app.pk} failed when sending!")
+                )
+        if False in results:
+            return False
+        if checkpoint_file:
+            Path(checkpoint_file).write_text(str(batch[-1].pk))
+        return True
+
+    def handle(
+        self,
+        dry_run,
+        id,
+        batch_size,
+        workers,
+        checkpoint_file,
+        *args,
+        **options,
+    ):
+        apps = (
+            YouthApplication.objects.filter(status=YouthApplicationStatus.ACCEPTED)
+            .select_related("youth_summer_voucher")
+            .order_by("pk")
+        )
+        if id:
+            # Only a single voucher is sent
+            apps = apps.filter(id=id)
+        if checkpoint_file and Path(checkpoint_file).exists():
+            last_pk = Path(checkpoint_file).read_text().strip()
+            self.stdout.write(f"Resuming after {last_pk}")
+            apps = apps.filter(pk__gt=last_pk)
+
+        processed_count = 0
+        failed = False
+        # The batches are reported in order, so that the checkpoint is only moved past
+        # a batch after all the batches before it have been sent
+        sending_batches = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch in self._batches(apps, batch_size):
+                future = executor.submit(
+                    self._send_emails, self._create_emails(batch), dry_run
+                )
+                sending_batches.append((batch, future))
+                if len(sending_batches) >= workers:
+                    batch, future = sending_batches.popleft()
+                    if not self._report_batch(batch, future.result(), checkpoint_file):
+                        failed = True
+                        break
+                    processed_count += len(batch)
+            while sending_batches and not failed:
+                batch, future = sending_batches.popleft()
+                if not self._report_batch(batch, future.result(), checkpoint_file):
+                    failed = True
+                    break
+                processed_count += len(batch)
+            # Do not start sending the batches after the failed one
+            for _, future in sending_batches:
+                future.cancel()
 
-        self.stdout.write(self.style.SUCCESS(f"Processed {apps.count()} vouchers"))
+        if failed:
+            raise CommandError(
+                f"Sending failed after {processed_count} vouchers, the batch that "
+                f"failed and the ones after it were not saved in the checkpoint"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed_count} vouchers"))
@@ -0,0 +1,131 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0032_alter_employersummervoucher_target_group"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="YouthApplicationEmail",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="time created"
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(auto_now=True, verbose_name="time modified"),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "email_type",
+                    models.CharField(
+                        choices=[
+                            ("activation", "Activation"),
+                            ("additional_info_request", "Additional info request"),
+                            ("processing", "Processing email to handler"),
+                            ("youth_summer_voucher", "Youth summer voucher"),
+                        ],
+                        max_length=64,
+                        verbose_name="email type",
+                    ),
+                ),
+                (
+                    "language",
+                    models.CharField(
+                        choices=[("fi", "suomi"), ("sv", "svenska"), ("en", "english")],
+                        default="fi",
+                        max_length=2,
+                    ),
+                ),
+                (
+                    "link",
+                    models.URLField(
+                        blank=True,
+                        help_text="Activation or processing link included in the email",
+                        max_length=2048,
+                        verbose_name="link",
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        max_length=256, unique=True, verbose_name="idempotency key"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sending", "Sending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=64,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="sending attempts"
+                    ),
+                ),
+                (
+                    "last_attempt_at",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="time of the last sending attempt",
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="time sent"
+                    ),
+                ),
+                (
+                    "youth_application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="emails",
+                        to="applications.youthapplication",
+                        verbose_name="youth application",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "youth application email",
+                "verbose_name_plural": "youth application emails",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="youthapplicationemail",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "sending"])),
+                fields=["modified_at"],
+                name="youth_app_email_unsent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.2.4 on 2026-10-18 21:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_submitted_at(apps, schema_editor):
+    """
+    Set submitted_at of the submitted applications' summer vouchers to the newest
+    history entry of the summer voucher, which the Excel export has used so far. The
+    summer vouchers of the handled applications get the time the application was
+    last submitted.
+    """
+    EmployerSummerVoucher = apps.get_model("applications", "EmployerSummerVoucher")
+    HistoricalEmployerSummerVoucher = apps.get_model(
+        "applications", "HistoricalEmployerSummerVoucher"
+    )
+    HistoricalEmployerApplication = apps.get_model(
+        "applications", "HistoricalEmployerApplication"
+    )
+    EmployerSummerVoucher.objects.filter(application__status="submitted").update(
+        submitted_at=Subquery(
+            HistoricalEmployerSummerVoucher.objects.filter(id=OuterRef("id"))
+            .order_by("-modified_at")
+            .values("modified_at")[:1]
+        )
+    )
+    EmployerSummerVoucher.objects.filter(submitted_at__isnull=True).exclude(
+        application__status="draft"
+    ).update(
+        submitted_at=Subquery(
+            HistoricalEmployerApplication.objects.filter(
+                id=OuterRef("application_id"), status="submitted"
+            )
+            .order_by("-modified_at")
+            .values("modified_at")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("applications", "0033_youthapplicationemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employersummervoucher",
+            name="submitted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Time the summer voucher was last submitted",
+                null=True,
+                verbose_name="time submitted",
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalemployersummervoucher",
+            name="submitted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Time the summer voucher was last submitted",
+                null=True,
+                verbose_name="time submitted",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employersummervoucher",
+            index=models.Index(
+                fields=["submitted_at", "created_at", "id"],
+                name="summer_voucher_submitted_idx",
+            ),
+        ),
+        migrations.RunPython(set_submitted_at, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
+import functools
 import json
+import logging
 from datetime import date, datetime, timedelta
 from email.mime.image import MIMEImage
 from pathlib import Path
@@ -9,9 +11,10 @@ import jsonpath_ng
 import sequences
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.mail import EmailMultiAlternatives
 from django.core.validators import MinValueValidator
 from django.db import models, transaction
-from django.db.models import Q
+from django.db.models import F, Q
 from django.template.loader import get_template
 from django.urls import reverse
 from django.utils import timezone, translation
@@ -29,6 +32,8 @@ from applications.enums import (
     HiredWithoutVoucherAssessment,
     SummerVoucherExceptionReason,
     VtjTestCase,
+    YouthApplicationEmailStatus,
+    YouthApplicationEmailType,
     YouthApplicationStatus,
 )
 from applications.tests.data.mock_vtj import (
@@ -40,6 +45,7 @@ from common.urls import handler_youth_application_processing_url
 from common.utils import (
     are_same_text_lists,
     are_same_texts,
+    create_mail,
     send_mail_with_error_logging,
     validate_finnish_social_security_number,
 )
@@ -56,12 +62,26 @@ from shared.models.abstract_models import HistoricalModel, TimeStampedModel, UUI
 from shared.models.mixins import LockForUpdateMixin
 from shared.vtj.vtj_client import VTJClient
 
+LOGGER = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_jsonpath(jsonpath_expression: str):
+    """
+    Return the compiled jsonpath expression. The expressions are constant, so they
+    are compiled once per process instead of on every evaluation.
+    """
+    return jsonpath_ng.parse(jsonpath_expression)
+
 
 class School(TimeStampedModel, UUIDModel):
     """
     List of active schools.
     """
 
+    # Cache key prefix of the sorted school list served by SchoolListView
+    LIST_CACHE_KEY = "applications:school_list"
+
     name = models.CharField(
         max_length=256, unique=True, db_index=True, validators=[validate_name]
     )
@@ -330,15 +350,31 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
                 VTJClient().get_personal_info(self.social_security_number, end_user)
             )
 
+    @property
+    def _original_vtj_data(self):
+        """
+        The parsed encrypted_original_vtj_json, or None if it is not valid JSON. The
+        field is only parsed again if it has been changed since the last parsing.
+        """
+        vtj_json = self.encrypted_original_vtj_json
+        cached = self.__dict__.get("_original_vtj_data_cache")
+        if cached is None or cached[0] is not vtj_json:
+            try:
+                vtj_data = json.loads(vtj_json)
+            except (json.decoder.JSONDecodeError, TypeError):
+                vtj_data = None
+            cached = (vtj_json, vtj_data)
+            self._original_vtj_data_cache = cached
+        return cached[1]
+
     def _vtj_values(self, jsonpath_expression) -> list:
-        try:
-            vtj_json = json.loads(self.encrypted_original_vtj_json)
-        except (json.decoder.JSONDecodeError, TypeError):
+        vtj_data = self._original_vtj_data
+        if vtj_data is None:
             return []
 
         return [
             match.value
-            for match in jsonpath_ng.parse(jsonpath_expression).find(vtj_json)
+            for match in _compile_jsonpath(jsonpath_expression).find(vtj_data)
         ]
 
     def handler_processing_url(self):
@@ -461,11 +497,16 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
         :param language: The language to be used in the email
         :return: True if email was sent, otherwise False.
         """
+        return self._send_additional_info_request_email(
+            language=language, activation_link=self._activation_link(request)
+        )
+
+    def _send_additional_info_request_email(self, language, activation_link) -> bool:
         return send_mail_with_error_logging(
             subject=YouthApplication.additional_info_request_email_subject(language),
             message=YouthApplication._additional_info_request_email_message(
                 language=language,
-                activation_link=self._activation_link(request),
+                activation_link=activation_link,
             ),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[self.email],
@@ -482,11 +523,16 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
         :param language: The activation email language to be used
         :return: True if email was sent, otherwise False.
         """
+        return self._send_activation_email(
+            language=language, activation_link=self._activation_link(request)
+        )
+
+    def _send_activation_email(self, language, activation_link) -> bool:
         return send_mail_with_error_logging(
             subject=YouthApplication.activation_email_subject(language),
             message=YouthApplication._activation_email_message(
                 language=language,
-                activation_link=self._activation_link(request),
+                activation_link=activation_link,
             ),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[self.email],
@@ -500,9 +546,12 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
         :param request: Request used for generating the processing link
         :return: True if email was sent, otherwise False.
         """
+        return self._send_processing_email_to_handler(self._processing_link(request))
+
+    def _send_processing_email_to_handler(self, processing_link) -> bool:
         return send_mail_with_error_logging(
             subject=self.processing_email_subject(),
-            message=self._processing_email_message(self._processing_link(request)),
+            message=self._processing_email_message(processing_link),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[settings.HANDLER_EMAIL],
             error_message=_(
@@ -510,6 +559,62 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
             ),
         )
 
+    def enqueue_activation_email(self, request, language) -> "YouthApplicationEmail":
+        """
+        Add youth application's activation email with given language to the outbox.
+
+        :param request: Request used for generating the activation link
+        :param language: The activation email language to be used
+        """
+        return YouthApplicationEmail.enqueue(
+            youth_application=self,
+            email_type=YouthApplicationEmailType.ACTIVATION,
+            language=language,
+            link=self._activation_link(request),
+        )
+
+    def enqueue_additional_info_request_email(
+        self, request, language
+    ) -> "YouthApplicationEmail":
+        """
+        Add youth application's additional info request email with given language to
+        the outbox.
+
+        :param request: Request used for generating the activation link
+        :param language: The language to be used in the email
+        """
+        return YouthApplicationEmail.enqueue(
+            youth_application=self,
+            email_type=YouthApplicationEmailType.ADDITIONAL_INFO_REQUEST,
+            language=language,
+            link=self._activation_link(request),
+        )
+
+    def enqueue_processing_email_to_handler(self, request) -> "YouthApplicationEmail":
+        """
+        Add youth application's manual processing email to the handler to the outbox.
+
+        :param request: Request used for generating the processing link
+        """
+        return YouthApplicationEmail.enqueue(
+            youth_application=self,
+            email_type=YouthApplicationEmailType.PROCESSING,
+            language="fi",
+            link=self._processing_link(request),
+        )
+
+    def enqueue_youth_summer_voucher_email(self, language) -> "YouthApplicationEmail":
+        """
+        Add the youth summer voucher email with given language to the outbox.
+
+        :param language: The language to be used in the email
+        """
+        return YouthApplicationEmail.enqueue(
+            youth_application=self,
+            email_type=YouthApplicationEmailType.YOUTH_SUMMER_VOUCHER,
+            language=language,
+        )
+
     @property
     def is_active(self) -> bool:
         return self.receipt_confirmed_at is not None
@@ -530,6 +635,43 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
             self.save()
         return self.is_active
 
+    @transaction.atomic
+    def revert_activation(self) -> bool:
+        """
+        Revert the activation of this youth application and the handling done during
+        the activation, i.e. the automatic acceptance and the youth summer voucher.
+        Used if the email sent because of the activation could not be sent.
+
+        The activation is only reverted if the youth application's status, handler and
+        receipt_confirmed_at still have the values set by the activation, i.e. if the
+        youth application has not been changed after the activation was committed.
+
+        NOTE: The serial number of the deleted youth summer voucher is not reused.
+
+        :return: True if the activation was reverted, otherwise False.
+        """
+        locked_application = self.lock_for_update()
+        if (
+            locked_application.status != self.status
+            or locked_application.handler_id != self.handler_id
+            or locked_application.receipt_confirmed_at != self.receipt_confirmed_at
+        ):
+            LOGGER.warning(
+                f"Activation of youth application {self.pk} was not reverted because "
+                f"the youth application has been changed after the activation"
+            )
+            return False
+
+        YouthSummerVoucher.objects.filter(youth_application=self).delete()
+        self._state.fields_cache.pop("youth_summer_voucher", None)
+        self.receipt_confirmed_at = None
+        self.status = YouthApplicationStatus.SUBMITTED
+        self.handler = None
+        self.handled_at = None
+        self.encrypted_handler_vtj_json = self.encrypted_original_vtj_json
+        self.save()
+        return True
+
     def _set_handler(self, handler, automatic_handling):
         try:
             self.handler = handler
@@ -872,7 +1014,13 @@ class YouthSummerVoucher(HistoricalModel, TimeStampedModel, UUIDModel):
             return gettext("Vuoden %(year)s Kesäsetelisi") % {"year": self.year}
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _template_image(filename, content_id) -> MIMEImage:
+        """
+        Return the image read from the templates/images folder. The images are read and
+        encoded once per process, and the same image objects are attached to all the
+        emails, which does not modify them.
+        """
         source_folder = Path(__file__).resolve().parent / "templates" / "images"
         with open(source_folder / filename, "rb") as file:
             data = file.read()
@@ -892,22 +1040,14 @@ class YouthSummerVoucher(HistoricalModel, TimeStampedModel, UUIDModel):
             content_id="helsinki_logo",
         )
 
-    def send_youth_summer_voucher_email(
-        self, language, send_to_youth=True, send_to_handler=True
-    ) -> bool:
-        """
-        Send youth summer voucher email with given language to the applicant.
-
-        :param language: The language to be used in the email
-        :param send_to_youth: Send the voucher to youth's email
-        :param send_to_handler: Send a copy of the voucher to the handler email
-        :return: True if email was sent, otherwise False.
-        """
+    def _youth_summer_voucher_email_kwargs(
+        self, language, send_to_youth, send_to_handler
+    ) -> Optional[dict]:
         recipient_list = [self.youth_application.email] if send_to_youth else None
         bcc = [settings.HANDLER_EMAIL] if send_to_handler else None
 
         if not (recipient_list or bcc):
-            return False
+            return None
 
         with translation.override(language):
             context = {
@@ -920,13 +1060,12 @@ class YouthSummerVoucher(HistoricalModel, TimeStampedModel, UUIDModel):
                 "email": self.youth_application.email,
                 "year": self.year,
             }
-            return send_mail_with_error_logging(
+            return dict(
                 subject=self.email_subject(language),
                 message=get_template("youth_summer_voucher_email.txt").render(context),
                 from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=recipient_list,
                 bcc=bcc,
-                error_message=_("Unable to send youth summer voucher email"),
                 html_message=get_template("youth_summer_voucher_email.html").render(
                     context
                 ),
@@ -936,12 +1075,268 @@ class YouthSummerVoucher(HistoricalModel, TimeStampedModel, UUIDModel):
                 ],
             )
 
+    def youth_summer_voucher_email(
+        self, language, send_to_youth=True, send_to_handler=True
+    ) -> Optional[EmailMultiAlternatives]:
+        """
+        Create youth summer voucher email with given language, e.g. for sending it
+        with a connection shared by several emails.
+
+        :param language: The language to be used in the email
+        :param send_to_youth: Send the voucher to youth's email
+        :param send_to_handler: Send a copy of the voucher to the handler email
+        :return: The email, or None if there are no recipients.
+        """
+        email_kwargs = self._youth_summer_voucher_email_kwargs(
+            language, send_to_youth, send_to_handler
+        )
+        if email_kwargs is None:
+            return None
+        return create_mail(**email_kwargs)
+
+    def send_youth_summer_voucher_email(
+        self, language, send_to_youth=True, send_to_handler=True
+    ) -> bool:
+        """
+        Send youth summer voucher email with given language to the applicant.
+
+        :param language: The language to be used in the email
+        :param send_to_youth: Send the voucher to youth's email
+        :param send_to_handler: Send a copy of the voucher to the handler email
+        :return: True if email was sent, otherwise False.
+        """
+        email_kwargs = self._youth_summer_voucher_email_kwargs(
+            language, send_to_youth, send_to_handler
+        )
+        if email_kwargs is None:
+            return False
+        return send_mail_with_error_logging(
+            error_message=_("Unable to send youth summer voucher email"),
+            **email_kwargs,
+        )
+
     class Meta:
         verbose_name = _("youth summer voucher")
         verbose_name_plural = _("youth summer vouchers")
         ordering = ["summer_voucher_serial_number"]
 
 
+class YouthApplicationEmail(TimeStampedModel, UUIDModel):
+    """
+    Outbox of the emails sent about youth applications.
+
+    The email is added to the outbox in the same transaction as the change of the youth
+    application it is about, and sent after the transaction has been committed, so that
+    no database transaction or row lock is held while waiting for the email server.
+
+    The status changes from PENDING to SENDING when a process claims the email for
+    sending, and then to SENT, or back to PENDING to be retried by the
+    send_pending_youth_application_emails job. After MAX_ATTEMPTS failed attempts, or if
+    the sender does not want it to be retried, the email is FAILED. The status is only
+    changed with conditional updates, so that only one process sends the email.
+
+    The idempotency key makes sure that a youth application gets each type of email
+    only once, even if e.g. the activation is requested several times.
+    """
+
+    MAX_ATTEMPTS = 3
+    # Pending emails younger than this are being sent by the request that added them
+    RETRY_DELAY = timedelta(minutes=1)
+    # Emails being sent for longer than this are considered to have been interrupted
+    SENDING_TIMEOUT = timedelta(minutes=15)
+
+    youth_application = models.ForeignKey(
+        YouthApplication,
+        on_delete=models.CASCADE,
+        related_name="emails",
+        verbose_name=_("youth application"),
+    )
+    email_type = models.CharField(
+        max_length=64,
+        verbose_name=_("email type"),
+        choices=YouthApplicationEmailType.choices,
+    )
+    language = models.CharField(
+        choices=APPLICATION_LANGUAGE_CHOICES,
+        default=APPLICATION_LANGUAGE_CHOICES[0][0],  # fi
+        max_length=2,
+    )
+    link = models.URLField(
+        blank=True,
+        max_length=2048,
+        verbose_name=_("link"),
+        help_text=_("Activation or processing link included in the email"),
+    )
+    idempotency_key = models.CharField(
+        max_length=256,
+        unique=True,
+        verbose_name=_("idempotency key"),
+    )
+    status = models.CharField(
+        max_length=64,
+        verbose_name=_("status"),
+        choices=YouthApplicationEmailStatus.choices,
+        default=YouthApplicationEmailStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name=_("sending attempts")
+    )
+    last_attempt_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("time of the last sending attempt")
+    )
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_("time sent"))
+
+    @staticmethod
+    def get_idempotency_key(youth_application, email_type) -> str:
+        return f"{youth_application.pk}:{email_type}"
+
+    @classmethod
+    def enqueue(
+        cls, youth_application, email_type, language, link=""
+    ) -> "YouthApplicationEmail":
+        """
+        Add the email to the outbox, unless the youth application already has the email.
+        A failed email is set to be sent again.
+
+        NOTE: Must be called in the transaction that changes the youth application.
+        """
+        email, created = cls.objects.select_for_update().get_or_create(
+            idempotency_key=cls.get_idempotency_key(youth_application, email_type),
+            defaults={
+                "youth_application": youth_application,
+                "email_type": email_type,
+                "language": language,
+                "link": link,
+            },
+        )
+        if not created and email.status == YouthApplicationEmailStatus.FAILED:
+            email.status = YouthApplicationEmailStatus.PENDING
+            email.language = language
+            email.link = link
+            email.attempts = 0
+            email.save()
+        return email
+
+    def _claim(self) -> bool:
+        now = timezone.now()
+        claimed = YouthApplicationEmail.objects.filter(
+            pk=self.pk, status=YouthApplicationEmailStatus.PENDING
+        ).update(
+            status=YouthApplicationEmailStatus.SENDING,
+            attempts=F("attempts") + 1,
+            last_attempt_at=now,
+            modified_at=now,
+        )
+        self.refresh_from_db(fields=["status", "attempts", "last_attempt_at"])
+        return claimed == 1
+
+    def _send(self) -> bool:
+        youth_application = self.youth_application
+        if self.email_type == YouthApplicationEmailType.ACTIVATION:
+            return youth_application._send_activation_email(
+                language=self.language, activation_link=self.link
+            )
+        elif self.email_type == YouthApplicationEmailType.ADDITIONAL_INFO_REQUEST:
+            return youth_application._send_additional_info_request_email(
+                language=self.language, activation_link=self.link
+            )
+        elif self.email_type == YouthApplicationEmailType.PROCESSING:
+            return youth_application._send_processing_email_to_handler(self.link)
+        elif self.email_type == YouthApplicationEmailType.YOUTH_SUMMER_VOUCHER:
+            return (
+                youth_application.youth_summer_voucher.send_youth_summer_voucher_email(
+                    language=self.language
+                )
+            )
+        raise ValueError(f"Invalid email type: {self.email_type}")
+
+    def deliver(self, retry_on_failure=True) -> bool:
+        """
+        Send the email if it is pending and not being sent by another process.
+
+        NOTE: Should not be called in a transaction, as the email server may be slow.
+
+        :param retry_on_failure: Leave the email to be retried by the job if the sending
+                                 fails, instead of setting it failed immediately
+        :return: True if the email has been sent, otherwise False.
+        """
+        if not self._claim():
+            return self.status == YouthApplicationEmailStatus.SENT
+
+        try:
+            was_sent = self._send()
+        except Exception:
+            # Handled like a failed sending, so that the email does not stay SENDING
+            LOGGER.exception(f"Sending youth application email {self.pk} failed")
+            was_sent = False
+        now = timezone.now()
+        if was_sent:
+            self.status = YouthApplicationEmailStatus.SENT
+            self.sent_at = now
+        elif retry_on_failure and self.attempts < self.MAX_ATTEMPTS:
+            self.status = YouthApplicationEmailStatus.PENDING
+        else:
+            self.status = YouthApplicationEmailStatus.FAILED
+        YouthApplicationEmail.objects.filter(
+            pk=self.pk, status=YouthApplicationEmailStatus.SENDING
+        ).update(status=self.status, sent_at=self.sent_at, modified_at=now)
+        return was_sent
+
+    @classmethod
+    def send_pending(cls) -> int:
+        """
+        Send the emails that were left pending, e.g. because sending them failed or the
+        process was stopped after the transaction had been committed. The emails left
+        being sent for longer than SENDING_TIMEOUT are sent again, so such an email may
+        be received twice.
+
+        :return: The number of sent emails.
+        """
+        now = timezone.now()
+        cls.objects.filter(
+            status=YouthApplicationEmailStatus.SENDING,
+            last_attempt_at__lt=now - cls.SENDING_TIMEOUT,
+        ).update(status=YouthApplicationEmailStatus.PENDING, modified_at=now)
+        pending_emails = (
+            cls.objects.filter(
+                status=YouthApplicationEmailStatus.PENDING,
+                modified_at__lt=now - cls.RETRY_DELAY,
+            )
+            .select_related("youth_application")
+            .order_by("created_at")
+        )
+        sent_count = 0
+        for email in pending_emails:
+            # An email that cannot be sent must not stop sending the others
+            try:
+                sent_count += email.deliver()
+            except Exception:
+                LOGGER.exception(
+                    f"Delivering youth application email {email.pk} failed"
+                )
+        return sent_count
+
+    def __str__(self):
+        return f"{self.email_type} ({self.status}): {self.youth_application_id}"
+
+    class Meta:
+        verbose_name = _("youth application email")
+        verbose_name_plural = _("youth application emails")
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["modified_at"],
+                name="youth_app_email_unsent_idx",
+                condition=Q(
+                    status__in=[
+                        YouthApplicationEmailStatus.PENDING,
+                        YouthApplicationEmailStatus.SENDING,
+                    ]
+                ),
+            ),
+        ]
+
+
 class EmployerApplication(HistoricalModel, TimeStampedModel, UUIDModel):
     company = models.ForeignKey(
         Company,
@@ -1009,6 +1404,14 @@ class EmployerApplication(HistoricalModel, TimeStampedModel, UUIDModel):
         max_length=2,
     )
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.status == EmployerApplicationStatus.SUBMITTED:
+            # The summer vouchers saved before the application was submitted
+            self.summer_vouchers.filter(submitted_at__isnull=True).update(
+                submitted_at=self.modified_at
+            )
+
     class Meta:
         verbose_name = _("application")
         verbose_name_plural = _("applications")
@@ -1111,27 +1514,35 @@ class EmployerSummerVoucher(HistoricalModel, TimeStampedModel, UUIDModel):
 
     ordering = models.IntegerField(default=0)
 
+    submitted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("time submitted"),
+        help_text=_("Time the summer voucher was last submitted"),
+    )
+
     @property
     def last_submitted_at(self) -> Optional[datetime]:
-        if (
-            last_submitted_history_entry := self.history.filter(
-                pk=self.pk, application__status=EmployerApplicationStatus.SUBMITTED
-            )
-            .order_by("-modified_at")
-            .first()
-        ):
-            return last_submitted_history_entry.modified_at
-        else:
-            return (
-                self.modified_at
-                if self.application.status == EmployerApplicationStatus.SUBMITTED
-                else None
-            )
+        return self.submitted_at
+
+    def save(self, *args, **kwargs):
+        if self.application.status == EmployerApplicationStatus.SUBMITTED:
+            self.submitted_at = timezone.now()
+            if (update_fields := kwargs.get("update_fields")) is not None:
+                kwargs["update_fields"] = {*update_fields, "submitted_at"}
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = _("summer voucher")
         verbose_name_plural = _("summer vouchers")
         ordering = ["-application__created_at", "ordering"]
+        indexes = [
+            # Ordering of the Excel export
+            models.Index(
+                fields=["submitted_at", "created_at", "id"],
+                name="summer_voucher_submitted_idx",
+            ),
+        ]
 
 
 class Attachment(UUIDModel, TimeStampedModel):
@@ -12,6 +12,7 @@ from common.tests.factories import (
     EmployerApplicationFactory,
     EmployerSummerVoucherFactory,
 )
+from shared.audit_log.audit_logging import resolve_pending_changes
 from shared.audit_log.models import AuditLogEntry
 
 
@@ -302,6 +303,47 @@ def test_application_update_writes_audit_log(api_client, user, application):
     assert audit_event["status"] == "SUCCESS"
 
 
+@pytest.mark.django_db(transaction=True)
+@override_settings(
+    AUDIT_LOG_ORIGIN="TEST_SERVICE",
+    AUDIT_LOG_BUFFERED=True,
+    AUDIT_LOG_DEFER_CHANGES=True,
+)
+def test_application_update_writes_buffered_audit_log_with_deferred_changes(
+    api_client, user, application
+):
+    application.invoicer_name = "test1"
+    application.save()
+
+    data = EmployerApplicationSerializer(application).data
+    data["invoicer_name"] = "test2"
+    response = api_client.put(
+        get_detail_url(application),
+        data,
+    )
+
+    assert response.status_code == 200
+    entry = AuditLogEntry.objects.get()
+    assert entry.message["audit_event"]["operation"] == "UPDATE"
+    assert entry.message["audit_event"]["target"] == {
+        "id": response.data["id"],
+        "type": "EmployerApplication",
+    }
+    assert entry.pending_changes["id"] == response.data["id"]
+
+    # A later update does not end up in the changes of this event
+    application.refresh_from_db()
+    application.invoicer_name = "test3"
+    application.save()
+    assert resolve_pending_changes() == 1
+
+    entry.refresh_from_db()
+    assert entry.pending_changes is None
+    assert entry.message["audit_event"]["target"]["changes"] == [
+        "invoicer_name changed from test1 to test2"
+    ]
+
+
 @pytest.mark.django_db
 @override_settings(
     AUDIT_LOG_ORIGIN="TEST_SERVICE",
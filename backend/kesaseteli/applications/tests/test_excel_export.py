@@ -14,7 +14,9 @@ from django.utils import translation
 from django.utils.timezone import localdate
 from freezegun import freeze_time
 
+from applications.api.v1.serializers import YouthApplicationExcelExportSerializer
 from applications.enums import (
+    AttachmentType,
     EmployerApplicationStatus,
     ExcelColumns,
     VtjTestCase,
@@ -26,6 +28,8 @@ from applications.exporters.excel_exporter import (
     EMPLOYMENT_START_DATE_FIELD_TITLE,
     ExcelField,
     FIELDS,
+    generate_data_rows,
+    generate_xlsx_template,
     get_attachment_uri,
     get_exportable_fields,
     get_reporting_columns,
@@ -48,6 +52,7 @@ from applications.views import YouthApplicationExcelExportViewSet
 from common.tests.factories import (
     ActiveVtjTestCaseYouthApplicationFactory,
     ActiveYouthApplicationFactory,
+    AttachmentFactory,
     EmployerApplicationFactory,
     EmployerSummerVoucherFactory,
     InactiveYouthApplicationFactory,
@@ -493,3 +498,85 @@ def test_removable_reporting_field_titles():
 
 def test_removable_talpa_field_titles():
     check_removable_field_titles(REMOVABLE_TALPA_FIELD_TITLES)
+
+
+@pytest.mark.django_db
+def test_excel_export_attachment_uris_use_prefetched_attachments(
+    rf, django_assert_num_queries
+):
+    vouchers = [
+        EmployerSummerVoucherFactory(
+            application=EmployerApplicationFactory(
+                status=EmployerApplicationStatus.SUBMITTED
+            )
+        )
+        for _ in range(3)
+    ]
+    for voucher in vouchers:
+        AttachmentFactory.create_batch(
+            size=2,
+            summer_voucher=voucher,
+            attachment_type=AttachmentType.EMPLOYMENT_CONTRACT,
+        )
+    attachment_fields = [
+        field for field in FIELDS if field.model_fields == ["attachments"]
+    ]
+    request = rf.get("/")
+    queryset = EmployerSummerVoucher.objects.prefetch_related("attachments").order_by(
+        "created_at", "id"
+    )
+
+    # The summer vouchers and their attachments, regardless of the number of vouchers
+    with django_assert_num_queries(2):
+        rows = list(generate_data_rows(queryset, attachment_fields, request))
+
+    for voucher, row in zip(queryset, rows):
+        attachments = sorted(
+            voucher.attachments.all(), key=lambda a: (a.created_at, a.pk)
+        )
+        assert (
+            row
+            == [
+                request.build_absolute_uri(
+                    reverse(
+                        "v1:employersummervoucher-handle-attachment",
+                        kwargs={"pk": voucher.pk, "attachment_pk": attachment.pk},
+                    )
+                )
+                for attachment in attachments
+            ]
+            + [""] * 8
+        )
+
+
+@pytest.mark.parametrize("columns", ExcelColumns.values)
+def test_excel_export_template_column_types(columns):
+    fields = get_exportable_fields(columns)
+
+    workbook = openpyxl.load_workbook(filename=generate_xlsx_template(columns))
+    header_row, template_row = workbook.active.rows
+
+    assert get_field_titles(fields) == [
+        "" if cell.value is None else cell.value for cell in header_row
+    ]
+    for field, cell in zip(fields, template_row):
+        assert cell.data_type == ("n" if field.title == ORDER_FIELD_TITLE else "s")
+
+
+@pytest.mark.django_db
+def test_youth_excel_data_row_generator(django_assert_num_queries):
+    ActiveYouthApplicationFactory.create_batch(size=5)
+    for status in YouthApplicationStatus.active_values():
+        YouthApplicationFactory(status=status)
+    view = YouthApplicationExcelExportViewSet()
+    generate_data_row = view.data_row_generator()
+
+    # The youth applications and their youth summer vouchers
+    with django_assert_num_queries(1):
+        apps = list(view.get_queryset())
+        rows = [generate_data_row(app) for app in apps]
+
+    source_fields = YouthApplicationExcelExportViewSet.source_fields()
+    for app, row in zip(apps, rows):
+        data = YouthApplicationExcelExportSerializer(app).data
+        assert row == [data[source_field] for source_field in source_fields]
@@ -1,6 +1,8 @@
 import itertools
+import json
 import operator
 from typing import List
+from unittest import mock
 
 import pytest
 from django.core import mail
@@ -11,11 +13,13 @@ from freezegun import freeze_time
 
 from applications.enums import EmployerApplicationStatus
 from applications.models import EmployerSummerVoucher, YouthSummerVoucher
+from applications.tests.data.mock_vtj import mock_vtj_person_id_query_found_content
 from common.tests.factories import (
     AttachmentFactory,
     AwaitingManualProcessingYouthApplicationFactory,
     EmployerApplicationFactory,
     EmployerSummerVoucherFactory,
+    InactiveNoNeedAdditionalInfoYouthApplicationFactory,
     YouthSummerVoucherFactory,
 )
 from shared.common.tests.utils import utc_datetime
@@ -70,6 +74,28 @@ def create_test_employer_summer_vouchers(year) -> List[EmployerSummerVoucher]:
     return sorted(vouchers, key=operator.attrgetter("last_submitted_at"))
 
 
+@pytest.mark.django_db
+def test_employer_summer_voucher_submitted_at_set_on_submit():
+    with freeze_time(utc_datetime(2022, 1, 1)):
+        application = EmployerApplicationFactory(status=EmployerApplicationStatus.DRAFT)
+        voucher = EmployerSummerVoucherFactory(application=application)
+    assert voucher.submitted_at is None
+
+    with freeze_time(utc_datetime(2022, 1, 2)):
+        application.status = EmployerApplicationStatus.SUBMITTED
+        application.save()
+    voucher.refresh_from_db()
+    assert voucher.submitted_at == utc_datetime(2022, 1, 2)
+
+    # Handling the application does not change the time of submission
+    with freeze_time(utc_datetime(2022, 1, 3)):
+        application.status = EmployerApplicationStatus.ACCEPTED
+        application.save()
+        voucher.save()
+    voucher.refresh_from_db()
+    assert voucher.submitted_at == utc_datetime(2022, 1, 2)
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("year", [2021, 2022])
 def test_employer_summer_voucher_last_submitted_at(year):
@@ -332,3 +358,29 @@ def test_youth_summer_voucher_sending__no_optional_arguments():
     assert m.from_email == "Test sender <testsender@hel.fi>"
     assert m.to == [usv.youth_application.email]
     assert m.bcc == ["Test handler <testhandler@hel.fi>"]
+
+
+@pytest.mark.django_db
+@override_settings(NEXT_PUBLIC_DISABLE_VTJ=False)
+def test_youth_application_vtj_json_parsed_once():
+    app = InactiveNoNeedAdditionalInfoYouthApplicationFactory.build()
+
+    with mock.patch("applications.models.json.loads", wraps=json.loads) as loads:
+        assert not app.need_additional_info
+        assert app.vtj_last_name == app.last_name
+        assert loads.call_count == 1
+
+        # Changing the field invalidates the parsed data
+        app.encrypted_original_vtj_json = mock_vtj_person_id_query_found_content(
+            first_name=app.first_name,
+            last_name="Other",
+            social_security_number=app.social_security_number,
+            is_alive=True,
+            is_home_municipality_helsinki=True,
+        )
+        assert app.vtj_last_name == "Other"
+        assert not app.is_last_name_as_in_vtj
+        assert loads.call_count == 2
+
+        app.encrypted_original_vtj_json = None
+        assert app.vtj_last_name == ""
@@ -54,3 +54,58 @@ def test_schools_list_returns_unique_elements_collection(api_client, school_list
 def test_schools_list_returns_sorted_collection(api_client, school_list):
     response = api_client.get(get_schools_api_url())
     assert sorted(response.json(), key=str.casefold) == response.json()
+
+
+@pytest.mark.django_db
+def test_schools_list_is_cached(
+    unauthenticated_api_client, school_list, django_assert_num_queries
+):
+    response = unauthenticated_api_client.get(get_schools_api_url())
+
+    # Only the version of the school list is queried
+    with django_assert_num_queries(1):
+        cached_response = unauthenticated_api_client.get(get_schools_api_url())
+
+    assert cached_response.status_code == status.HTTP_200_OK
+    assert cached_response.json() == response.json()
+    assert cached_response["ETag"] == response["ETag"]
+
+
+@pytest.mark.django_db
+def test_schools_list_cache_is_not_used_after_school_change(
+    unauthenticated_api_client, school_list
+):
+    etag = unauthenticated_api_client.get(get_schools_api_url())["ETag"]
+
+    school = School.objects.create(name="Testikoulu")
+    response = unauthenticated_api_client.get(get_schools_api_url())
+    assert "Testikoulu" in response.json()
+    assert response["ETag"] != etag
+    created_etag = response["ETag"]
+
+    school.name = "Testikoulu 2"
+    school.save()
+    response = unauthenticated_api_client.get(get_schools_api_url())
+    assert "Testikoulu 2" in response.json()
+    assert response["ETag"] not in (etag, created_etag)
+
+    school.delete()
+    response = unauthenticated_api_client.get(get_schools_api_url())
+    assert "Testikoulu" not in response.json()
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_schools_list_not_modified(unauthenticated_api_client, school_list):
+    response = unauthenticated_api_client.get(get_schools_api_url())
+    assert response["Cache-Control"] == "no-cache"
+
+    response = unauthenticated_api_client.get(
+        get_schools_api_url(), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = unauthenticated_api_client.get(
+        get_schools_api_url(), HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
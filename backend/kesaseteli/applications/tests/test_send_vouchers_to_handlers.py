@@ -0,0 +1,110 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command, CommandError
+from django.test import override_settings
+
+from applications.models import YouthApplication
+from common.tests.factories import (
+    AcceptedYouthApplicationFactory,
+    YouthSummerVoucherFactory,
+)
+
+
+def _send_vouchers_to_handlers(*args):
+    out = StringIO()
+    call_command("send_vouchers_to_handlers", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    HANDLER_EMAIL="Test handler <testhandler@hel.fi>",
+)
+def test_send_vouchers_to_handlers_in_batches(tmp_path):
+    vouchers = YouthSummerVoucherFactory.create_batch(size=5)
+    without_voucher = AcceptedYouthApplicationFactory(youth_summer_voucher=None)
+    checkpoint_file = tmp_path / "checkpoint"
+
+    with mock.patch(
+        "applications.management.commands.send_vouchers_to_handlers.get_connection",
+        wraps=get_connection,
+    ) as mock_get_connection:
+        output = _send_vouchers_to_handlers(
+            "--batch-size=2", "--workers=2", f"--checkpoint-file={checkpoint_file}"
+        )
+
+    # One email server connection per batch
+    assert mock_get_connection.call_count == 3
+    assert len(mail.outbox) == 5
+    assert {email.subject for email in mail.outbox} == {
+        voucher.email_subject(voucher.youth_application.language)
+        for voucher in vouchers
+    }
+    for email in mail.outbox:
+        assert email.to == []
+        assert email.bcc == ["Test handler <testhandler@hel.fi>"]
+    for voucher in vouchers:
+        assert f"Sent {voucher.youth_application.pk}" in output
+    assert f"VOUCHER ERROR: {without_voucher.pk}" in output
+    assert "Processed 6 vouchers" in output
+    assert checkpoint_file.read_text() == str(
+        YouthApplication.objects.order_by("pk").last().pk
+    )
+
+    # Sending is resumed after the checkpoint, so nothing is sent again
+    output = _send_vouchers_to_handlers(f"--checkpoint-file={checkpoint_file}")
+
+    assert "Resuming after" in output
+    assert "Processed 0 vouchers" in output
+    assert len(mail.outbox) == 5
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+def test_send_vouchers_to_handlers_resends_failed_batch(tmp_path):
+    YouthSummerVoucherFactory.create_batch(size=5)
+    checkpoint_file = tmp_path / "checkpoint"
+    out = StringIO()
+
+    # The first batch is sent, the second email of the second batch fails
+    with mock.patch.object(EmailBackend, "send_messages", side_effect=[1, 1, 1, 0, 1]):
+        with pytest.raises(CommandError):
+            call_command(
+                "send_vouchers_to_handlers",
+                "--batch-size=2",
+                f"--checkpoint-file={checkpoint_file}",
+                stdout=out,
+            )
+
+    sorted_apps = YouthApplication.objects.order_by("pk")
+    assert f"EMAIL ERROR: {sorted_apps[3].pk}" in out.getvalue()
+    # The sending stops at the failed batch
+    assert f"Sent {sorted_apps[4].pk}" not in out.getvalue()
+    assert checkpoint_file.read_text() == str(sorted_apps[1].pk)
+
+    # The failed batch and the batches after it are sent again when resuming
+    output = _send_vouchers_to_handlers(f"--checkpoint-file={checkpoint_file}")
+
+    assert "Processed 3 vouchers" in output
+    for app in sorted_apps[2:]:
+        assert f"Sent {app.pk}" in output
+    assert len(mail.outbox) == 3
+    assert checkpoint_file.read_text() == str(sorted_apps[4].pk)
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+def test_send_vouchers_to_handlers_dry_run():
+    voucher = YouthSummerVoucherFactory()
+
+    output = _send_vouchers_to_handlers("--dry-run")
+
+    assert f"Sent {voucher.youth_application.pk}" in output
+    assert "Processed 1 vouchers" in output
+    assert len(mail.outbox) == 0
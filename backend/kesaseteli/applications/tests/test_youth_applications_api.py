@@ -27,10 +27,16 @@ from applications.api.v1.serializers import YouthApplicationSerializer
 from applications.enums import (
     AdditionalInfoUserReason,
     get_supported_languages,
+    YouthApplicationEmailStatus,
+    YouthApplicationEmailType,
     YouthApplicationRejectedReason,
     YouthApplicationStatus,
 )
-from applications.models import YouthApplication, YouthSummerVoucher
+from applications.models import (
+    YouthApplication,
+    YouthApplicationEmail,
+    YouthSummerVoucher,
+)
 from applications.tests.data.mock_vtj import (
     mock_vtj_person_id_query_found_content,
     mock_vtj_person_id_query_not_found_content,
@@ -1402,6 +1408,145 @@ def test_youth_application_post_valid_data_with_invalid_smtp_server(
     assert end_app_count == start_app_count
 
 
+@pytest.mark.django_db
+@override_settings(
+    NEXT_PUBLIC_DISABLE_VTJ=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+def test_youth_application_post_valid_data_sends_outbox_email(api_client):
+    youth_application = YouthApplicationFactory.build()
+    data = YouthApplicationSerializer(youth_application).data
+    response = api_client.post(reverse("v1:youthapplication-list"), data)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    app = YouthApplication.objects.get(pk=response.data["id"])
+    outbox_email = app.emails.get()
+    assert outbox_email.email_type == YouthApplicationEmailType.ACTIVATION
+    assert outbox_email.status == YouthApplicationEmailStatus.SENT
+    assert outbox_email.attempts == 1
+    assert outbox_email.link in mail.outbox[0].body
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+@override_settings(
+    NEXT_PUBLIC_DISABLE_VTJ=False,
+    EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    EMAIL_HOST="",  # Use inexistent email host to ensure emails will never go anywhere
+)
+def test_youth_application_activate_with_invalid_smtp_server(
+    api_client, settings, make_youth_application_activation_link_unexpired
+):
+    app = InactiveNoNeedAdditionalInfoYouthApplicationFactory(email="test@example.com")
+
+    response = api_client.get(get_activation_url(app.pk))
+
+    # The activation and the automatic acceptance are reverted
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    app.refresh_from_db()
+    assert not app.is_active
+    assert app.status == YouthApplicationStatus.SUBMITTED
+    assert not app.has_youth_summer_voucher
+    outbox_email = app.emails.get()
+    assert outbox_email.status == YouthApplicationEmailStatus.FAILED
+
+    # The failed email is sent again when the application is activated again
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    response = api_client.get(get_activation_url(app.pk))
+
+    assert response.status_code == status.HTTP_302_FOUND
+    app.refresh_from_db()
+    assert response.url == app.accepted_page_url()
+    assert app.has_youth_summer_voucher
+    outbox_email.refresh_from_db()
+    assert outbox_email.status == YouthApplicationEmailStatus.SENT
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+@override_settings(NEXT_PUBLIC_DISABLE_VTJ=False)
+def test_youth_application_activate_email_failure_after_concurrent_change(
+    api_client, make_youth_application_activation_link_unexpired
+):
+    app = InactiveNoNeedAdditionalInfoYouthApplicationFactory(email="test@example.com")
+
+    def change_and_fail_delivery(email, retry_on_failure=True):
+        # The youth application is changed while the email is being sent
+        YouthApplication.objects.filter(pk=app.pk).update(
+            status=YouthApplicationStatus.REJECTED
+        )
+        return False
+
+    with mock.patch.object(
+        YouthApplicationEmail,
+        "deliver",
+        autospec=True,
+        side_effect=change_and_fail_delivery,
+    ):
+        response = api_client.get(get_activation_url(app.pk))
+
+    # The activation is not reverted over the concurrent change
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    app.refresh_from_db()
+    assert app.is_active
+    assert app.status == YouthApplicationStatus.REJECTED
+    assert app.has_youth_summer_voucher
+
+
+@pytest.mark.django_db
+@override_settings(NEXT_PUBLIC_DISABLE_VTJ=False)
+def test_youth_application_activate_email_exception(
+    api_client, make_youth_application_activation_link_unexpired
+):
+    app = InactiveNoNeedAdditionalInfoYouthApplicationFactory(email="test@example.com")
+
+    with mock.patch.object(
+        YouthApplicationEmail, "_send", side_effect=RuntimeError("Template error")
+    ):
+        response = api_client.get(get_activation_url(app.pk))
+
+    # An exception while sending is handled like a failed sending
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    app.refresh_from_db()
+    assert not app.is_active
+    assert not app.has_youth_summer_voucher
+    outbox_email = app.emails.get()
+    assert outbox_email.status == YouthApplicationEmailStatus.FAILED
+
+
+@pytest.mark.django_db
+def test_youth_application_email_send_pending_isolates_failures():
+    emails = [
+        YouthApplicationEmail.enqueue(
+            YouthApplicationFactory(),
+            YouthApplicationEmailType.ACTIVATION,
+            "fi",
+            link="https://example.com/",
+        )
+        for _ in range(2)
+    ]
+    YouthApplicationEmail.objects.update(
+        modified_at=timezone.now() - YouthApplicationEmail.RETRY_DELAY * 2
+    )
+
+    def send(email):
+        if email.pk == emails[0].pk:
+            raise RuntimeError("Template error")
+        return True
+
+    with mock.patch.object(
+        YouthApplicationEmail, "_send", autospec=True, side_effect=send
+    ):
+        assert YouthApplicationEmail.send_pending() == 1
+
+    for email in emails:
+        email.refresh_from_db()
+    # The failed email is left to be retried, and the next one is sent
+    assert emails[0].status == YouthApplicationEmailStatus.PENDING
+    assert emails[0].attempts == 1
+    assert emails[1].status == YouthApplicationEmailStatus.SENT
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("language", get_supported_languages())
 def test_youth_application_post_valid_language(
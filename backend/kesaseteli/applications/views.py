@@ -2,12 +2,12 @@ import collections
 import io
 import typing
 from datetime import date
-from functools import partial
-from typing import List, Union
+from functools import lru_cache, partial
+from typing import Callable, List, Union
 
 import xlsx_streaming
 from django.conf import settings
-from django.db.models import F, OuterRef, QuerySet, Subquery, Window
+from django.db.models import F, QuerySet, Window
 from django.db.models.functions import RowNumber
 from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import render
@@ -43,9 +43,6 @@ class EmployerApplicationExcelDownloadView(TemplateView):
 
     @staticmethod
     def base_queryset(filter_pks=None) -> QuerySet[EmployerSummerVoucher]:
-        newest_submitted = EmployerSummerVoucher.history.filter(
-            id=OuterRef("id"), application__status=EmployerApplicationStatus.SUBMITTED
-        ).order_by("-modified_at")
         base_queryset = EmployerSummerVoucher.objects
         if filter_pks:
             base_queryset.filter(pk__in=filter_pks)
@@ -54,7 +51,6 @@ class EmployerApplicationExcelDownloadView(TemplateView):
                 "application", "application__company", "application__user"
             )
             .prefetch_related("attachments")
-            .annotate(submitted_at=Subquery(newest_submitted.values("modified_at")[:1]))
             # Use created_at and primary key as the secondary and tertiary ordering
             # parameters to force a predictable although slightly arbitrary ordering for
             # queryset rows with identical submitted_at values.
@@ -97,7 +93,7 @@ class EmployerApplicationExcelDownloadView(TemplateView):
         response = StreamingHttpResponse(
             xlsx_streaming.stream_queryset_as_xlsx(
                 qs=queryset,
-                xlsx_template=generate_xlsx_template(queryset, columns, self.request),
+                xlsx_template=generate_xlsx_template(columns),
                 serializer=serializer,
                 batch_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE,
             ),
@@ -195,7 +191,12 @@ class YouthApplicationExcelExportViewSet(AuditLoggingModelViewSet):
         return HttpResponse(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
     @classmethod
+    @lru_cache(maxsize=None)
     def source_fields_and_output_names(cls) -> typing.OrderedDict[str, str]:
+        """
+        Return the exported fields and their column names. The column names are always
+        in Finnish, so they are only translated once.
+        """
         with translation.override("fi"):
             return collections.OrderedDict(
                 [
@@ -233,10 +234,42 @@ class YouthApplicationExcelExportViewSet(AuditLoggingModelViewSet):
         return list(cls.source_fields_and_output_names().values())
 
     def get_queryset(self):
-        return YouthApplication.objects.active().order_by("created_at", "pk")
+        return (
+            YouthApplication.objects.active()
+            .select_related("youth_summer_voucher")
+            .order_by("created_at", "pk")
+        )
+
+    @classmethod
+    def data_row_generator(cls) -> Callable[[YouthApplication], list]:
+        """
+        Return a function that generates the data row of a youth application. The
+        fields of the serializer are bound once, and each column is read with the
+        field's get_attribute and to_representation like the serializer does, but
+        without creating a serializer and its data for every youth application.
+        """
+        serializer_fields = cls.serializer_class().fields
+        fields = [
+            serializer_fields[source_field] for source_field in cls.source_fields()
+        ]
+
+        def generate_data_row(app: YouthApplication) -> list:
+            row = []
+            for field in fields:
+                attribute = field.get_attribute(app)
+                row.append(
+                    None if attribute is None else field.to_representation(attribute)
+                )
+            return row
 
-    def serializer(self, apps: QuerySet[YouthApplication]):
-        return (self.generate_data_row(app) for app in apps)
+        return generate_data_row
+
+    def serializer(
+        self,
+        apps: QuerySet[YouthApplication],
+        generate_data_row: Callable[[YouthApplication], list],
+    ):
+        return (generate_data_row(app) for app in apps)
 
     @enforce_handler_view_adfs_login
     def list(
@@ -252,8 +285,11 @@ class YouthApplicationExcelExportViewSet(AuditLoggingModelViewSet):
             response = StreamingHttpResponse(
                 xlsx_streaming.stream_queryset_as_xlsx(
                     qs=queryset,
-                    xlsx_template=self.xlsx_template(queryset),
-                    serializer=self.serializer,
+                    xlsx_template=self.xlsx_template(),
+                    serializer=partial(
+                        self.serializer,
+                        generate_data_row=self.data_row_generator(),
+                    ),
                     batch_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE,
                 ),
                 content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -275,38 +311,29 @@ class YouthApplicationExcelExportViewSet(AuditLoggingModelViewSet):
     def xlsx_filename(self) -> str:
         return f"{self.worksheet_name}-{timezone.localdate()}.xlsx"
 
-    def generate_data_row(self, app: YouthApplication, is_template: bool = False):
-        data = self.serializer_class(app).data
+    @classmethod
+    def generate_template_row(cls):
         return [
             YouthApplicationExcelExportSerializer.get_placeholder_value(source_field)
-            if is_template and not data.get(source_field)
-            else data.get(source_field)
-            for source_field in self.source_fields()
+            for source_field in cls.source_fields()
         ]
 
-    def write_data_row(
-        self,
-        worksheet: Worksheet,
-        row_number: int,
-        app: YouthApplication,
-        is_template: bool = False,
-    ):
-        data_row = self.generate_data_row(app, is_template)
-        for column_number, cell_value in enumerate(data_row):
-            worksheet.write(row_number, column_number, cell_value)
-
     def write_header(self, worksheet: Worksheet, header_format: Format):
         for column_number, column_name in enumerate(self.output_column_names()):
             worksheet.write(0, column_number, column_name, header_format)
 
-    def xlsx_template(self, queryset: QuerySet[YouthApplication]):
+    def xlsx_template(self):
+        """
+        Generate the .xlsx template for the xlsx-streaming package. The column types
+        come from the placeholder values of the fields instead of an exported youth
+        application, so the export queryset is only evaluated while streaming.
+        """
         result = io.BytesIO()
         workbook: Workbook = Workbook(result)
         worksheet: Worksheet = workbook.add_worksheet(self.worksheet_name)
         header_format: Format = workbook.add_format(self.header_format_properties)
         self.write_header(worksheet, header_format)
-        self.write_data_row(
-            worksheet=worksheet, row_number=1, app=queryset[0], is_template=True
-        )
+        for column_number, cell_value in enumerate(self.generate_template_row()):
+            worksheet.write(1, column_number, cell_value)
         workbook.close()
         return result
@@ -50,6 +50,35 @@ def are_same_text_lists(a, b) -> bool:
     )
 
 
+def create_mail(
+    subject,
+    message,
+    from_email,
+    recipient_list,
+    bcc=None,
+    html_message=None,
+    images: Optional[List[MIMEImage]] = None,
+    connection=None,
+) -> EmailMultiAlternatives:
+    """
+    Create email with given parameters. See send_mail_with_error_logging for the
+    parameters.
+
+    :param connection: Optional email backend used for sending the email
+    :return: The email message
+    """
+    mail = EmailMultiAlternatives(
+        subject, message, from_email, to=recipient_list, bcc=bcc, connection=connection
+    )
+    if html_message:
+        mail.attach_alternative(html_message, "text/html")
+        if images:
+            mail.mixed_subtype = "related"
+            for image in images:
+                mail.attach(image)
+    return mail
+
+
 def send_mail_with_error_logging(
     subject,
     message,
@@ -77,17 +106,16 @@ def send_mail_with_error_logging(
                    related.
     :return: True if email was sent, otherwise False.
     """
-    connection = get_connection(fail_silently=True)
-    mail = EmailMultiAlternatives(
-        subject, message, from_email, to=recipient_list, bcc=bcc, connection=connection
+    mail = create_mail(
+        subject,
+        message,
+        from_email,
+        recipient_list,
+        bcc=bcc,
+        html_message=html_message,
+        images=images,
+        connection=get_connection(fail_silently=True),
     )
-    if html_message:
-        mail.attach_alternative(html_message, "text/html")
-        if images:
-            mail.mixed_subtype = "related"
-            for image in images:
-                mail.attach(image)
-
     sent_email_count = mail.send(fail_silently=True)
     if sent_email_count == 0:
         LOGGER.error(error_message)
@@ -8,6 +8,7 @@ from rest_framework.exceptions import NotFound
 from common.tests.factories import CompanyFactory
 from companies.models import Company
 from companies.tests.data.company_data import DUMMY_ORG_ROLES
+from shared.common.lookup_cache import get_or_fetch_company_data
 from shared.oidc.utils import get_organization_roles
 from shared.ytj.ytj_client import YTJClient
 
@@ -31,12 +32,18 @@ def get_or_create_company_from_ytj_api(business_id: str) -> Company:
     """
     Create a company instance using the YTJ integration.
     """
-    ytj_client = YTJClient()
 
-    ytj_data = ytj_client.get_company_info_with_business_id(business_id)
-    company_data = ytj_client.get_company_data_from_ytj_data(ytj_data)
+    def fetch_company_data():
+        ytj_client = YTJClient()
+        ytj_data = ytj_client.get_company_info_with_business_id(business_id)
+        company_data = ytj_client.get_company_data_from_ytj_data(ytj_data)
+        return {"company_data": company_data, "ytj_data": ytj_data}
 
-    return get_or_create_company_using_company_data(company_data, ytj_data)
+    cached = get_or_fetch_company_data("ytj", business_id, fetch_company_data)
+
+    return get_or_create_company_using_company_data(
+        cached["company_data"], cached["ytj_data"]
+    )
 
 
 def get_or_create_company_with_name_and_business_id(
@@ -8,6 +8,7 @@ from django.test import override_settings
 
 from companies.api.v1.serializers import CompanySerializer
 from companies.models import Company
+from companies.services import get_or_create_company_from_ytj_api
 from companies.tests.data.company_data import (
     DUMMY_COMPANY_DATA,
     DUMMY_YTJ_BUSINESS_DETAILS_RESPONSE,
@@ -184,3 +185,24 @@ def test_get_company_from_ytj_invalid_response(api_client, requests_mock, user):
 
     assert response.status_code == 404
     assert response.data["detail"] == "Could not handle the response from YTJ API"
+
+
+@pytest.mark.django_db
+@override_settings(
+    YTJ_BASE_URL="http://example.com",
+)
+def test_get_or_create_company_from_ytj_api_uses_cache(requests_mock):
+    set_up_mock_requests(
+        DUMMY_YTJ_RESPONSE, DUMMY_YTJ_BUSINESS_DETAILS_RESPONSE, requests_mock
+    )
+    business_id = DUMMY_YTJ_RESPONSE["results"][0]["businessId"]
+
+    company = get_or_create_company_from_ytj_api(business_id)
+    ytj_json = company.ytj_json
+    company.delete()
+    company = get_or_create_company_from_ytj_api(business_id)
+
+    assert company.business_id == business_id
+    assert company.ytj_json == ytj_json
+    # The company and business details requests of the first call
+    assert requests_mock.call_count == 2
@@ -58,6 +58,13 @@ env = environ.Env(
     CSRF_COOKIE_NAME=(str, "yjdhcsrftoken"),
     YTJ_BASE_URL=(str, "http://avoindata.prh.fi/opendata/tr/v1"),
     YTJ_TIMEOUT=(int, 30),
+    HTTP_DEFAULT_TIMEOUT=(int, 10),
+    HTTP_POOL_MAXSIZE=(int, 10),
+    HTTP_MAX_RETRIES=(int, 3),
+    COMPANY_CACHE_TIMEOUT=(int, 60 * 60),
+    COMPANY_NEGATIVE_CACHE_TIMEOUT=(int, 5 * 60),
+    TOKEN_CACHE_TIMEOUT=(int, 5 * 60),
+    SCHOOL_LIST_CACHE_TIMEOUT=(int, 60 * 60),
     NEXT_PUBLIC_MOCK_FLAG=(bool, False),
     SESSION_COOKIE_AGE=(int, 60 * 60 * 2),
     OIDC_RP_CLIENT_ID=(str, ""),
@@ -98,8 +105,11 @@ env = environ.Env(
     ELASTICSEARCH_PORT=(str, ""),
     ELASTICSEARCH_USERNAME=(str, ""),
     ELASTICSEARCH_PASSWORD=(str, ""),
+    ELASTICSEARCH_BULK_CHUNK_SIZE=(int, 500),
     CLEAR_AUDIT_LOG_ENTRIES=(bool, False),
     ENABLE_SEND_AUDIT_LOG=(bool, False),
+    AUDIT_LOG_BUFFERED=(bool, False),
+    AUDIT_LOG_DEFER_CHANGES=(bool, False),
     ENABLE_ADMIN=(bool, False),
     DB_PREFIX=(str, ""),
     EMAIL_USE_TLS=(bool, False),
@@ -297,7 +307,10 @@ ELASTICSEARCH_HOST = env("ELASTICSEARCH_HOST")
 ELASTICSEARCH_PORT = env("ELASTICSEARCH_PORT")
 ELASTICSEARCH_USERNAME = env("ELASTICSEARCH_USERNAME")
 ELASTICSEARCH_PASSWORD = env("ELASTICSEARCH_PASSWORD")
+ELASTICSEARCH_BULK_CHUNK_SIZE = env.int("ELASTICSEARCH_BULK_CHUNK_SIZE")
 ENABLE_SEND_AUDIT_LOG = env("ENABLE_SEND_AUDIT_LOG")
+AUDIT_LOG_BUFFERED = env.bool("AUDIT_LOG_BUFFERED")
+AUDIT_LOG_DEFER_CHANGES = env.bool("AUDIT_LOG_DEFER_CHANGES")
 
 LOGGING = {
     "version": 1,
@@ -331,6 +344,19 @@ REST_FRAMEWORK = {
 YTJ_BASE_URL = env.str("YTJ_BASE_URL")
 YTJ_TIMEOUT = env.int("YTJ_TIMEOUT")
 
+# Pooled sessions of the integration clients, see shared.common.http_client
+HTTP_DEFAULT_TIMEOUT = env.int("HTTP_DEFAULT_TIMEOUT")
+HTTP_POOL_MAXSIZE = env.int("HTTP_POOL_MAXSIZE")
+HTTP_MAX_RETRIES = env.int("HTTP_MAX_RETRIES")
+
+# Cache timeouts of the company lookups, see shared.common.lookup_cache
+COMPANY_CACHE_TIMEOUT = env.int("COMPANY_CACHE_TIMEOUT")
+COMPANY_NEGATIVE_CACHE_TIMEOUT = env.int("COMPANY_NEGATIVE_CACHE_TIMEOUT")
+# Cache timeout of the values cached by an access token whose lifetime is not known
+TOKEN_CACHE_TIMEOUT = env.int("TOKEN_CACHE_TIMEOUT")
+# Cache timeout of a version of the school list, which is keyed by the school data
+SCHOOL_LIST_CACHE_TIMEOUT = env.int("SCHOOL_LIST_CACHE_TIMEOUT")
+
 # Mock flag for testing purposes
 NEXT_PUBLIC_MOCK_FLAG = env.bool("NEXT_PUBLIC_MOCK_FLAG")
 
@@ -1,11 +1,15 @@
+import functools
 from datetime import datetime, timezone
 from typing import Callable, Optional, Union
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 from django.db.models import Model
 from django.db.models.base import ModelBase
+from django.utils.dateparse import parse_datetime
 
 from shared.audit_log.enums import Operation, Role, Status
 from shared.audit_log.mappings import DJANGO_BACKEND_MAPPING
@@ -33,10 +37,40 @@ def log(
     get_time: Callable[[], datetime] = _now,
     ip_address: str = "",
     additional_information: str = "",
+    defer_changes: bool = False,
 ):
     """
     Write an event to the audit log.
 
+    See create_entry() for the arguments.
+    """
+    create_entry(
+        actor,
+        actor_backend,
+        operation,
+        target,
+        status,
+        get_time=get_time,
+        ip_address=ip_address,
+        additional_information=additional_information,
+        defer_changes=defer_changes,
+    ).save()
+
+
+def create_entry(
+    actor: Optional[Union[User, AnonymousUser]],
+    actor_backend: str,
+    operation: Operation,
+    target: Union[Model, ModelBase],
+    status: Status = Status.SUCCESS,
+    get_time: Callable[[], datetime] = _now,
+    ip_address: str = "",
+    additional_information: str = "",
+    defer_changes: bool = False,
+) -> AuditLogEntry:
+    """
+    Create an unsaved audit log entry of an event.
+
     Each audit log event has an actor (or None for system events),
     an operation(e.g. READ or UPDATE), the target of the operation
     (a Django model instance), status (e.g. SUCCESS), and a timestamp.
@@ -45,6 +79,10 @@ def log(
     there were no changes to the object iteself but it was (re-)sent
     to another system for example. Thus it will not log the "changes"
     of the object.
+
+    If defer_changes is True, the changes are not looked up from the history
+    of the object here, but later by resolve_pending_changes(). The entry is
+    not sent to Elasticsearch before that.
     """
     current_time = get_time()
     user_id = str(actor.pk) if getattr(actor, "pk", None) else ""
@@ -81,21 +119,90 @@ def log(
         },
     }
 
+    pending_changes = None
     if (
         operation == Operation.UPDATE
         and not additional_information
         and hasattr(target, "history")
     ):
-        _add_changes(target, message)
-
-    AuditLogEntry.objects.create(
+        if defer_changes:
+            pending_changes = {
+                "model": target._meta.label,
+                "id": str(target.pk),
+                "date_time": current_time.isoformat(),
+            }
+        else:
+            _add_changes(target.history.latest(), message)
+
+    return AuditLogEntry(
         message=message,
+        pending_changes=pending_changes,
     )
 
 
-def _add_changes(target: Union[Model, ModelBase], message: dict) -> None:
+class AuditLogBuffer:
+    """
+    Collects the audit log entries of a request and writes them with a single bulk
+    insert. An entry is only kept if the transaction it was added in is committed,
+    like an entry saved in the transaction would be. The kept entries are written by
+    flush_on_commit() when the outermost transaction is committed, or immediately
+    outside of a transaction.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.flush_pending = False
+
+    def add(self, entry: AuditLogEntry) -> None:
+        # Runs immediately if not in a transaction
+        transaction.on_commit(functools.partial(self.entries.append, entry))
+
+    def flush_on_commit(self) -> None:
+        if not self.flush_pending:
+            self.flush_pending = True
+            # The callbacks of the entries added in the same transaction run first
+            transaction.on_commit(self.flush)
+
+    def flush(self) -> None:
+        self.flush_pending = False
+        entries, self.entries = self.entries, []
+        if entries:
+            AuditLogEntry.objects.bulk_create(entries)
+
+
+def resolve_pending_changes() -> int:
+    """
+    Add the changes to the audit log entries that were created with defer_changes=True.
+
+    Returns the number of the resolved entries.
+    """
+    entries = AuditLogEntry.objects.filter(pending_changes__isnull=False).order_by("id")
+    count = 0
+    for entry in entries.iterator():
+        model = apps.get_model(entry.pending_changes["model"])
+        # The latest history record saved before the event
+        latest_record = (
+            model.history.filter(
+                **{
+                    model._meta.pk.attname: entry.pending_changes["id"],
+                    "history_date__lte": parse_datetime(
+                        entry.pending_changes["date_time"]
+                    ),
+                }
+            )
+            .order_by("-history_date", "-history_id")
+            .first()
+        )
+        if latest_record:
+            _add_changes(latest_record, entry.message)
+        entry.pending_changes = None
+        entry.save(update_fields=["message", "pending_changes"])
+        count += 1
+    return count
+
+
+def _add_changes(latest_record: Model, message: dict) -> None:
     # Model is using django-simple-history
-    latest_record = target.history.latest()
     previous_record = latest_record.prev_record
 
     if previous_record:
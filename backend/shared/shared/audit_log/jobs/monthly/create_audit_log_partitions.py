@@ -0,0 +1,14 @@
+from django_extensions.management.jobs import MonthlyJob
+
+from shared.audit_log.partitioning import create_partitions, is_partitioned
+
+
+class Job(MonthlyJob):
+    help = (
+        "Create the upcoming monthly partitions of the audit log table, "
+        "only if the table is partitioned"
+    )
+
+    def execute(self):
+        if is_partitioned():
+            create_partitions()
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shared.audit_log.partitioning import create_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = "Create the upcoming monthly partitions of the partitioned audit log table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=3,
+            help="Number of upcoming monthly partitions to create",
+        )
+
+    def handle(self, months, *args, **options):
+        if not is_partitioned():
+            raise CommandError(
+                "The audit log table is not partitioned, see partition_audit_log_table"
+            )
+
+        created = create_partitions(months)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(created)} audit log partitions: {', '.join(created)}"
+            )
+        )
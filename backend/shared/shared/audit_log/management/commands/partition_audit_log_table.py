@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from shared.audit_log.partitioning import (
+    create_partitions,
+    is_partitioned,
+    partition_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the audit log table into a table partitioned monthly by created_at. "
+        "The existing entries are kept in a default partition."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=3,
+            help="Number of upcoming monthly partitions to create",
+        )
+
+    def handle(self, months, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning is only supported on PostgreSQL")
+        if is_partitioned():
+            raise CommandError("The audit log table is already partitioned")
+
+        partition_table()
+        created = create_partitions(months)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partitioned the audit log table, created partitions: {', '.join(created)}"
+            )
+        )
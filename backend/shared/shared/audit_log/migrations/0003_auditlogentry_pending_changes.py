@@ -0,0 +1,20 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_log", "0002_auditlogentry_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditlogentry",
+            name="pending_changes",
+            field=models.JSONField(
+                blank=True, null=True, verbose_name="pending changes"
+            ),
+        ),
+    ]
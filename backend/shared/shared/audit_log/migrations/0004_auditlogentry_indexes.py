@@ -0,0 +1,31 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_log", "0003_auditlogentry_pending_changes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlogentry",
+            index=models.Index(
+                condition=models.Q(("is_sent", True)),
+                fields=["created_at"],
+                name="audit_log_sent_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlogentry",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_sent", False), ("pending_changes__isnull", True)
+                ),
+                fields=["id"],
+                name="audit_log_unsent_id_idx",
+            ),
+        ),
+    ]
@@ -6,6 +6,26 @@ class AuditLogEntry(models.Model):
     is_sent = models.BooleanField(default=False, verbose_name=_("is sent"))
     message = models.JSONField(verbose_name=_("message"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("created at"))
+    # The target of an UPDATE event, whose changes are not yet added to the message
+    pending_changes = models.JSONField(
+        null=True, blank=True, verbose_name=_("pending changes")
+    )
+
+    class Meta:
+        indexes = [
+            # Retention purge of the sent entries
+            models.Index(
+                fields=["created_at"],
+                name="audit_log_sent_created_idx",
+                condition=models.Q(is_sent=True),
+            ),
+            # Sending of the unsent entries in id order
+            models.Index(
+                fields=["id"],
+                name="audit_log_unsent_id_idx",
+                condition=models.Q(is_sent=False, pending_changes__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return " ".join(
@@ -0,0 +1,179 @@
+"""
+Optional monthly partitioning of the audit log table by created_at (PostgreSQL only).
+
+partition_table() converts the existing table into a partitioned table. The existing
+rows stay in a default partition, so that no data is copied, and the new rows are
+stored in monthly partitions created in advance by create_partitions(). The retention
+drops the expired monthly partitions instead of deleting their rows.
+"""
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List
+
+from django.db import connection, transaction
+
+from shared.audit_log.models import AuditLogEntry
+
+LOGGER = logging.getLogger(__name__)
+
+TABLE_NAME = AuditLogEntry._meta.db_table
+DEFAULT_PARTITION_NAME = f"{TABLE_NAME}_default"
+PARTITION_NAME_RE = re.compile(rf"^{TABLE_NAME}_y(?P<year>\d{{4}})m(?P<month>\d{{2}})$")
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _bound(value: date) -> str:
+    return f"{value.isoformat()} 00:00:00+00"
+
+
+def get_partition_name(month: date) -> str:
+    return f"{TABLE_NAME}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE_NAME],
+        )
+        return cursor.fetchone() is not None
+
+
+def get_monthly_partitions() -> List[date]:
+    """Return the first days of the months that have a partition, in order."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [TABLE_NAME],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        if match := PARTITION_NAME_RE.match(name):
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return sorted(months)
+
+
+@transaction.atomic
+def partition_table() -> None:
+    """
+    Convert the audit log table into a table partitioned by created_at. The existing
+    table becomes the default partition, which keeps the rows that are not in any
+    monthly partition.
+
+    PostgreSQL requires the partition key to be a part of the primary key, so the
+    primary key of the partitioned table and the default partition is
+    (id, created_at).
+    """
+    qn = connection.ops.quote_name
+    indexes = [index.name for index in AuditLogEntry._meta.indexes]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE_NAME)} RENAME TO {qn(DEFAULT_PARTITION_NAME)}"
+        )
+        # The index names must be unique in the schema
+        for name in [f"{TABLE_NAME}_pkey", *indexes]:
+            cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(f'{name}_default')}")
+        # A partition can only have the primary key of the partitioned table
+        default_pkey = qn(f"{TABLE_NAME}_pkey_default")
+        cursor.execute(
+            f"ALTER TABLE {qn(DEFAULT_PARTITION_NAME)} DROP CONSTRAINT {default_pkey}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(DEFAULT_PARTITION_NAME)} "
+            f"ADD CONSTRAINT {default_pkey} PRIMARY KEY (id, created_at)"
+        )
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE_NAME)} "
+            f"(LIKE {qn(DEFAULT_PARTITION_NAME)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"ALTER TABLE {qn(TABLE_NAME)} ADD PRIMARY KEY (id, created_at)")
+        with connection.schema_editor() as schema_editor:
+            for index in AuditLogEntry._meta.indexes:
+                schema_editor.add_index(AuditLogEntry, index)
+        # The indexes of the default partition are attached to the new indexes
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE_NAME)} "
+            f"ATTACH PARTITION {qn(DEFAULT_PARTITION_NAME)} DEFAULT"
+        )
+        cursor.execute(
+            f"ALTER SEQUENCE {qn(f'{TABLE_NAME}_id_seq')} "
+            f"OWNED BY {qn(TABLE_NAME)}.id"
+        )
+
+
+def create_partitions(months: int = 3, today: date = None) -> List[str]:
+    """
+    Create the partitions of the next `months` months, which don't exist yet.
+    The partition of the current month is not created, as the default partition
+    may already contain rows of it.
+
+    PostgreSQL checks that the default partition has no rows of the new partition,
+    so each new partition scans the default partition under an exclusive lock. The
+    default partition only contains the entries created before the table was
+    partitioned, and it shrinks as they are cleared, so the monthly scan is accepted
+    instead of moving the old entries to monthly partitions.
+
+    Returns the names of the created partitions.
+    """
+    qn = connection.ops.quote_name
+    existing = set(get_monthly_partitions())
+    month = _month_start(today or datetime.now(tz=timezone.utc).date())
+    created = []
+    for _ in range(months):
+        month = _next_month(month)
+        if month in existing:
+            continue
+        name = get_partition_name(month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE_NAME)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [_bound(month), _bound(_next_month(month))],
+            )
+        created.append(name)
+    return created
+
+
+def drop_expired_partitions(before: datetime) -> List[str]:
+    """
+    Drop the monthly partitions whose entries are all created before `before`
+    and sent to Elasticsearch. A partition with unsent entries is kept.
+
+    Returns the names of the dropped partitions.
+    """
+    qn = connection.ops.quote_name
+    dropped = []
+    for month in get_monthly_partitions():
+        if _next_month(month) > before.astimezone(timezone.utc).date():
+            break
+        name = get_partition_name(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {qn(name)} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {qn(name)} WHERE NOT is_sent)"
+            )
+            if cursor.fetchone()[0]:
+                LOGGER.warning(f"Audit log partition {name} has unsent entries, kept")
+                continue
+            cursor.execute(f"DROP TABLE {qn(name)}")
+        dropped.append(name)
+    return dropped
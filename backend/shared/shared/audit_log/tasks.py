@@ -1,13 +1,21 @@
 import logging
+import time
 from datetime import timedelta
+from typing import List
 
 from django.conf import settings
 from django.utils import timezone
 from elasticsearch import Elasticsearch
 
+from shared.audit_log import partitioning
 from shared.audit_log.models import AuditLogEntry
 
 ES_STATUS_CREATED = "created"
+ES_STATUS_CODE_CONFLICT = 409
+ES_OP_TYPE_CREATE = "create"
+DEFAULT_ES_BULK_CHUNK_SIZE = 500
+DEFAULT_CLEAR_BATCH_SIZE = 5000
+DEFAULT_CLEAR_BATCH_PAUSE = 0.5  # seconds
 LOGGER = logging.getLogger(__name__)
 
 
@@ -33,27 +41,98 @@ def send_audit_log_to_elastic_search():
         ],
         http_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
     )
-    entries = AuditLogEntry.objects.filter(is_sent=False).order_by("created_at")
+    chunk_size = getattr(
+        settings, "ELASTICSEARCH_BULK_CHUNK_SIZE", DEFAULT_ES_BULK_CHUNK_SIZE
+    )
+    # The entries with pending changes are sent after resolve_pending_changes()
+    entries = AuditLogEntry.objects.filter(
+        is_sent=False, pending_changes__isnull=True
+    ).order_by("id")
+
+    # Page through the entries by id, so that the entries that failed to be sent
+    # are not fetched again in this run. The sent entries are marked after each chunk,
+    # so an interrupted run continues from the first unacknowledged chunk.
+    last_id = 0
+    while chunk := list(entries.filter(id__gt=last_id)[:chunk_size]):
+        last_id = chunk[-1].id
+        sent_ids = _send_chunk(es, chunk)
+        AuditLogEntry.objects.filter(id__in=sent_ids).update(is_sent=True)
+        if len(sent_ids) < len(chunk):
+            LOGGER.error(
+                f"Failed to send {len(chunk) - len(sent_ids)} audit log entries "
+                "to Elasticsearch"
+            )
+
 
-    for entry in entries:
+def _send_chunk(es: Elasticsearch, chunk: List[AuditLogEntry]) -> List[int]:
+    """
+    Send the entries with a single bulk request and return the ids of the entries
+    that are stored in Elasticsearch.
+    """
+    body = []
+    for entry in chunk:
         message_body = entry.message.copy()
         message_body["@timestamp"] = entry.message["audit_event"][
             "date_time"
         ]  # required by ES
-        rs = es.index(
-            index=settings.ELASTICSEARCH_APP_AUDIT_LOG_INDEX,
-            id=entry.id,
-            body=message_body,
-            op_type="create",
+        body.append(
+            {
+                ES_OP_TYPE_CREATE: {
+                    "_index": settings.ELASTICSEARCH_APP_AUDIT_LOG_INDEX,
+                    "_id": entry.id,
+                }
+            }
         )
-        if rs.get("result") == ES_STATUS_CREATED:
-            entry.is_sent = True
-            entry.save()
+        body.append(message_body)
+    rs = es.bulk(body=body)
+
+    sent_ids = []
+    for item in rs.get("items", []):
+        result = item.get(ES_OP_TYPE_CREATE, {})
+        # The entry has been created already, if the previous run was
+        # interrupted before marking it as sent
+        if (
+            result.get("result") == ES_STATUS_CREATED
+            or result.get("status") == ES_STATUS_CODE_CONFLICT
+        ):
+            sent_ids.append(int(result["_id"]))
+    return sent_ids
 
 
-def clear_audit_log_entries(days_to_keep=30):
+def clear_audit_log_entries(
+    days_to_keep=30,
+    batch_size=DEFAULT_CLEAR_BATCH_SIZE,
+    pause=DEFAULT_CLEAR_BATCH_PAUSE,
+):
+    """
+    Delete the sent entries older than `days_to_keep` days in batches of consecutive
+    ids, with a pause of `pause` seconds between the batches, so that a single
+    statement does not lock a large part of the table.
+
+    If the table is partitioned, the expired monthly partitions are dropped first.
+
+    Returns the number of deleted entries, not including the dropped partitions.
+    """
     # Only remove entries older than `X` days
-    sent_entries = AuditLogEntry.objects.filter(
-        is_sent=True, created_at__lte=(timezone.now() - timedelta(days=days_to_keep))
-    )
-    sent_entries.delete()
+    before = timezone.now() - timedelta(days=days_to_keep)
+    if partitioning.is_partitioned():
+        for name in partitioning.drop_expired_partitions(before):
+            LOGGER.info(f"Dropped audit log partition {name}")
+
+    sent_entries = AuditLogEntry.objects.filter(is_sent=True, created_at__lte=before)
+    entry_ids = sent_entries.order_by("id").values_list("id", flat=True)
+
+    deleted_count = 0
+    last_id = 0
+    while batch_ids := list(entry_ids.filter(id__gt=last_id)[:batch_size]):
+        if deleted_count:
+            time.sleep(pause)
+        last_id = batch_ids[-1]
+        count, _ = sent_entries.filter(
+            id__gte=batch_ids[0], id__lte=batch_ids[-1]
+        ).delete()
+        deleted_count += count
+        LOGGER.info(
+            f"Deleted {deleted_count} sent audit log entries (up to id {last_id})"
+        )
+    return deleted_count
@@ -3,6 +3,7 @@ from unittest import mock
 
 import pytest
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 from django.test import override_settings
 from django.utils import timezone
 
@@ -320,6 +321,49 @@ def test_send_audit_log_missing_configuration(user, fixed_datetime):
     assert entry.is_sent is False
 
 
+class FakeElasticsearch:
+    """
+    Stand-in for the Elasticsearch client, which stores the documents of the
+    bulk requests in memory like an Elasticsearch server would.
+    """
+
+    documents = {}
+    bulk_requests = []
+    fail_on_request = None
+    result_value = "created"
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def bulk(self, body):
+        FakeElasticsearch.bulk_requests.append(body)
+        if len(self.bulk_requests) == self.fail_on_request:
+            raise ConnectionError()
+        items = []
+        for action, document in zip(body[::2], body[1::2]):
+            doc_id = str(action["create"]["_id"])
+            if doc_id in self.documents:
+                items.append({"create": {"_id": doc_id, "status": 409}})
+            elif self.result_value != "created":
+                items.append({"create": {"_id": doc_id, "status": 400}})
+            else:
+                self.documents[doc_id] = document
+                items.append(
+                    {"create": {"_id": doc_id, "status": 201, "result": "created"}}
+                )
+        return {"errors": False, "items": items}
+
+
+@pytest.fixture
+def fake_elasticsearch():
+    FakeElasticsearch.documents = {}
+    FakeElasticsearch.bulk_requests = []
+    FakeElasticsearch.fail_on_request = None
+    FakeElasticsearch.result_value = "created"
+    with mock.patch("shared.audit_log.tasks.Elasticsearch", FakeElasticsearch):
+        yield FakeElasticsearch
+
+
 @pytest.mark.parametrize(
     "result_value, expected_status",
     [("created", True), ("failed", False)],  # Log sent successfully
@@ -332,7 +376,9 @@ def test_send_audit_log_missing_configuration(user, fixed_datetime):
     ELASTICSEARCH_PASSWORD="e_password",
     ENABLE_SEND_AUDIT_LOG=True,
 )
-def test_send_audit_log_success(user, fixed_datetime, result_value, expected_status):
+def test_send_audit_log_success(
+    user, fixed_datetime, fake_elasticsearch, result_value, expected_status
+):
     audit_logging.log(
         user,
         "shared.oidc.auth.HelsinkiOIDCAuthenticationBackend",
@@ -344,10 +390,49 @@ def test_send_audit_log_success(user, fixed_datetime, result_value, expected_sta
     assert AuditLogEntry.objects.count() == 1
     assert AuditLogEntry.objects.first().is_sent is False
 
-    with mock.patch("elasticsearch.Elasticsearch.index") as elasticsearch_index_mock:
-        elasticsearch_index_mock.return_value = {"result": result_value}
+    fake_elasticsearch.result_value = result_value
+    send_audit_log_to_elastic_search()
+    assert AuditLogEntry.objects.first().is_sent == expected_status
+
+
+@pytest.mark.django_db
+@override_settings(
+    ELASTICSEARCH_HOST="example.com",
+    ELASTICSEARCH_PORT="1234",
+    ELASTICSEARCH_USERNAME="e_user",
+    ELASTICSEARCH_PASSWORD="e_password",
+    ELASTICSEARCH_BULK_CHUNK_SIZE=2,
+    ENABLE_SEND_AUDIT_LOG=True,
+)
+def test_send_audit_log_in_chunks_and_resume(user, fixed_datetime, fake_elasticsearch):
+    for _ in range(5):
+        audit_logging.log(user, "", Operation.READ, user, get_time=fixed_datetime)
+    entry_ids = list(AuditLogEntry.objects.order_by("id").values_list("id", flat=True))
+
+    # The connection is lost during the second chunk
+    fake_elasticsearch.fail_on_request = 2
+    with pytest.raises(ConnectionError):
         send_audit_log_to_elastic_search()
-        assert AuditLogEntry.objects.first().is_sent == expected_status
+    assert set(
+        AuditLogEntry.objects.filter(is_sent=True).values_list("id", flat=True)
+    ) == set(entry_ids[:2])
+
+    # The entries of the first chunk are not sent again
+    fake_elasticsearch.bulk_requests = []
+    fake_elasticsearch.fail_on_request = None
+    send_audit_log_to_elastic_search()
+    assert [len(body) // 2 for body in fake_elasticsearch.bulk_requests] == [2, 1]
+    assert not AuditLogEntry.objects.filter(is_sent=False).exists()
+    assert set(fake_elasticsearch.documents) == {
+        str(entry_id) for entry_id in entry_ids
+    }
+    document = fake_elasticsearch.documents[str(entry_ids[0])]
+    assert document["@timestamp"] == "2020-06-01T00:00:00.000Z"
+
+    # A crash after the request, before marking the entries as sent
+    AuditLogEntry.objects.filter(id=entry_ids[0]).update(is_sent=False)
+    send_audit_log_to_elastic_search()
+    assert not AuditLogEntry.objects.filter(is_sent=False).exists()
 
 
 @pytest.mark.django_db
@@ -397,3 +482,72 @@ def test_clear_audit_log(user, fixed_datetime):
     assert AuditLogEntry.objects.count() == 2
     assert AuditLogEntry.objects.filter(id=new_sent_log.id).exists()
     assert AuditLogEntry.objects.filter(id=expired_unsent_log.id).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(
+    AUDIT_LOG_ORIGIN="TEST_SERVICE",
+)
+def test_audit_log_buffer(user, fixed_datetime, django_assert_num_queries):
+    buffer = audit_logging.AuditLogBuffer()
+
+    for operation in [Operation.READ, Operation.UPDATE]:
+        with transaction.atomic():
+            buffer.add(
+                audit_logging.create_entry(
+                    user, "", operation, user, get_time=fixed_datetime
+                )
+            )
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            buffer.add(
+                audit_logging.create_entry(
+                    user, "", Operation.DELETE, user, get_time=fixed_datetime
+                )
+            )
+            raise ValueError()
+    # Added without a transaction
+    buffer.add(
+        audit_logging.create_entry(
+            user, "", Operation.CREATE, user, get_time=fixed_datetime
+        )
+    )
+    assert AuditLogEntry.objects.count() == 0
+
+    # The entries of the committed transactions are written with a single insert
+    with django_assert_num_queries(1):
+        buffer.flush_on_commit()
+    assert [
+        entry.message["audit_event"]["operation"]
+        for entry in AuditLogEntry.objects.order_by("id")
+    ] == ["READ", "UPDATE", "CREATE"]
+
+    # In a transaction, the entries are written when the transaction is committed
+    with transaction.atomic():
+        buffer.add(
+            audit_logging.create_entry(
+                user, "", Operation.READ, user, get_time=fixed_datetime
+            )
+        )
+        buffer.flush_on_commit()
+        buffer.flush_on_commit()
+        assert AuditLogEntry.objects.count() == 3
+    assert AuditLogEntry.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_clear_audit_log_in_batches(user, fixed_datetime):
+    for _ in range(5):
+        audit_logging.log(user, "", Operation.READ, user, get_time=fixed_datetime)
+    AuditLogEntry.objects.update(
+        is_sent=True, created_at=timezone.now() - timedelta(days=35)
+    )
+    new_sent_log = AuditLogEntry.objects.order_by("id")[2]
+    new_sent_log.created_at = timezone.now()
+    new_sent_log.save()
+
+    with mock.patch("shared.audit_log.tasks.time.sleep") as sleep_mock:
+        assert clear_audit_log_entries(batch_size=2, pause=1) == 4
+    # The batches are [1, 2] and [4, 5]
+    sleep_mock.assert_called_once_with(1)
+    assert list(AuditLogEntry.objects.all()) == [new_sent_log]
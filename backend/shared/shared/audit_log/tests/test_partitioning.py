@@ -0,0 +1,54 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from django.core.management import call_command, CommandError
+from django.db import connection
+
+from shared.audit_log import audit_logging, partitioning
+from shared.audit_log.enums import Operation
+from shared.audit_log.models import AuditLogEntry
+from shared.audit_log.tasks import clear_audit_log_entries
+
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Partitioning requires PostgreSQL"
+)
+
+
+@pytest.mark.django_db
+def test_create_partitions_requires_partitioned_table():
+    if connection.vendor == "postgresql":
+        assert partitioning.is_partitioned() is False
+    with pytest.raises(CommandError):
+        call_command("create_audit_log_partitions")
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_partitioned_table(user):
+    audit_logging.log(user, "", Operation.READ, user)
+    existing_entry = AuditLogEntry.objects.get()
+
+    call_command("partition_audit_log_table", "--months", "1")
+    assert partitioning.is_partitioned()
+    assert partitioning.create_partitions(months=2, today=date(2020, 11, 15)) == [
+        partitioning.get_partition_name(date(2020, 12, 1)),
+        partitioning.get_partition_name(date(2021, 1, 1)),
+    ]
+
+    old_entry = AuditLogEntry.objects.create(message={}, is_sent=True)
+    unsent_entry = AuditLogEntry.objects.create(message={})
+    AuditLogEntry.objects.filter(pk=old_entry.pk).update(
+        created_at=datetime(2020, 12, 15, tzinfo=timezone.utc)
+    )
+    AuditLogEntry.objects.filter(pk=unsent_entry.pk).update(
+        created_at=datetime(2021, 1, 15, tzinfo=timezone.utc)
+    )
+
+    clear_audit_log_entries()
+
+    # The partition with the unsent entry and the default partition are kept
+    assert partitioning.get_monthly_partitions()[0] == date(2021, 1, 1)
+    assert set(AuditLogEntry.objects.values_list("pk", flat=True)) == {
+        existing_entry.pk,
+        unsent_entry.pk,
+    }
@@ -2,6 +2,7 @@ from contextlib import contextmanager
 from copy import copy
 from typing import Optional, Union
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.db import transaction
@@ -26,6 +27,16 @@ class AuditLoggingModelViewSet(ModelViewSet):
         "DELETE": Operation.DELETE,
     }
     created_instance: Optional[Model] = None
+    _audit_log_buffer: Optional[audit_logging.AuditLogBuffer] = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Also after an unhandled exception, as the entries of the committed
+            # actions must not be lost
+            if self._audit_log_buffer is not None:
+                self._audit_log_buffer.flush_on_commit()
 
     def permission_denied(self, request, message=None, code=None):
         self._log_permission_denied()
@@ -89,6 +100,13 @@ class AuditLoggingModelViewSet(ModelViewSet):
         a new audit log entry in the same transaction. If an exception is raised,
         the transaction will be rolled back. If the user has no permission to perform
         the given action, a "FORBIDDEN" audit log event will be recorded.
+
+        If settings.AUDIT_LOG_BUFFERED is True, the entries of the committed actions
+        of the request are written with a single bulk insert at the end of the request,
+        or when the request transaction is committed. The "FORBIDDEN" events are always
+        written immediately, as their transaction is rolled back.
+        If settings.AUDIT_LOG_DEFER_CHANGES is True, the changes of the updated object
+        are added to the entry later by a job, not during the request.
         """
         actor = copy(self._get_actor())  # May be destroyed if actor is also the target
         actor_backend = self._get_actor_backend()
@@ -96,14 +114,19 @@ class AuditLoggingModelViewSet(ModelViewSet):
         try:
             with transaction.atomic():
                 yield
-                audit_logging.log(
+                entry = audit_logging.create_entry(
                     actor,
                     actor_backend,
                     operation,
                     target or self._get_target(),
                     ip_address=self._get_ip_address(),
                     additional_information=additional_information,
+                    defer_changes=getattr(settings, "AUDIT_LOG_DEFER_CHANGES", False),
                 )
+                if getattr(settings, "AUDIT_LOG_BUFFERED", False):
+                    self._get_audit_log_buffer().add(entry)
+                else:
+                    entry.save()
         except (NotAuthenticated, PermissionDenied):
             audit_logging.log(
                 actor,
@@ -116,6 +139,12 @@ class AuditLoggingModelViewSet(ModelViewSet):
             )
             raise
 
+    def _get_audit_log_buffer(self) -> audit_logging.AuditLogBuffer:
+        # The viewset is instantiated for each request
+        if self._audit_log_buffer is None:
+            self._audit_log_buffer = audit_logging.AuditLogBuffer()
+        return self._audit_log_buffer
+
     def _get_actor(self) -> Union[User, AnonymousUser]:
         return getattr(self.request.user, "profile", self.request.user)
 
@@ -1,7 +1,6 @@
 import logging
 import uuid
 
-import requests
 from django.conf import settings as django_settings
 from django.contrib.auth.models import Group
 from django.core.exceptions import PermissionDenied
@@ -9,6 +8,8 @@ from django_auth_adfs.backend import AdfsAuthCodeBackend
 from django_auth_adfs.config import ConfigLoadError, provider_config, settings
 from django_auth_adfs.exceptions import MFARequired
 
+from shared.common import http_client
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -55,10 +56,11 @@ class HelsinkiAdfsAuthCodeBackend(AdfsAuthCodeBackend):
 
         data = {"securityEnabledOnly": False}
 
-        response = requests.post(
+        response = http_client.post(
             url,
             json=data,
             headers=headers,
+            timeout=settings.TIMEOUT,
         )
         response.raise_for_status()
 
@@ -108,8 +110,11 @@ class HelsinkiAdfsAuthCodeBackend(AdfsAuthCodeBackend):
             "Authorization": f"Bearer {graph_api_access_token}",
         }
 
-        response = requests.get(
-            url, headers=headers, params=f"$select={','.join(properties)}"
+        response = http_client.get(
+            url,
+            headers=headers,
+            params=f"$select={','.join(properties)}",
+            timeout=settings.TIMEOUT,
         )
 
         response.raise_for_status()
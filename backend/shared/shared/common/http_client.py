@@ -0,0 +1,118 @@
+import threading
+from http import cookiejar
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_TIMEOUT = 10
+RETRY_STATUS_CODES = (502, 503, 504)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class _BlockAllCookiesPolicy(cookiejar.DefaultCookiePolicy):
+    """
+    The sessions are shared by all the requests of the process, so the cookies set by
+    the upstream services must not be stored and sent on behalf of other users.
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+def _get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+    session.cookies.set_policy(_BlockAllCookiesPolicy())
+    # Connection errors happen before the request is sent, so they are retried for all
+    # methods. Read errors and the retry status codes are only retried for idempotent
+    # methods, which excludes POST.
+    max_retries = Retry(
+        total=getattr(settings, "HTTP_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=getattr(settings, "HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE),
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the process-wide session of the host of the given URL. The session keeps
+    the connections to the host alive and reuses them between the requests.
+    """
+    origin = _get_origin(url)
+    with _sessions_lock:
+        if origin not in _sessions:
+            _sessions[origin] = _create_session()
+        return _sessions[origin]
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def request(
+    method: str, url: str, timeout: Optional[float] = None, **kwargs
+) -> requests.Response:
+    """
+    Send a request using the pooled session of the host. A request without a timeout
+    could block the worker indefinitely, so settings.HTTP_DEFAULT_TIMEOUT is used if
+    no timeout is given.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "HTTP_DEFAULT_TIMEOUT", DEFAULT_TIMEOUT)
+    return get_session(url).request(method, url, timeout=timeout, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+class PooledHttpClient:
+    """
+    Base class for the clients of the integrations. The requests are sent using the
+    pooled session of the host, with the timeout of the client.
+    """
+
+    timeout: Optional[float] = None
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return request(method, url, **kwargs)
+
+    def _http_get(self, url: str, **kwargs) -> requests.Response:
+        return self._request("GET", url, **kwargs)
+
+    def _http_post(self, url: str, **kwargs) -> requests.Response:
+        return self._request("POST", url, **kwargs)
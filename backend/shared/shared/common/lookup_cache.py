@@ -0,0 +1,96 @@
+import hashlib
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from requests import HTTPError, Response
+
+DEFAULT_COMPANY_CACHE_TIMEOUT = 60 * 60  # seconds
+DEFAULT_COMPANY_NEGATIVE_CACHE_TIMEOUT = 5 * 60  # seconds
+DEFAULT_TOKEN_CACHE_TIMEOUT = 5 * 60  # seconds
+# Not found and rate limited
+NEGATIVE_CACHE_STATUS_CODES = (404, 429)
+
+
+def _cached_http_error(status_code: int) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(f"{status_code} (cached response)", response=response)
+
+
+def get_or_fetch(
+    cache_key: str,
+    fetch: Callable[[], Any],
+    timeout: int,
+    negative_timeout: Optional[int] = None,
+) -> Any:
+    """
+    Return the cached result of fetch() or call it and cache the result for `timeout`
+    seconds. If fetch() raises an HTTPError with one of NEGATIVE_CACHE_STATUS_CODES,
+    the status code is cached for `negative_timeout` seconds, and an HTTPError with
+    the same status code is raised until then, without calling fetch(). The errors
+    are not cached if `negative_timeout` is None.
+    """
+    cached = cache.get(cache_key)
+    if cached is not None:
+        if "error_status_code" in cached:
+            raise _cached_http_error(cached["error_status_code"])
+        return cached["value"]
+
+    try:
+        value = fetch()
+    except HTTPError as e:
+        status_code = getattr(e.response, "status_code", None)
+        if negative_timeout is not None and status_code in NEGATIVE_CACHE_STATUS_CODES:
+            cache.set(cache_key, {"error_status_code": status_code}, negative_timeout)
+        raise
+    cache.set(cache_key, {"value": value}, timeout)
+    return value
+
+
+def get_or_fetch_company_data(
+    source: str, business_id: str, fetch: Callable[[], Any]
+) -> Any:
+    """
+    Return the company data of the business id from the given source (e.g. "ytj"),
+    using the cache shared by all the processes. The timeouts are set with
+    settings.COMPANY_CACHE_TIMEOUT and settings.COMPANY_NEGATIVE_CACHE_TIMEOUT.
+    """
+    return get_or_fetch(
+        f"company:{source}:{business_id}",
+        fetch,
+        timeout=getattr(
+            settings, "COMPANY_CACHE_TIMEOUT", DEFAULT_COMPANY_CACHE_TIMEOUT
+        ),
+        negative_timeout=getattr(
+            settings,
+            "COMPANY_NEGATIVE_CACHE_TIMEOUT",
+            DEFAULT_COMPANY_NEGATIVE_CACHE_TIMEOUT,
+        ),
+    )
+
+
+def get_or_fetch_for_token(
+    namespace: str,
+    token: str,
+    fetch: Callable[[], Any],
+    expires_in: Optional[float] = None,
+) -> Any:
+    """
+    Return the cached result of fetch() for the given access token. The key contains
+    a hash of the token instead of the token itself, and the result expires with the
+    token after `expires_in` seconds, or after settings.TOKEN_CACHE_TIMEOUT seconds
+    if the lifetime of the token is not known. Missing and expired tokens are not
+    cached.
+    """
+    if not token:
+        return fetch()
+    if expires_in is None:
+        expires_in = getattr(
+            settings, "TOKEN_CACHE_TIMEOUT", DEFAULT_TOKEN_CACHE_TIMEOUT
+        )
+    expires_in = int(expires_in)
+    if expires_in <= 0:
+        return fetch()
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    return get_or_fetch(f"token:{namespace}:{token_hash}", fetch, timeout=expires_in)
@@ -1,6 +1,7 @@
 from datetime import timedelta
 
 import pytest
+from django.core.cache import cache
 from django.test import Client
 from django.utils import timezone
 
@@ -12,6 +13,12 @@ from shared.common.tests.factories import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # The cached integration lookups must not leak from one test to another
+    cache.clear()
+
+
 def store_tokens_in_session(client):
     s = client.session
     s.update(
@@ -0,0 +1,61 @@
+import pytest
+import requests_mock
+from django.test import override_settings
+
+from shared.common import http_client
+from shared.common.http_client import PooledHttpClient
+
+
+@pytest.fixture(autouse=True)
+def _close_sessions():
+    http_client.close_sessions()
+    yield
+    http_client.close_sessions()
+
+
+def test_session_per_host():
+    session = http_client.get_session("https://example.com/a")
+    assert http_client.get_session("https://EXAMPLE.com/b?c=d") is session
+    assert http_client.get_session("https://example.org/a") is not session
+    assert http_client.get_session("http://example.com/a") is not session
+
+
+@override_settings(HTTP_POOL_MAXSIZE=5, HTTP_MAX_RETRIES=2)
+def test_session_adapter():
+    adapter = http_client.get_session("https://example.com").get_adapter(
+        "https://example.com"
+    )
+    assert adapter._pool_maxsize == 5
+    assert adapter.max_retries.total == 2
+    assert not adapter.max_retries.is_retry("POST", 503)
+    assert adapter.max_retries.is_retry("GET", 503)
+
+
+@override_settings(HTTP_DEFAULT_TIMEOUT=7)
+def test_request_default_timeout():
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/a", json={})
+        http_client.get("https://example.com/a")
+        assert m.last_request.timeout == 7
+        http_client.get("https://example.com/a", timeout=3)
+        assert m.last_request.timeout == 3
+
+
+def test_cookies_are_not_stored():
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/a", cookies={"session": "secret"})
+        http_client.get("https://example.com/a")
+        http_client.get("https://example.com/a")
+        assert "Cookie" not in m.last_request.headers
+    assert not http_client.get_session("https://example.com").cookies
+
+
+def test_pooled_http_client_timeout():
+    class Client(PooledHttpClient):
+        timeout = 5
+
+    with requests_mock.Mocker() as m:
+        m.post("https://example.com/a", json={})
+        Client()._http_post("https://example.com/a", json={"a": 1})
+        assert m.last_request.timeout == 5
+        assert m.last_request.json() == {"a": 1}
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from requests import HTTPError, Response
+
+from shared.common.lookup_cache import (
+    get_or_fetch,
+    get_or_fetch_company_data,
+    get_or_fetch_for_token,
+)
+
+
+def _http_error(status_code):
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(str(status_code), response=response)
+
+
+def test_get_or_fetch_caches_value():
+    fetch = mock.Mock(return_value={"name": "Test Oy"})
+
+    for _ in range(2):
+        assert get_or_fetch("key", fetch, timeout=60, negative_timeout=10) == {
+            "name": "Test Oy"
+        }
+    fetch.assert_called_once()
+
+
+@pytest.mark.parametrize("status_code", [404, 429])
+def test_get_or_fetch_caches_negative_result(status_code):
+    fetch = mock.Mock(side_effect=_http_error(status_code))
+
+    for _ in range(2):
+        with pytest.raises(HTTPError) as exc_info:
+            get_or_fetch("key", fetch, timeout=60, negative_timeout=10)
+        assert exc_info.value.response.status_code == status_code
+    fetch.assert_called_once()
+
+
+@pytest.mark.parametrize("error", [_http_error(500), ValueError()])
+def test_get_or_fetch_does_not_cache_errors(error):
+    fetch = mock.Mock(side_effect=error)
+
+    for _ in range(2):
+        with pytest.raises(type(error)):
+            get_or_fetch("key", fetch, timeout=60, negative_timeout=10)
+    assert fetch.call_count == 2
+
+
+@override_settings(COMPANY_NEGATIVE_CACHE_TIMEOUT=0)
+def test_get_or_fetch_company_data_negative_timeout():
+    fetch = mock.Mock(side_effect=_http_error(404))
+
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            get_or_fetch_company_data("ytj", "0877830-0", fetch)
+    # A timeout of 0 expires the cached result immediately
+    assert fetch.call_count == 2
+
+
+def test_get_or_fetch_for_token():
+    fetch = mock.Mock(return_value="api-token")
+
+    for _ in range(2):
+        assert get_or_fetch_for_token("test", "secret", fetch, expires_in=60) == (
+            "api-token"
+        )
+    assert get_or_fetch_for_token("test", "other", fetch, expires_in=60) == (
+        "api-token"
+    )
+    assert fetch.call_count == 2
+    # The token itself is not stored in the cache keys
+    assert not any("secret" in key for key in cache._cache)
+
+
+def test_get_or_fetch_for_expired_token():
+    fetch = mock.Mock(return_value="api-token")
+
+    for _ in range(2):
+        get_or_fetch_for_token("test", "secret", fetch, expires_in=0.5)
+    assert fetch.call_count == 2
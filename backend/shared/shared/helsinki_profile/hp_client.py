@@ -1,11 +1,15 @@
-import requests
+import time
+
+import jwt
 from django.conf import settings
 from requests import RequestException
 
+from shared.common.http_client import PooledHttpClient
+from shared.common.lookup_cache import get_or_fetch_for_token
 from shared.helsinki_profile.exceptions import HelsinkiProfileException
 
 
-class HelsinkiProfileClient:
+class HelsinkiProfileClient(PooledHttpClient):
     """
     Client for reading data from the Helsinki Profile GraphQL API
 
@@ -53,7 +57,7 @@ class HelsinkiProfileClient:
         api_access_token = self.get_api_access_token(oidc_access_token)
 
         try:
-            response = requests.post(
+            response = self._http_post(
                 settings.HELSINKI_PROFILE_API_URL,
                 json=payload,
                 timeout=10,
@@ -82,10 +86,21 @@ class HelsinkiProfileClient:
 
     def get_api_access_token(self, oidc_access_token):
         """
-        Exchanges OIDC access token for API access token
+        Exchanges OIDC access token for API access token.
+
+        The API access token is cached until the OIDC access token expires, so the
+        exchange is done once per OIDC access token.
         """
+        return get_or_fetch_for_token(
+            "helsinki_profile_api_token",
+            oidc_access_token,
+            lambda: self._request_api_access_token(oidc_access_token),
+            expires_in=self._get_token_expires_in(oidc_access_token),
+        )
+
+    def _request_api_access_token(self, oidc_access_token):
         try:
-            response = requests.get(
+            response = self._http_get(
                 settings.TUNNISTAMO_API_TOKENS_ENDPOINT,
                 headers={"Authorization": f"Bearer {oidc_access_token}"},
                 timeout=10,
@@ -100,3 +115,16 @@ class HelsinkiProfileClient:
                 "Could not obtain API access token, check setting HELSINKI_PROFILE_SCOPE"
             )
         return data[settings.HELSINKI_PROFILE_SCOPE]
+
+    @staticmethod
+    def _get_token_expires_in(access_token):
+        """
+        Return the seconds until the given JWT access token expires, or None if the
+        token is not a JWT with an expiration time. The token has been issued to us by
+        Tunnistamo and is only used as a cache key, so the signature is not verified.
+        """
+        try:
+            claims = jwt.decode(access_token, options={"verify_signature": False})
+            return float(claims["exp"]) - time.time()
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            return None
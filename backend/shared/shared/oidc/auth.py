@@ -1,6 +1,5 @@
 import logging
 
-import requests
 from django.conf import settings
 from django.core.exceptions import SuspiciousOperation
 from django.urls import reverse
@@ -8,6 +7,7 @@ from mozilla_django_oidc.auth import OIDCAuthenticationBackend
 from mozilla_django_oidc.utils import absolutify
 from requests.exceptions import HTTPError
 
+from shared.common import http_client
 from shared.oidc.utils import (
     is_active_oidc_refresh_token,
     store_token_info_in_oidc_session,
@@ -123,7 +123,7 @@ class HelsinkiOIDCAuthenticationBackend(OIDCAuthenticationBackend):
             "refresh_token": refresh_token,
         }
 
-        response = requests.post(
+        response = http_client.post(
             self.OIDC_OP_TOKEN_ENDPOINT,
             data=payload,
             verify=self.get_settings("OIDC_VERIFY_SSL", True),
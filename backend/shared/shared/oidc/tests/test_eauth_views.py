@@ -1,6 +1,8 @@
 import re
+import time
 from unittest import mock
 
+import jwt
 import pytest
 from dateutil.parser import isoparse
 from django.conf import settings
@@ -9,7 +11,12 @@ from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
 
-from shared.oidc.utils import get_checksum_header, get_organization_roles
+from shared.helsinki_profile.hp_client import HelsinkiProfileClient
+from shared.oidc.utils import (
+    get_checksum_header,
+    get_organization_roles,
+    store_token_info_in_eauth_session,
+)
 
 
 @freeze_time("2017-02-09T10:29:42.09")
@@ -70,6 +77,56 @@ def test_get_organization_roles(session_request, requests_mock):
     assert session_request.session["organization_roles"] == organization_roles_json[0]
 
 
+@pytest.mark.django_db
+@override_settings(
+    EAUTHORIZATIONS_BASE_URL="http://example.com",
+    EAUTHORIZATIONS_CLIENT_ID="test",
+    EAUTHORIZATIONS_CLIENT_SECRET="test",
+    NEXT_PUBLIC_MOCK_FLAG=False,
+)
+def test_get_organization_roles_cached_by_access_token(session_request, requests_mock):
+    organization_roles_json = [{"name": "Activenakusteri Oy", "roles": ["NIMKO"]}]
+    matcher = re.compile(re.escape(settings.EAUTHORIZATIONS_BASE_URL))
+    requests_mock.get(matcher, json=organization_roles_json)
+    token_info = {"id_token": "session-id", "access_token": "test", "expires_in": 60}
+    store_token_info_in_eauth_session(session_request, token_info)
+
+    assert get_organization_roles(session_request) == organization_roles_json[0]
+    # A new session with the same access token uses the cached roles
+    del session_request.session["organization_roles"]
+    assert get_organization_roles(session_request) == organization_roles_json[0]
+    assert requests_mock.call_count == 1
+
+    store_token_info_in_eauth_session(session_request, {"access_token": "other"})
+    del session_request.session["organization_roles"]
+    get_organization_roles(session_request)
+    assert requests_mock.call_count == 2
+
+
+@override_settings(
+    TUNNISTAMO_API_TOKENS_ENDPOINT="http://example.com/api-tokens/",
+    HELSINKI_PROFILE_API_URL="http://example.com/graphql/",
+    HELSINKI_PROFILE_SCOPE="https://api.hel.fi/auth/helsinkiprofile",
+)
+def test_helsinki_profile_api_access_token_cached_until_token_expires(
+    requests_mock,
+):
+    requests_mock.get(
+        settings.TUNNISTAMO_API_TOKENS_ENDPOINT,
+        json={settings.HELSINKI_PROFILE_SCOPE: "api-token"},
+    )
+    oidc_access_token = jwt.encode(
+        {"exp": int(time.time()) + 60}, "secret", algorithm="HS256"
+    )
+    expired_oidc_access_token = jwt.encode(
+        {"exp": int(time.time()) - 60}, "secret", algorithm="HS256"
+    )
+
+    for token in [oidc_access_token, oidc_access_token, expired_oidc_access_token]:
+        assert HelsinkiProfileClient().get_api_access_token(token) == "api-token"
+    assert requests_mock.call_count == 2
+
+
 @pytest.mark.django_db
 @override_settings(
     EAUTHORIZATIONS_BASE_URL="http://example.com",
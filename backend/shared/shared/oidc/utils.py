@@ -2,14 +2,17 @@ import base64
 import hashlib
 import hmac
 from datetime import timedelta
+from typing import Optional
 from uuid import uuid4
 
-import requests
 from dateutil.parser import isoparse
 from django.conf import settings
 from django.http import HttpRequest
 from django.utils import timezone
 
+from shared.common import http_client
+from shared.common.lookup_cache import get_or_fetch_for_token
+
 
 def get_userinfo(request: HttpRequest) -> dict:
     from shared.oidc.auth import HelsinkiOIDCAuthenticationBackend
@@ -44,24 +47,43 @@ def get_checksum_header(path: str) -> str:
     return f"{settings.EAUTHORIZATIONS_CLIENT_ID} {timestamp} {checksum}"
 
 
-def request_organization_roles(request: HttpRequest) -> dict:
-    request_id = uuid4()
-    id_token = request.session.get("eauth_id_token")
-    path = f"/service/ypa/api/organizationRoles/{id_token}?requestId={request_id}"
-    organization_roles_endpoint = f"{settings.EAUTHORIZATIONS_BASE_URL}{path}"
+def get_token_expires_in(request: HttpRequest, prefix: str) -> Optional[float]:
+    """Return the seconds until the access token stored in the session expires."""
+    access_token_expires = request.session.get(f"{prefix}_access_token_expires")
+    if not access_token_expires:
+        return None
+    return (isoparse(access_token_expires) - timezone.now()).total_seconds()
 
-    checksum_header = get_checksum_header(path)
 
+def request_organization_roles(request: HttpRequest) -> dict:
+    id_token = request.session.get("eauth_id_token")
     eauth_access_token = request.session.get("eauth_access_token")
-    response = requests.get(
-        organization_roles_endpoint,
-        headers={
-            "Authorization": f"Bearer {eauth_access_token}",
-            "X-AsiointivaltuudetAuthorization": checksum_header,
-        },
+
+    def fetch_organization_roles():
+        request_id = uuid4()
+        path = f"/service/ypa/api/organizationRoles/{id_token}?requestId={request_id}"
+        organization_roles_endpoint = f"{settings.EAUTHORIZATIONS_BASE_URL}{path}"
+
+        checksum_header = get_checksum_header(path)
+
+        response = http_client.get(
+            organization_roles_endpoint,
+            headers={
+                "Authorization": f"Bearer {eauth_access_token}",
+                "X-AsiointivaltuudetAuthorization": checksum_header,
+            },
+        )
+        response.raise_for_status()
+        return response.json()[0]
+
+    # The roles are cached for the lifetime of the access token, so that a new
+    # session with the same token does not request them again
+    org_roles = get_or_fetch_for_token(
+        "eauth_organization_roles",
+        eauth_access_token and f"{id_token} {eauth_access_token}",
+        fetch_organization_roles,
+        expires_in=get_token_expires_in(request, "eauth"),
     )
-    response.raise_for_status()
-    org_roles = response.json()[0]
     if request:
         request.session["organization_roles"] = org_roles
     return org_roles
@@ -2,7 +2,6 @@ import logging
 from urllib.parse import urlencode
 from uuid import uuid4
 
-import requests
 from django.conf import settings
 from django.contrib import auth
 from django.http import HttpResponseRedirect
@@ -13,6 +12,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import HTTPError
 
+from shared.common import http_client
 from shared.helsinki_profile.exceptions import HelsinkiProfileException
 from shared.helsinki_profile.hp_client import HelsinkiProfileClient
 from shared.oidc.utils import (
@@ -51,7 +51,7 @@ class EauthAuthenticationRequestView(View):
 
         checksum_header = get_checksum_header(path)
 
-        response = requests.get(
+        response = http_client.get(
             settings.EAUTHORIZATIONS_BASE_URL + path,
             headers={
                 "X-AsiointivaltuudetAuthorization": checksum_header,
@@ -172,7 +172,7 @@ class EauthAuthenticationCallbackView(View):
         query = urlencode(params)
 
         token_url = "{url}?{query}".format(url=token_endpoint_url, query=query)
-        response = requests.post(
+        response = http_client.post(
             token_url,
             auth=auth_header,
         )
@@ -1,14 +1,15 @@
-import requests
 from django.conf import settings
 
+from shared.common.http_client import PooledHttpClient
 
-class ServiceBusClient:
+
+class ServiceBusClient(PooledHttpClient):
     def __init__(self):
         if not all([settings.SERVICE_BUS_INFO_PATH, settings.SERVICE_BUS_TIMEOUT]):
             raise ValueError("Service bus client settings not configured.")
 
     def _post(self, url: str, username: str, password: str, data: dict) -> dict:
-        response = requests.post(
+        response = self._http_post(
             url,
             auth=(username, password),
             timeout=settings.SERVICE_BUS_TIMEOUT,
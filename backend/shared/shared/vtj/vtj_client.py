@@ -1,12 +1,13 @@
 import uuid
 from typing import Tuple
 
-import requests
 from django.conf import settings
 from django.http import HttpRequest
 
+from shared.common.http_client import PooledHttpClient
 
-class VTJClient:
+
+class VTJClient(PooledHttpClient):
     """
     Client for VTJ / Väestötietojärjestelmä i.e. Finnish Population Information System.
 
@@ -59,7 +60,7 @@ class VTJClient:
     def get_personal_info(
         self, social_security_number, end_user: str, **kwargs
     ) -> dict:
-        response = requests.post(
+        response = self._http_post(
             self._url,
             auth=self._auth,
             json=self._json(social_security_number, end_user),
@@ -1,6 +1,6 @@
-import requests
 from django.conf import settings
 
+from shared.common.http_client import PooledHttpClient
 from shared.service_bus.enums import YtjOrganizationCode
 
 TARGET_ASSOCIATION_NAME_TYPE = "P"
@@ -8,13 +8,13 @@ TARGET_ASSOCIATION_NAME_LANGUAGE = "FI"
 TARGET_ASSOCIATION_NAME_STATUS = "R"
 
 
-class YRTTIClient:
+class YRTTIClient(PooledHttpClient):
     def __init__(self):
         if not all([settings.YRTTI_BASIC_INFO_PATH, settings.YRTTI_TIMEOUT]):
             raise ValueError("YRTTI client settings not configured.")
 
     def _post(self, url: str, username: str, password: str, data: dict) -> dict:
-        response = requests.post(
+        response = self._http_post(
             url, auth=(username, password), timeout=settings.YRTTI_TIMEOUT, json=data
         )
         response.raise_for_status()
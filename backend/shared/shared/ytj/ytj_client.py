@@ -1,8 +1,9 @@
-import requests
 from django.conf import settings
 
+from shared.common.http_client import PooledHttpClient
 
-class YTJClient:
+
+class YTJClient(PooledHttpClient):
     """
     https://avoindata.prh.fi/
     """
@@ -12,7 +13,7 @@ class YTJClient:
             raise ValueError("YTJ client settings not configured.")
 
     def _get(self, url: str, **kwargs) -> dict:
-        response = requests.get(url, timeout=settings.YTJ_TIMEOUT, **kwargs)
+        response = self._http_get(url, timeout=settings.YTJ_TIMEOUT, **kwargs)
         response.raise_for_status()
         return response.json()
 
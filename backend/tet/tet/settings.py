@@ -91,6 +91,7 @@ django_env = environ.Env(
     ELASTICSEARCH_PORT=(str, ""),
     ELASTICSEARCH_USERNAME=(str, ""),
     ELASTICSEARCH_PASSWORD=(str, ""),
+    ELASTICSEARCH_BULK_CHUNK_SIZE=(int, 500),
     CLEAR_AUDIT_LOG_ENTRIES=(bool, False),
     ENABLE_SEND_AUDIT_LOG=(bool, False),
     ENABLE_ADMIN=(bool, True),
@@ -208,6 +209,7 @@ ELASTICSEARCH_HOST = django_env("ELASTICSEARCH_HOST")
 ELASTICSEARCH_PORT = django_env("ELASTICSEARCH_PORT")
 ELASTICSEARCH_USERNAME = django_env("ELASTICSEARCH_USERNAME")
 ELASTICSEARCH_PASSWORD = django_env("ELASTICSEARCH_PASSWORD")
+ELASTICSEARCH_BULK_CHUNK_SIZE = django_env.int("ELASTICSEARCH_BULK_CHUNK_SIZE")
 
 
 LOGGING = {